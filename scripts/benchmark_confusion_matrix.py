@@ -0,0 +1,71 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import logging
+import sys
+from time import perf_counter
+
+import pandas as pd
+
+from vaguerequirementslib.confusion_matrix import build_confusion_matrix
+from vaguerequirementslib.constants import MTURK_ANSWER_COLUMN, MTURK_REQUIREMENT_COLUMN, MTURK_VAGUE_ANSWER_LABELS, MTURK_NOT_VAGUE_ANSWER_LABELS, CM_REQUIREMENT_COLUMN, CM_VAGUE_COUNT_COLUMN, CM_NOT_VAGUE_COUNT_COLUMN
+from vaguerequirementslib_benchmark.synthetic_batch import build_synthetic_batch
+
+logging.basicConfig(
+    format='%(asctime)s [%(name)-20.20s] [%(levelname)-5.5s]  %(message)s',
+    stream=sys.stdout,
+    level=logging.INFO)
+
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.DEBUG)
+
+# pylint:disable=invalid-name
+
+
+def main():
+    row_counts = [10**4, 10**5, 10**6, 10**7]
+    legacy_max_rows = 10**6  # The legacy implementation takes minutes above this size
+    assignments_per_hit = 3
+    seed = 0
+
+    # Silence the library while timing
+    logging.getLogger('vaguerequirementslib').setLevel(logging.WARNING)
+
+    for row_count in row_counts:
+        df = build_synthetic_batch(row_count, assignments_per_hit, seed=seed)
+
+        start = perf_counter()
+        result = build_confusion_matrix(df)
+        duration = perf_counter() - start
+        LOGGER.info('rows=%s: build_confusion_matrix took %.3fs.', row_count, duration)
+
+        if row_count <= legacy_max_rows:
+            start = perf_counter()
+            legacy_result = _build_confusion_matrix_legacy(df)
+            legacy_duration = perf_counter() - start
+            pd.testing.assert_frame_equal(result, legacy_result)
+            LOGGER.info('rows=%s: legacy implementation took %.3fs (speedup x%.1f). Results are equal.', row_count, legacy_duration, legacy_duration / duration)
+
+
+def _build_confusion_matrix_legacy(data_frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    The former row by row implementation of build_confusion_matrix used as reference.
+    """
+    requirements_to_label_map = {}
+    for requirement, group in data_frame.groupby(MTURK_REQUIREMENT_COLUMN):
+        vague_count = 0
+        not_vague_count = 0
+        for value in group[MTURK_ANSWER_COLUMN]:
+            if value in MTURK_VAGUE_ANSWER_LABELS:
+                vague_count += 1
+            elif value in MTURK_NOT_VAGUE_ANSWER_LABELS:
+                not_vague_count += 1
+        requirements_to_label_map[requirement] = [requirement, vague_count, not_vague_count]
+
+    return pd.DataFrame(list(requirements_to_label_map.values()), columns=[CM_REQUIREMENT_COLUMN, CM_VAGUE_COUNT_COLUMN, CM_NOT_VAGUE_COUNT_COLUMN])
+
+
+if __name__ == '__main__':
+    main()
@@ -9,8 +9,7 @@ import csv
 
 
 from vaguerequirementslib.read_csv import read_csv_files
-from vaguerequirementslib.confusion_matrix import build_confusion_matrix
-from vaguerequirementslib.majority_label import calc_majority_label
+from vaguerequirementslib.confusion_matrix import aggregate_votes
 
 logging.basicConfig(
     format='%(asctime)s [%(name)-12.12s] [%(levelname)-5.5s]  %(message)s',
@@ -30,12 +29,12 @@ def main():
 
     all_df = read_csv_files(batch_names)
 
-    confusion_matrix = build_confusion_matrix(all_df)
+    vote_counts = aggregate_votes(all_df)
 
     # Uncomment the following line to print the confusion matrix
-    # confusion_matrix.to_csv('./confusion_matrix.csv', sep=',', index=False, quoting=csv.QUOTE_NONNUMERIC)
+    # vote_counts.confusion_matrix().to_csv('./confusion_matrix.csv', sep=',', index=False, quoting=csv.QUOTE_NONNUMERIC)
 
-    majority_label_df = calc_majority_label(confusion_matrix)
+    majority_label_df = vote_counts.majority_labels()
     LOGGER.info('Calculated majority labels')
     majority_label_df.to_csv('./majority_label.csv', sep=',', index=False, quoting=csv.QUOTE_NONNUMERIC)
 
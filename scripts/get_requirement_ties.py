@@ -4,12 +4,15 @@
 # ------------------------------------------------------------------------------------------------------
 
 import logging
+import os
 import sys
 import csv
 import pandas as pd
 
-from vaguerequirementslib.constants import MTURK_ANSWER_COLUMN, MTURK_NOT_VAGUE_ANSWER_LABELS, MTURK_VAGUE_ANSWER_LABELS, MTURK_REQUIREMENT_COLUMN
+from vaguerequirementslib.confusion_matrix import aggregate_votes
+from vaguerequirementslib.constants import MTURK_ANSWER_COLUMN, MTURK_NOT_VAGUE_ANSWER_LABELS, MTURK_VAGUE_ANSWER_LABELS, MTURK_REQUIREMENT_COLUMN, CM_VAGUE_COUNT_COLUMN, CM_NOT_VAGUE_COUNT_COLUMN
 from vaguerequirementslib.read_csv import read_csv_files
+from vaguerequirementslib.requirement_index import RequirementIndex
 
 logging.basicConfig(
     format='%(asctime)s [%(name)-12.12s] [%(levelname)-5.5s]  %(message)s',
@@ -31,16 +34,22 @@ def main():
     ]
 
     out_file = '../../../Desktop/Masters_Thesis/datasets/corpus/labeled/corpus-batch-5-27-mturk-ties.csv'
+    # Resolved against the script directory like the batch files, so the index is reused from any working directory
+    index_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../Desktop/Masters_Thesis/datasets/corpus/labeled/requirement-index.json')
     df = read_csv_files(batch_names)
 
-    df_with_ties = _build_tie_df(df)
+    # The saved index keeps the requirement IDs stable across runs
+    requirement_index = RequirementIndex.load(index_file, missing_ok=True)
+    df_with_ties = _build_tie_df(df, requirement_index)
+    requirement_index.save(index_file)
 
     # Uncomment the following line to print the confusion matrix
     df_with_ties.to_csv(out_file, sep=',', index=False, quoting=csv.QUOTE_NONNUMERIC)
 
 
-def _build_tie_df(
+def _build_tie_df(  # pylint:disable=too-many-arguments
         data_frame: pd.DataFrame,
+        requirement_index: RequirementIndex,
         requirement_column: str = MTURK_REQUIREMENT_COLUMN,
         answer_column: str = MTURK_ANSWER_COLUMN,
         vague_answer_labels: list = MTURK_VAGUE_ANSWER_LABELS,
@@ -51,6 +60,7 @@ def _build_tie_df(
 
     Args:
         data_frame (pd.DataFrame): The data frame
+        requirement_index (RequirementIndex): The index assigning the requirement IDs.
         requirement_column (str, optional): The columns name that contains the requirements. Defaults to MTURK_REQUIREMENT_COLUMN.
         answer_column (str, optional): The columns name that contains the answers/labels. Defaults to MTURK_ANSWER_COLUMN.
         vague_answer_labels (list, optional): List of answers/labels that indicate a vague requirement. Defaults to MTURK_VAGUE_ANSWER_LABELS.
@@ -61,47 +71,19 @@ def _build_tie_df(
     """
 
     LOGGER.info('Build requirement tie matrix.')
-    requirements_to_label_map = {}
 
-    # Group data by requirement.
-    grouped_data = data_frame.groupby(requirement_column)
+    # Count the votes on integer requirement IDs
+    vote_counts = aggregate_votes(
+        data_frame,
+        requirement_column,
+        answer_column,
+        {CM_VAGUE_COUNT_COLUMN: vague_answer_labels, CM_NOT_VAGUE_COUNT_COLUMN: not_vague_answer_labels},
+        requirement_index)
 
-    for requirement, group in grouped_data:
+    ties = vote_counts.ties()
+    result = pd.DataFrame({MTURK_REQUIREMENT_COLUMN: ties.to_numpy(), MTURK_ANSWER_COLUMN: None})
 
-        # Answered Is vague
-        vague_count = 0
-        # Answered Is not vague
-        not_vague_count = 0
-
-        # Loop all answers for this requirement
-        for value in group[answer_column]:
-
-            # Count score
-            if value in vague_answer_labels:
-                vague_count += 1
-            elif value in not_vague_answer_labels:
-                not_vague_count += 1
-            else:
-                LOGGER.warning('Found unknown answer="%s" for requirement="%s".', value, requirement)
-
-        # Build map
-        if requirement not in requirements_to_label_map:
-            requirements_to_label_map[requirement] = {'vague_count': 0, 'not_vague_count': 0}
-
-        requirements_to_label_map[requirement]['vague_count'] += vague_count
-        requirements_to_label_map[requirement]['not_vague_count'] += not_vague_count
-
-    # Build data frame
-    req_list = [
-        [requirement, None]
-        for requirement, counts in requirements_to_label_map.items()
-        if counts['vague_count'] == counts['not_vague_count']
-    ]
-    LOGGER.info('Found %s requirements with ties in votes.', len(req_list))
-
-    result = pd.DataFrame(req_list, columns=[MTURK_REQUIREMENT_COLUMN, MTURK_ANSWER_COLUMN])
-
-    LOGGER.info('Built data frame containing only ties with %s of %s requirements. ', result.shape[0], len(requirements_to_label_map.items()))
+    LOGGER.info('Built data frame containing only ties with %s of %s requirements. ', result.shape[0], vote_counts.counts.shape[0])
 
     return result
 
@@ -5,11 +5,8 @@
 
 import logging
 import sys
-import csv
 
-import numpy as np
-
-from vaguerequirementslib.read_csv import read_csv_file
+from vaguerequirementslib.corpus_slicer import slice_corpus
 
 logging.basicConfig(
     format='%(asctime)s [%(name)-20.20s] [%(levelname)-5.5s]  %(message)s',
@@ -19,7 +16,6 @@ logging.basicConfig(
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.DEBUG)
 
- #pylint:disable=invalid-name
 
 def main():
     corpus_file = '../../../Desktop/Masters_Thesis/datasets/corpus/raw/requirement-corpus-all.csv'  # Corpus
@@ -29,13 +25,7 @@ def main():
     batch_size = 100
     LOGGER.info('Slice corpus in batches of size="%s".', batch_size)
 
-    LOGGER.info('Read corpus.')
-    df = read_csv_file(corpus_file, separator=';').groupby('label').get_group('requirement')
-    # The raw df contains duplicates of requirements
-    df = df.drop_duplicates()
-    for k, batch in df.groupby(np.arange(len(df))//batch_size):
-        batch = batch.rename(columns={'sentence': 'requirement'})
-        batch.to_csv(f'./corpus1/corpus-batch-{k}.csv', sep=separator, index=False, quoting=csv.QUOTE_NONNUMERIC, columns=['requirement'])
+    slice_corpus(corpus_file, './corpus1', separator=separator, batch_size=batch_size)
 
 
 if __name__ == '__main__':
@@ -3,20 +3,114 @@
 #  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
 # ------------------------------------------------------------------------------------------------------
 
-from .confusion_matrix import build_confusion_matrix
+# The submodules are imported on first attribute access (PEP 562) so that importing the package or its constants
+# does not pull in pandas and numpy. Only the constants are imported eagerly since they have no dependencies.
+
+from typing import TYPE_CHECKING
+
 from .constants import *
-from .kappa import calculate_fleiss_kappa, calculate_free_marginal_kappa
-from .majority_label import calc_majority_label
-from .read_csv import read_csv_file, read_csv_files, read_csv_files_iterator
-from .metrics import \
-    calc_all_metrics, \
-    calc_accuracy, \
-    calc_precision, \
-    calc_recall, \
-    calc_specificity, \
-    calc_false_positive_rate, \
-    calc_false_negative_rate, \
-    calc_f1_score, \
-    calc_average_precision_k, \
-    calc_mean_average_precision
-from .prediction import predict_with_threshold
+from . import constants as _constants
+
+if TYPE_CHECKING:
+    # Static imports of the lazy attributes for linters and type checkers. Keep them in sync with _LAZY_ATTRIBUTES.
+    from .comparison import compare_label_sources, SourceComparison
+    from .confusion_matrix import build_confusion_matrix, build_category_counts, build_confusion_matrix_from_counts, aggregate_votes, ConfusionMatrixAggregator, VoteCounts
+    from .csv_converter import convert_csv_file, convert_csv_files
+    from .corpus_slicer import slice_corpus
+    from .dawid_skene import calc_dawid_skene_labels, DawidSkeneResult
+    from .evaluation_index import EvaluationIndex
+    from .grid_search import parse_evaluation_file, parse_evaluation_files, find_best_runs
+    from .worker_agreement import calc_worker_agreement
+    from .kappa import calculate_fleiss_kappa, calculate_free_marginal_kappa, calculate_kappas, calculate_kappa_confidence_interval, KappaConfidenceInterval
+    from .majority_label import calc_majority_label
+    from .read_csv import read_csv_file, read_csv_files, read_csv_files_iterator, read_csv_file_chunks
+    from .requirement_index import RequirementIndex
+    from .metrics import \
+        calc_all_metrics, \
+        calc_accuracy, \
+        calc_precision, \
+        calc_recall, \
+        calc_specificity, \
+        calc_false_positive_rate, \
+        calc_false_negative_rate, \
+        calc_f1_score, \
+        calc_average_precision_k, \
+        calc_mean_average_precision, \
+        calc_average_precision_at_ks
+    from .prediction import predict_with_threshold, sweep_thresholds
+    from .vote_store import VoteStore
+    from .token_cache import TokenCache, TokenizedTexts
+    from .word_count import count_words
+    from . import instrumentation
+
+# Maps each public name to the submodule defining it
+_LAZY_ATTRIBUTES = {
+    **dict.fromkeys(['compare_label_sources', 'SourceComparison'], 'comparison'),
+    **dict.fromkeys([
+        'build_confusion_matrix',
+        'build_category_counts',
+        'build_confusion_matrix_from_counts',
+        'aggregate_votes',
+        'ConfusionMatrixAggregator',
+        'VoteCounts'
+    ], 'confusion_matrix'),
+    **dict.fromkeys(['convert_csv_file', 'convert_csv_files'], 'csv_converter'),
+    **dict.fromkeys(['slice_corpus'], 'corpus_slicer'),
+    **dict.fromkeys(['calc_dawid_skene_labels', 'DawidSkeneResult'], 'dawid_skene'),
+    **dict.fromkeys(['EvaluationIndex'], 'evaluation_index'),
+    **dict.fromkeys(['parse_evaluation_file', 'parse_evaluation_files', 'find_best_runs'], 'grid_search'),
+    **dict.fromkeys(['calc_worker_agreement'], 'worker_agreement'),
+    **dict.fromkeys([
+        'calculate_fleiss_kappa',
+        'calculate_free_marginal_kappa',
+        'calculate_kappas',
+        'calculate_kappa_confidence_interval',
+        'KappaConfidenceInterval'
+    ], 'kappa'),
+    **dict.fromkeys(['calc_majority_label'], 'majority_label'),
+    **dict.fromkeys(['read_csv_file', 'read_csv_files', 'read_csv_files_iterator', 'read_csv_file_chunks'], 'read_csv'),
+    **dict.fromkeys(['RequirementIndex'], 'requirement_index'),
+    **dict.fromkeys([
+        'calc_all_metrics',
+        'calc_accuracy',
+        'calc_precision',
+        'calc_recall',
+        'calc_specificity',
+        'calc_false_positive_rate',
+        'calc_false_negative_rate',
+        'calc_f1_score',
+        'calc_average_precision_k',
+        'calc_mean_average_precision',
+        'calc_average_precision_at_ks'
+    ], 'metrics'),
+    **dict.fromkeys(['predict_with_threshold', 'sweep_thresholds'], 'prediction'),
+    **dict.fromkeys(['VoteStore'], 'vote_store'),
+    **dict.fromkeys(['TokenCache', 'TokenizedTexts'], 'token_cache'),
+    **dict.fromkeys(['count_words'], 'word_count')
+}
+
+_SUBMODULES = {*_LAZY_ATTRIBUTES.values(), 'constants', 'instrumentation'}
+
+__all__ = [name for name in dir(_constants) if name.isupper()] + list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(_import_submodule(_LAZY_ATTRIBUTES[name]), name)
+    elif name in _SUBMODULES:
+        value = _import_submodule(name)
+    else:
+        raise AttributeError(f'module "{__name__}" has no attribute "{name}"')
+
+    # Cache the value so that __getattr__ is only called on first access
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY_ATTRIBUTES, *_SUBMODULES})
+
+
+def _import_submodule(name: str):
+    # Equivalent to "from . import <name>". Unlike importlib.import_module it is timed by "python -X importtime".
+    return __import__(name, globals(), level=1)
@@ -0,0 +1,165 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from typing import Callable, Iterable, Iterator, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024**3
+
+# SQLite limits the number of parameters of a statement (to 999 before version 3.32)
+_SQLITE_QUERY_CHUNK_SIZE = 500
+
+_SQLITE_META_SCHEMA = 'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);'
+
+
+class FileCache:
+    """
+    A size bounded directory of cache files.
+    Entries are written atomically. If the directory exceeds max_bytes the least recently used entries are evicted.
+
+    Args:
+        directory (str): The cache directory. It is created if it does not exist.
+        max_bytes (int, optional): The maximum size of all entries. Defaults to DEFAULT_CACHE_MAX_BYTES.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str, suffix: str) -> Optional[str]:
+        """
+        Get the path of a cached entry and mark it as recently used.
+
+        Args:
+            key (str): The entry key.
+            suffix (str): The file suffix of the entry.
+
+        Returns:
+            Optional[str]: The path of the entry or None if it is not cached.
+        """
+        entry_path = self._entry_path(key, suffix)
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        return entry_path
+
+    def put(self, key: str, suffix: str, write: Callable[[str], None]) -> str:
+        """
+        Add an entry to the cache and evict old entries if required.
+
+        Args:
+            key (str): The entry key.
+            suffix (str): The file suffix of the entry.
+            write (Callable[[str], None]): Writes the entry to the given path.
+
+        Returns:
+            str: The path of the entry.
+        """
+        entry_path = self._entry_path(key, suffix)
+        temp_path = f'{entry_path}.{os.getpid()}.tmp'
+        try:
+            write(temp_path)
+            os.replace(temp_path, entry_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self.evict()
+        return entry_path
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache is not larger than max_bytes.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+                LOGGER.debug('Evicted cache entry="%s".', entry_path)
+            except FileNotFoundError:
+                pass  # Already evicted by a concurrent writer
+            total_bytes -= size
+
+    def _entry_path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+
+class SQLiteStore:
+    """
+    The base of the stores backed by an SQLite database. It creates the schema and a "meta" table of key value pairs
+    and closes the database when used as a context manager.
+
+    Args:
+        database_path (str): The SQLite database file. It is created if it does not exist.
+        schema (str): The SQL script creating the tables of the store.
+    """
+
+    def __init__(self, database_path: str, schema: str):
+        self._connection = sqlite3.connect(database_path)
+        with self._connection:
+            self._connection.executescript(_SQLITE_META_SCHEMA + schema)
+
+    def __enter__(self) -> 'SQLiteStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def _check_version(self, key: str, version: int, tables: Iterable[str]) -> None:
+        """
+        Clear the tables if the version stored under the key differs from the given version and store the given version.
+        """
+        stored_version = self._get_meta(key)
+        if stored_version is not None and int(stored_version) == version:
+            return
+        if stored_version is not None:
+            LOGGER.info('Version "%s" changed from %s to %s. Clear the tables %s.', key, stored_version, version, tables)
+            for table in tables:
+                self._connection.execute(f'DELETE FROM {table}')
+        self._set_meta(key, str(version))
+
+    def _select_in(self, query: str, values: list) -> Iterator[tuple]:
+        """
+        Run the query for chunks of the values so that the number of parameters stays within SQLite's limit.
+        The query ends with the compared expression, e.g. "SELECT id FROM requirements WHERE text", and " IN (...)" is appended.
+        """
+        for start in range(0, len(values), _SQLITE_QUERY_CHUNK_SIZE):
+            chunk = values[start:start + _SQLITE_QUERY_CHUNK_SIZE]
+            yield from self._connection.execute(f'{query} IN ({", ".join("?" * len(chunk))})', chunk)
+
+
+def build_cache_key(*parts) -> str:
+    """
+    Build a cache key by hashing the JSON representation of the given parts.
+
+    Returns:
+        str: The hex digest of the parts.
+    """
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf8')).hexdigest()
@@ -0,0 +1,97 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .requirement_index import RequirementIndex
+
+LOGGER = logging.getLogger(__name__)
+
+
+def encode_categories(answers: pd.Series, valid_requirements: np.ndarray, label_to_category: dict) -> np.ndarray:
+    """
+    Map the answers to category codes. Unknown and missing answers get the code -1.
+    Each distinct answer is looked up only once.
+
+    Args:
+        answers (pd.Series): The answers/labels.
+        valid_requirements (np.ndarray): Mask of the answers that belong to a requirement. Only those are reported if unknown.
+        label_to_category (dict): Maps each answer/label to its category code (see build_label_to_category_map).
+
+    Returns:
+        np.ndarray: The category code of each answer.
+    """
+    answer_codes, unique_answers = pd.factorize(answers)
+
+    # Map each distinct answer to its category once. The appended -1 handles missing answers (code -1).
+    answer_to_category = np.array([label_to_category.get(answer, -1) for answer in unique_answers] + [-1], dtype=np.int64)
+    category_codes = answer_to_category[answer_codes]
+
+    unknown_answers = valid_requirements & (category_codes < 0)
+    if unknown_answers.any():
+        unknown_values = pd.unique(answers.to_numpy()[unknown_answers])
+        LOGGER.warning('Found %s unknown answers. Unknown answer values=%s.', int(unknown_answers.sum()), list(unknown_values))
+
+    return category_codes
+
+
+def count_categories(requirement_codes: np.ndarray, requirements_count: int, category_codes: np.ndarray, category_count: int) -> np.ndarray:
+    """
+    Count all (requirement, category) pairs with a single bincount.
+    Pairs with a negative requirement or category code are skipped.
+
+    Args:
+        requirement_codes (np.ndarray): The requirement code of each answer.
+        requirements_count (int): The number of requirement codes.
+        category_codes (np.ndarray): The category code of each answer.
+        category_count (int): The number of categories.
+
+    Returns:
+        np.ndarray: The counts of shape (requirements_count x category_count)
+    """
+    valid = (requirement_codes >= 0) & (category_codes >= 0)
+    flat_codes = requirement_codes[valid].astype(np.int64) * category_count + category_codes[valid]
+    return np.bincount(flat_codes, minlength=requirements_count * category_count).reshape(requirements_count, category_count)
+
+
+def build_counts_frame(counts: np.ndarray, requirement_ids: np.ndarray, requirement_index: RequirementIndex, requirement_column: str, categories: dict) -> pd.DataFrame:
+    """
+    Select the counts of the given requirement IDs and re-attach the requirement texts sorted by text.
+
+    Args:
+        counts (np.ndarray): The counts (requirement IDs x categories).
+        requirement_ids (np.ndarray): The requirement IDs to select.
+        requirement_index (RequirementIndex): The index assigning the requirement IDs.
+        requirement_column (str): The name of the requirement index.
+        categories (dict): The categories whose names become the columns.
+
+    Returns:
+        pd.DataFrame: The counts indexed by the (sorted) requirements with one column per category.
+    """
+    requirements = requirement_index.decode(requirement_ids)
+    order = np.argsort(requirements, kind='stable')
+    return pd.DataFrame(counts[requirement_ids[order]], index=pd.Index(requirements[order], name=requirement_column), columns=list(categories))
+
+
+def build_label_to_category_map(categories: dict) -> dict:
+    """
+    Map each answer/label to the code of its category. The codes follow the order of the categories.
+
+    Args:
+        categories (dict): Maps each category name to the answers/labels of it.
+
+    Returns:
+        dict: The category code per answer/label.
+    """
+    label_to_category = {}
+    for category_code, labels in enumerate(categories.values()):
+        for label in labels:
+            if label in label_to_category:
+                raise ValueError(f'Answer label="{label}" is assigned to more than one category.')
+            label_to_category[label] = category_code
+    return label_to_category
@@ -0,0 +1,121 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import logging
+from typing import Iterable, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .category_counts import build_counts_frame, build_label_to_category_map, count_categories, encode_categories
+from .confusion_matrix import build_confusion_matrix_from_counts
+from .constants import CM_REQUIREMENT_COLUMN, CM_VAGUE_COUNT_COLUMN, CM_NOT_VAGUE_COUNT_COLUMN, MAJORITY_LABEL_COLUMN, VAGUE_LABEL, NOT_VAGUE_LABEL
+from .instrumentation import instrumented
+from .kappa import calculate_fleiss_kappa, calculate_free_marginal_kappa
+from .requirement_index import RequirementIndex
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SourceComparison(NamedTuple):
+    confusion_matrix: pd.DataFrame  # The labels of all sources as votes per requirement rated by every source
+    requirements_count: int
+    unequal_label_count: int
+    unequal_label_percentage: float
+    fleiss_kappa: float
+    free_marginal_kappa: float
+
+
+@instrumented
+def compare_label_sources(
+        sources: Iterable[pd.DataFrame],
+        requirement_column: str = CM_REQUIREMENT_COLUMN,
+        label_column: str = MAJORITY_LABEL_COLUMN,
+        categories: dict = None,
+        requirement_index: RequirementIndex = None) -> SourceComparison:
+    """
+    Compare any number of label sources (e.g. the majority labels of several batches) using each source as one rater.
+    Only requirements labeled by every source are compared. They are found by counting the sources per requirement ID,
+    so no per requirement sub-frames are built.
+
+    Args:
+        sources (Iterable[pd.DataFrame]): The label sources. Each one contains one label per requirement.
+        requirement_column (str, optional): The columns name that contains the requirements. Defaults to CM_REQUIREMENT_COLUMN.
+        label_column (str, optional): The columns name that contains the labels. Defaults to MAJORITY_LABEL_COLUMN.
+        categories (dict, optional): Maps each count column name to the labels counted in it.
+            Defaults to None which counts VAGUE_LABEL as CM_VAGUE_COUNT_COLUMN and NOT_VAGUE_LABEL as CM_NOT_VAGUE_COUNT_COLUMN.
+        requirement_index (RequirementIndex, optional): The index assigning the requirement IDs. Defaults to None which uses a new index.
+
+    Returns:
+        SourceComparison: The confusion matrix of the common requirements, the share of requirements with unequal labels and both kappas.
+    """
+    if categories is None:
+        categories = {CM_VAGUE_COUNT_COLUMN: [VAGUE_LABEL], CM_NOT_VAGUE_COUNT_COLUMN: [NOT_VAGUE_LABEL]}
+    if requirement_index is None:
+        requirement_index = RequirementIndex()
+
+    counts, source_counts, sources_count = _count_source_labels(sources, requirement_column, label_column, categories, requirement_index)
+
+    common_requirement_ids = np.flatnonzero(source_counts == sources_count)
+    LOGGER.info('Compare %s sources on %s of %s requirements labeled by every source.', sources_count, common_requirement_ids.shape[0], source_counts.shape[0])
+
+    counts_frame = build_counts_frame(counts, common_requirement_ids, requirement_index, requirement_column, categories)
+    return SourceComparison(
+        confusion_matrix=build_confusion_matrix_from_counts(counts_frame),
+        **_calc_agreement(counts[common_requirement_ids]))
+
+
+def _count_source_labels(sources: Iterable[pd.DataFrame], requirement_column: str, label_column: str, categories: dict, requirement_index: RequirementIndex) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Count the labels of all sources per requirement ID and category and the number of sources labeling each requirement.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, int]: The counts (requirement IDs x categories), the sources per requirement ID and the number of sources.
+    """
+    label_to_category = build_label_to_category_map(categories)
+
+    counts = np.zeros((0, len(categories)), dtype=np.int64)
+    source_counts = np.zeros(0, dtype=np.int64)
+    sources_count = 0
+    for source in sources:
+        requirement_ids = requirement_index.encode(source[requirement_column])
+        category_codes = encode_categories(source[label_column], requirement_ids >= 0, label_to_category)
+
+        requirements_count = len(requirement_index)
+        counts = np.pad(counts, ((0, requirements_count - counts.shape[0]), (0, 0)))
+        source_counts = np.pad(source_counts, (0, requirements_count - source_counts.shape[0]))
+
+        counts += count_categories(requirement_ids, requirements_count, category_codes, len(categories))
+        source_counts[np.unique(requirement_ids[requirement_ids >= 0])] += 1
+        sources_count += 1
+
+    return counts, source_counts, sources_count
+
+
+def _calc_agreement(common_counts: np.ndarray) -> dict:
+    """
+    Calculate the share of requirements with unequal labels and both kappas of the common requirements.
+
+    Returns:
+        dict: The SourceComparison fields except the confusion matrix.
+    """
+    unequal_label_count = int(((common_counts > 0).sum(axis=1) > 1).sum())
+    requirements_count = common_counts.shape[0]
+    unequal_label_percentage = unequal_label_count / requirements_count * 100 if requirements_count else float('nan')
+    LOGGER.info('Overall requirements="%s". Equal label="%s". Unequal label="%s".', requirements_count, requirements_count - unequal_label_count, unequal_label_count)
+    LOGGER.info('Percentage of unequally labeled requirements="%s".', unequal_label_percentage)
+
+    fleiss_kappa = calculate_fleiss_kappa(common_counts)
+    LOGGER.info('Calculated Fleiss\' kappa = %s.', fleiss_kappa)
+    free_marginal_kappa = calculate_free_marginal_kappa(common_counts)
+    LOGGER.info('Calculated free kappa k_free = %s.', free_marginal_kappa)
+
+    return {
+        'requirements_count': requirements_count,
+        'unequal_label_count': unequal_label_count,
+        'unequal_label_percentage': unequal_label_percentage,
+        'fleiss_kappa': fleiss_kappa,
+        'free_marginal_kappa': free_marginal_kappa
+    }
@@ -5,21 +5,29 @@
 
 import logging
 
+import numpy as np
 import pandas as pd
 
+from .category_counts import build_counts_frame, build_label_to_category_map, count_categories, encode_categories
 from .constants import MTURK_ANSWER_COLUMN, MTURK_REQUIREMENT_COLUMN, MTURK_VAGUE_ANSWER_LABELS, MTURK_NOT_VAGUE_ANSWER_LABELS, CM_REQUIREMENT_COLUMN, CM_VAGUE_COUNT_COLUMN, CM_NOT_VAGUE_COUNT_COLUMN
+from .instrumentation import add_diagnostics, diagnostics_enabled, instrumented
+from .majority_label import calc_majority_label, TIE_POLICY_DROP, TIE_POLICY_PREFER
+from .requirement_index import RequirementIndex
 
 LOGGER = logging.getLogger(__name__)
 
 # pylint: disable= too-many-arguments, too-many-locals
 
+@instrumented
 def build_confusion_matrix(
         data_frame: pd.DataFrame,
         requirement_column: str = MTURK_REQUIREMENT_COLUMN,
         answer_column: str = MTURK_ANSWER_COLUMN,
         vague_answer_labels: list = MTURK_VAGUE_ANSWER_LABELS,
         not_vague_answer_labels: list = MTURK_NOT_VAGUE_ANSWER_LABELS,
-        drop_ties: bool = False) -> pd.DataFrame:
+        drop_ties: bool = False,
+        categories: dict = None,
+        requirement_index: RequirementIndex = None) -> pd.DataFrame:
     """
     Build a confusion matrix of the given data_frame.
     The defaults are set to handle an Amazon MTurk Batch Result data frame.
@@ -31,60 +39,263 @@ def build_confusion_matrix(
         vague_answer_labels (list, optional): List of answers/labels that indicate a vague requirement. Defaults to MTURK_VAGUE_ANSWER_LABELS.
         not_vague_answer_labels (list, optional): List of answers/labels that indicate a non vague requirement. Defaults to MTURK_NOT_VAGUE_ANSWER_LABELS.
         drop_ties (bool, optional): If there is a tie in votes (e.g.: One votes for vague one for not vague) then drop this entry from the confusion matrix.
+        categories (dict, optional): Maps each count column name to the answers/labels counted in it.
+            If set, vague_answer_labels and not_vague_answer_labels are ignored.
+            E.g.: {'vague_count': ('1 - Yes, it is vague',), 'not_vague_count': ('2 - No, it is not vague',), 'cannot_decide_count': ('3 - Cannot decide',)}
+        requirement_index (RequirementIndex, optional): Aggregate on the stable requirement IDs of this index. Defaults to None.
 
     Returns:
         pd.DataFrame: The confusion matrix
     """
 
     LOGGER.info('Build confusion matrix.')
-    requirements_to_label_map = {}
+    if categories is None:
+        categories = {
+            CM_VAGUE_COUNT_COLUMN: vague_answer_labels,
+            CM_NOT_VAGUE_COUNT_COLUMN: not_vague_answer_labels
+        }
 
-    # Group data by requirement.
-    grouped_data = data_frame.groupby(requirement_column)
+    return aggregate_votes(data_frame, requirement_column, answer_column, categories, requirement_index).confusion_matrix(drop_ties)
 
-    for requirement, group in grouped_data:
-        # print(requirement)
-        # print(group[MTURK_ANSWER_COLUMN])
 
-        # Answered Is vague
-        vague_count = 0
-        # Answered Is not vague
-        not_vague_count = 0
+@instrumented
+def aggregate_votes(
+        data_frame: pd.DataFrame,
+        requirement_column: str = MTURK_REQUIREMENT_COLUMN,
+        answer_column: str = MTURK_ANSWER_COLUMN,
+        categories: dict = None,
+        requirement_index: RequirementIndex = None) -> 'VoteCounts':
+    """
+    Count the votes of the given data_frame in a single pass.
+    The confusion matrix, the ties, the majority labels and the vote totals can all be derived from the result without scanning the data again.
+    The defaults are set to handle an Amazon MTurk Batch Result data frame.
 
-        # Loop all answers for this requirement
-        for value in group[answer_column]:
+    Args:
+        data_frame (pd.DataFrame): The data frame
+        requirement_column (str, optional): The columns name that contains the requirements. Defaults to MTURK_REQUIREMENT_COLUMN.
+        answer_column (str, optional): The columns name that contains the answers/labels. Defaults to MTURK_ANSWER_COLUMN.
+        categories (dict, optional): Maps each count column name to the answers/labels counted in it.
+            Defaults to None which counts MTURK_VAGUE_ANSWER_LABELS and MTURK_NOT_VAGUE_ANSWER_LABELS.
+        requirement_index (RequirementIndex, optional): Aggregate on the stable requirement IDs of this index. Defaults to None.
 
-            # Count score
-            if value in vague_answer_labels:
-                vague_count += 1
-            elif value in not_vague_answer_labels:
-                not_vague_count += 1
-            else:
-                LOGGER.warning('Found unknown answer="%s" for requirement="%s".', value, requirement)
+    Returns:
+        VoteCounts: The vote counts
+    """
+    if categories is None:
+        categories = {
+            CM_VAGUE_COUNT_COLUMN: MTURK_VAGUE_ANSWER_LABELS,
+            CM_NOT_VAGUE_COUNT_COLUMN: MTURK_NOT_VAGUE_ANSWER_LABELS
+        }
+    return VoteCounts(build_category_counts(data_frame, requirement_column, answer_column, categories, requirement_index))
 
-        # Build map
-        if requirement not in requirements_to_label_map:
-            requirements_to_label_map[requirement] = {'vague_count': 0, 'not_vague_count': 0}
 
-        requirements_to_label_map[requirement]['vague_count'] += vague_count
-        requirements_to_label_map[requirement]['not_vague_count'] += not_vague_count
+class VoteCounts:
+    """
+    The vote counts per requirement and category of one aggregation pass.
+    All views are derived from these counts, so a pipeline that needs several of them scans the raw data only once.
 
-    # Build data frame
-    if drop_ties:
-        req_list = [
-            [requirement, counts['vague_count'], counts['not_vague_count']]
-            for requirement, counts in requirements_to_label_map.items()
-            if counts['vague_count'] != counts['not_vague_count']
-        ]
-        LOGGER.info('Dropped %s requirements due to ties.', len(requirements_to_label_map.items()) - len(req_list))
+    Args:
+        counts (pd.DataFrame): The counts indexed by the requirements with one column per category.
+    """
+
+    def __init__(self, counts: pd.DataFrame):
+        self.counts = counts
+
+    def confusion_matrix(self, drop_ties: bool = False) -> pd.DataFrame:
+        """
+        Build the confusion matrix.
+
+        Args:
+            drop_ties (bool, optional): If there is a tie in votes (e.g.: One votes for vague one for not vague) then drop this entry from the confusion matrix.
+
+        Returns:
+            pd.DataFrame: The confusion matrix
+        """
+        return build_confusion_matrix_from_counts(self.counts, drop_ties)
+
+    def ties(self) -> pd.Index:
+        """
+        Get the requirements whose highest vote count is shared by at least two categories.
+
+        Returns:
+            pd.Index: The tied requirements
+        """
+        ties = self.counts.index[_is_tie(self.counts.to_numpy())]
+        LOGGER.info('Found %s requirements with ties in votes.', len(ties))
+        return ties
+
+    def majority_labels(self, prefer_vague: bool = True, drop_ties: bool = False, label_columns: dict = None, tie_policy: str = TIE_POLICY_PREFER) -> pd.DataFrame:
+        """
+        Calculate the majority label of each requirement. See calc_majority_label for the tie handling.
+
+        Args:
+            prefer_vague (bool, optional): Indicates whether for a tie in votes the majority label is "vague" or "not vague".
+            drop_ties (bool, optional): Drop tied requirements before calculating the majority label.
+            label_columns (dict, optional): Maps each count column to the label it votes for. Defaults to None.
+            tie_policy (str, optional): How to break ties. Defaults to TIE_POLICY_PREFER.
+
+        Returns:
+            pd.DataFrame: The confusion matrix including the majority label.
+        """
+        return calc_majority_label(self.confusion_matrix(drop_ties), prefer_vague=prefer_vague, label_columns=label_columns, tie_policy=tie_policy, inplace=tie_policy != TIE_POLICY_DROP)
+
+    def vote_totals(self) -> pd.Series:
+        """
+        Get the overall votes count per category.
+
+        Returns:
+            pd.Series: The votes count indexed by the category column names.
+        """
+        return self.counts.sum(axis=0)
+
+
+class ConfusionMatrixAggregator:
+    """
+    Fold data frame chunks (e.g. of read_csv_file_chunks) into the vote counts of a confusion matrix.
+    The votes are counted per requirement ID, so the memory is bounded by the number of distinct requirements.
+    The defaults are set to handle an Amazon MTurk Batch Result data frame.
+
+    Args:
+        requirement_column (str, optional): The columns name that contains the requirements. Defaults to MTURK_REQUIREMENT_COLUMN.
+        answer_column (str, optional): The columns name that contains the answers/labels. Defaults to MTURK_ANSWER_COLUMN.
+        categories (dict, optional): Maps each count column name to the answers/labels counted in it.
+            Defaults to None which counts MTURK_VAGUE_ANSWER_LABELS and MTURK_NOT_VAGUE_ANSWER_LABELS.
+        requirement_index (RequirementIndex, optional): The index assigning the requirement IDs. Defaults to None which uses a new index.
+    """
+
+    def __init__(
+            self,
+            requirement_column: str = MTURK_REQUIREMENT_COLUMN,
+            answer_column: str = MTURK_ANSWER_COLUMN,
+            categories: dict = None,
+            requirement_index: RequirementIndex = None):
+        self._requirement_column = requirement_column
+        self._answer_column = answer_column
+        self._categories = categories or {
+            CM_VAGUE_COUNT_COLUMN: MTURK_VAGUE_ANSWER_LABELS,
+            CM_NOT_VAGUE_COUNT_COLUMN: MTURK_NOT_VAGUE_ANSWER_LABELS
+        }
+        self._label_to_category = build_label_to_category_map(self._categories)
+        self._requirement_index = requirement_index if requirement_index is not None else RequirementIndex()
+        self._counts = np.zeros((0, len(self._categories)), dtype=np.int64)
+        self._seen = np.zeros(0, dtype=bool)
+
+    def update(self, data_frame: pd.DataFrame) -> None:
+        """
+        Add the votes of the given data frame chunk.
+
+        Args:
+            data_frame (pd.DataFrame): The data frame chunk
+        """
+        requirement_ids = self._requirement_index.encode(data_frame[self._requirement_column])
+        category_codes = encode_categories(data_frame[self._answer_column], requirement_ids >= 0, self._label_to_category)
+        requirements_count = len(self._requirement_index)
+
+        if requirements_count > self._counts.shape[0]:
+            # Grow geometrically to amortize copying
+            capacity = max(requirements_count, 2 * self._counts.shape[0])
+            self._counts = np.concatenate([self._counts, np.zeros((capacity - self._counts.shape[0], self._counts.shape[1]), dtype=np.int64)])
+            self._seen = np.concatenate([self._seen, np.zeros(capacity - self._seen.shape[0], dtype=bool)])
+
+        self._counts[:requirements_count] += count_categories(requirement_ids, requirements_count, category_codes, len(self._categories))
+        self._seen[requirement_ids[requirement_ids >= 0]] = True
+
+    def confusion_matrix(self, drop_ties: bool = False) -> pd.DataFrame:
+        """
+        Build the confusion matrix of all votes added so far.
+
+        Args:
+            drop_ties (bool, optional): If there is a tie in votes (e.g.: One votes for vague one for not vague) then drop this entry from the confusion matrix.
+
+        Returns:
+            pd.DataFrame: The confusion matrix
+        """
+        return self.vote_counts().confusion_matrix(drop_ties)
+
+    def vote_counts(self) -> 'VoteCounts':
+        """
+        Get the vote counts of all votes added so far.
+
+        Returns:
+            VoteCounts: The vote counts
+        """
+        return VoteCounts(build_counts_frame(self._counts, np.flatnonzero(self._seen), self._requirement_index, self._requirement_column, self._categories))
+
+
+@instrumented
+def build_category_counts(
+        data_frame: pd.DataFrame,
+        requirement_column: str,
+        answer_column: str,
+        categories: dict,
+        requirement_index: RequirementIndex = None) -> pd.DataFrame:
+    """
+    Count the answers of each requirement per category.
+    The answer labels are mapped to category codes once and all (requirement, category) pairs are counted in a single aggregation
+    on integer requirement codes. The requirement texts are only attached to the result.
+
+    Args:
+        data_frame (pd.DataFrame): The data frame
+        requirement_column (str): The columns name that contains the requirements.
+        answer_column (str): The columns name that contains the answers/labels.
+        categories (dict): Maps each count column name to the answers/labels counted in it.
+        requirement_index (RequirementIndex, optional): Aggregate on the stable IDs of this index. Defaults to None which uses transient codes.
+
+    Returns:
+        pd.DataFrame: The counts indexed by the (sorted) requirements with one column per category.
+    """
+    label_to_category = build_label_to_category_map(categories)
+
+    if requirement_index is None:
+        requirement_codes, requirements = pd.factorize(data_frame[requirement_column], sort=True)
     else:
-        req_list = [[requirement, counts['vague_count'], counts['not_vague_count']] for requirement, counts in requirements_to_label_map.items()]
+        requirement_codes = requirement_index.encode(data_frame[requirement_column])
+
+    category_codes = encode_categories(data_frame[answer_column], requirement_codes >= 0, label_to_category)
 
-    result = pd.DataFrame(req_list, columns=[CM_REQUIREMENT_COLUMN, CM_VAGUE_COUNT_COLUMN, CM_NOT_VAGUE_COUNT_COLUMN])
+    if requirement_index is None:
+        counts = count_categories(requirement_codes, len(requirements), category_codes, len(categories))
+        return pd.DataFrame(counts, index=pd.Index(requirements, name=requirement_column), columns=list(categories))
 
-    LOGGER.info('Built confusion matrix including %s of %s requirements. ', result.shape[0], len(requirements_to_label_map.items()))
+    counts = count_categories(requirement_codes, len(requirement_index), category_codes, len(categories))
+    return build_counts_frame(counts, np.unique(requirement_codes[requirement_codes >= 0]), requirement_index, requirement_column, categories)
 
-    sums = result.sum(axis=0, numeric_only=True)
-    LOGGER.info('Overall "vague" votes count = %s. Overall "not vague" votes count = %s', sums[CM_VAGUE_COUNT_COLUMN], sums[CM_NOT_VAGUE_COUNT_COLUMN])
+
+@instrumented
+def build_confusion_matrix_from_counts(counts: pd.DataFrame, drop_ties: bool = False) -> pd.DataFrame:
+    """
+    Build a confusion matrix of already aggregated vote counts.
+
+    Args:
+        counts (pd.DataFrame): The counts indexed by the requirements with one column per category.
+        drop_ties (bool, optional): If there is a tie in votes (e.g.: One votes for vague one for not vague) then drop this entry from the confusion matrix.
+
+    Returns:
+        pd.DataFrame: The confusion matrix
+    """
+    requirements_count = counts.shape[0]
+
+    if drop_ties:
+        counts = counts[~_is_tie(counts.to_numpy())]
+        LOGGER.info('Dropped %s requirements due to ties.', requirements_count - counts.shape[0])
+
+    result = counts.rename_axis(CM_REQUIREMENT_COLUMN).reset_index()
+
+    LOGGER.info('Built confusion matrix including %s of %s requirements. ', result.shape[0], requirements_count)
+
+    if diagnostics_enabled(LOGGER):
+        sums = counts.sum(axis=0)
+        LOGGER.info('Overall votes count per category: %s.', ', '.join(f'"{column}" = {value}' for column, value in sums.items()))
+        add_diagnostics(votes_per_category={column: int(value) for column, value in sums.items()})
 
     return result
+
+
+def _is_tie(counts: np.ndarray) -> np.ndarray:
+    """
+    Indicate for each row whether the highest vote count is shared by at least two categories.
+    """
+    if counts.shape[1] < 2:
+        return np.zeros(counts.shape[0], dtype=bool)
+    top_two = np.sort(counts, axis=1)[:, -2:]
+    return top_two[:, 0] == top_two[:, 1]
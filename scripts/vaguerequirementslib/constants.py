@@ -7,13 +7,18 @@
 CM_VAGUE_COUNT_COLUMN = 'vague_count'
 CM_NOT_VAGUE_COUNT_COLUMN = 'not_vague_count'
 CM_REQUIREMENT_COLUMN = 'requirement'
+CM_CANNOT_DECIDE_COUNT_COLUMN = 'cannot_decide_count'
 
 # MTurk related constants
 MTURK_REQUIREMENT_COLUMN = 'Input.requirement'  # The requirement column name of MTurk's batch result
 MTURK_LEGACY_ANSWER_COLUMN = 'Answer.vague-words.label'
 MTURK_ANSWER_COLUMN = 'Answer.vague-requirement.label'
+MTURK_LEGACY_COLUMNS = {MTURK_LEGACY_ANSWER_COLUMN: MTURK_ANSWER_COLUMN}  # Maps legacy column names to their current names
+MTURK_ASSIGNMENT_ID_COLUMN = 'AssignmentId'
+MTURK_WORKER_ID_COLUMN = 'WorkerId'
 MTURK_VAGUE_ANSWER_LABELS = ('1 - Yes, it is vague', '1 - Yes, contains vague words', '3 - Cannot decide')
 MTURK_NOT_VAGUE_ANSWER_LABELS = ('2 - No, it is not vague', '2 - No, contains no vague words')
+MTURK_CANNOT_DECIDE_ANSWER_LABELS = ('3 - Cannot decide',)
 
 MAJORITY_LABEL_COLUMN = 'majority_label'
 
@@ -24,3 +29,22 @@ TP = 'true_positive'
 TN = 'true_negative'
 FP = 'false_positive'
 FN = 'false_negative'
+
+THRESHOLD_COLUMN = 'threshold'
+
+# Worker agreement related constants
+WA_FIRST_WORKER_COLUMN = 'first_worker'
+WA_SECOND_WORKER_COLUMN = 'second_worker'
+WA_SHARED_ITEMS_COLUMN = 'shared_items'
+WA_AGREEMENT_COLUMN = 'agreement'
+WA_KAPPA_COLUMN = 'kappa'
+
+# Word count related constants
+WC_WORD_COLUMN = 'word'
+WC_OVERALL_COUNT_COLUMN = 'overall_count'
+WC_VAGUE_COUNT_COLUMN = 'vague_count'
+WC_NOT_VAGUE_COUNT_COLUMN = 'not_vague_count'
+WC_DIFFERENCE_COLUMN = 'difference'
+
+# Grid search related constants
+EVALUATION_FILE_COLUMN = 'file_path'
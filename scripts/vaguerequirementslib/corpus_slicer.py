@@ -0,0 +1,165 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import csv
+import hashlib
+import logging
+import os
+import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Tuple
+
+from .constants import CM_REQUIREMENT_COLUMN
+from .instrumentation import instrumented
+from .read_csv import read_csv_file_chunks
+
+LOGGER = logging.getLogger(__name__)
+
+_WRITE_BUFFER_BYTES = 1024**2
+
+# pylint: disable=too-many-arguments, too-many-locals
+
+
+@instrumented
+def slice_corpus(
+        corpus_file: str,
+        output_directory: str,
+        separator: str = ';',
+        batch_size: int = 100,
+        text_column: str = 'sentence',
+        label_column: str = 'label',
+        labels: Iterable[str] = ('requirement',),
+        stratify: bool = False,
+        shuffle_buffer_size: int = 0,
+        seed: int = None,
+        chunk_size: int = 100000,
+        max_workers: int = None) -> int:
+    """
+    Slice a raw corpus into batch CSV files with a single "requirement" column.
+    The corpus is streamed in chunks. Rows with other labels are dropped and duplicated texts are detected with a set of text digests,
+    so the memory does not depend on the corpus size but only on the number of distinct texts.
+
+    Args:
+        corpus_file (str): The raw corpus CSV file.
+        output_directory (str): The directory of the batch files. It is created if it does not exist.
+        separator (str, optional): The CSV column separator of the corpus and the batches. Defaults to ';'.
+        batch_size (int, optional): The number of rows per batch. Defaults to 100.
+        text_column (str, optional): The columns name that contains the texts. Defaults to 'sentence'.
+        label_column (str, optional): The columns name that contains the labels. Defaults to 'label'.
+        labels (Iterable[str], optional): The labels to keep. Defaults to ('requirement',).
+        stratify (bool, optional): Slice each label separately into "corpus-<label>-batch-<number>.csv" files
+            instead of "corpus-batch-<number>.csv" files. Defaults to False.
+        shuffle_buffer_size (int, optional): Shuffle the rows with a buffer of this size. A larger buffer shuffles more thoroughly.
+            Defaults to 0 which keeps the corpus order.
+        seed (int, optional): The seed for shuffling. Defaults to None.
+        chunk_size (int, optional): The number of rows read at once. Defaults to 100000.
+        max_workers (int, optional): The number of threads writing batch files. Defaults to None which writes one batch after another.
+
+    Returns:
+        int: The number of written batches.
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    labels = set(labels)
+
+    rows = _iter_unique_rows(corpus_file, separator, text_column, label_column, labels, chunk_size)
+    if shuffle_buffer_size > 0:
+        rows = _shuffle(rows, shuffle_buffer_size, random.Random(seed))
+
+    def iter_batches() -> Iterator[Tuple[str, list]]:
+        pending = {}
+        numbers = {}
+        for text, label in rows:
+            key = label if stratify else None
+            batch = pending.setdefault(key, [])
+            batch.append(text)
+            if len(batch) == batch_size:
+                yield _build_batch_path(output_directory, key, numbers), batch
+                pending[key] = []
+        for key, batch in pending.items():
+            if batch:
+                yield _build_batch_path(output_directory, key, numbers), batch
+
+    batches_count = 0
+    for _ in _write_batches(iter_batches(), separator, max_workers):
+        batches_count += 1
+
+    LOGGER.info('Wrote %s batches to directory="%s".', batches_count, output_directory)
+    return batches_count
+
+
+def _iter_unique_rows(corpus_file: str, separator: str, text_column: str, label_column: str, labels: set, chunk_size: int) -> Iterator[Tuple[str, str]]:
+    seen_digests = set()
+    read_count = 0
+    duplicate_count = 0
+    # Read the texts as strings, otherwise a chunk of numeric sentences is parsed as numbers
+    chunks = read_csv_file_chunks(
+        corpus_file,
+        separator,
+        columns=(text_column, label_column),
+        categorical_columns=(label_column,),
+        chunk_size=chunk_size,
+        string_columns=(text_column,))
+    for chunk in chunks:
+        read_count += chunk.shape[0]
+        chunk = chunk[chunk[label_column].isin(labels) & chunk[text_column].notna()]
+        for text, label in zip(chunk[text_column].tolist(), chunk[label_column].tolist()):
+            digest = hashlib.blake2b(text.encode('utf8'), digest_size=16).digest()
+            if digest in seen_digests:
+                duplicate_count += 1
+                continue
+            seen_digests.add(digest)
+            yield text, label
+
+    LOGGER.info('Read %s rows. Kept %s distinct texts and dropped %s duplicates.', read_count, len(seen_digests), duplicate_count)
+
+
+def _shuffle(items: Iterator, buffer_size: int, rng: random.Random) -> Iterator:
+    """
+    Shuffle a stream with a bounded buffer. Each new item replaces a random buffered item which is emitted.
+    """
+    buffer = []
+    for item in items:
+        if len(buffer) < buffer_size:
+            buffer.append(item)
+            continue
+        position = rng.randrange(buffer_size)
+        yield buffer[position]
+        buffer[position] = item
+
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+def _build_batch_path(output_directory: str, label: str, numbers: dict) -> str:
+    number = numbers.get(label, 0)
+    numbers[label] = number + 1
+    file_name = f'corpus-batch-{number}.csv' if label is None else f'corpus-{label}-batch-{number}.csv'
+    return os.path.join(output_directory, file_name)
+
+
+def _write_batches(batches: Iterator[Tuple[str, list]], separator: str, max_workers: int) -> Iterator[str]:
+    if not max_workers or max_workers <= 1:
+        for file_path, texts in batches:
+            yield _write_batch(file_path, texts, separator)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Bound the number of pending batches so that the memory stays bounded if writing is slower than reading
+        pending = deque()
+        for file_path, texts in batches:
+            pending.append(executor.submit(_write_batch, file_path, texts, separator))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _write_batch(file_path: str, texts: list, separator: str) -> str:
+    with open(file_path, 'w', newline='', encoding='utf8', buffering=_WRITE_BUFFER_BYTES) as batch_file:
+        writer = csv.writer(batch_file, delimiter=separator, quoting=csv.QUOTE_NONNUMERIC, lineterminator='\n')
+        writer.writerow([CM_REQUIREMENT_COLUMN])
+        writer.writerows([text] for text in texts)
+    return file_path
@@ -0,0 +1,166 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import csv
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, Optional, Tuple
+
+from .constants import MTURK_LEGACY_COLUMNS
+from .instrumentation import instrumented
+
+LOGGER = logging.getLogger(__name__)
+
+_HASH_BUFFER_BYTES = 1024**2
+_MANIFEST_VERSION = 1
+
+# pylint: disable=too-many-arguments
+
+
+@instrumented
+def convert_csv_files(
+        file_paths: Iterable[str],
+        output_directory: str = None,
+        source_separator: str = ';',
+        target_separator: str = ',',
+        manifest_file: str = None,
+        max_workers: int = None) -> int:
+    """
+    Convert CSV files to the separator and quoting of the batch files. Legacy column names are renamed like in read_csv_file.
+    The rows are streamed and every target file is written to a temporary file first and then renamed, so a crash never leaves a partial file.
+    With a manifest the content hashes of the converted files are stored and files that did not change since their conversion are skipped.
+
+    Args:
+        file_paths (Iterable[str]): The source CSV files.
+        output_directory (str, optional): The directory of the converted files. Defaults to None which converts the files in place.
+        source_separator (str, optional): The CSV column separator of the source files. Defaults to ';'.
+        target_separator (str, optional): The CSV column separator of the converted files. Defaults to ','.
+        manifest_file (str, optional): The JSON manifest of the converted files. Defaults to None which converts all files.
+        max_workers (int, optional): The number of worker processes. Defaults to None which converts one file after another.
+
+    Returns:
+        int: The number of converted files. Skipped files are not counted.
+    """
+    if output_directory is not None:
+        os.makedirs(output_directory, exist_ok=True)
+    manifest = _load_manifest(manifest_file)
+
+    jobs = []
+    for file_path in file_paths:
+        source_path = os.path.abspath(file_path)
+        target_path = source_path if output_directory is None else os.path.abspath(os.path.join(output_directory, os.path.basename(file_path)))
+        jobs.append((source_path, target_path, manifest.get(target_path)))
+
+    convert = partial(_convert_if_changed, source_separator=source_separator, target_separator=target_separator)
+    converted_count = 0
+    try:
+        if not max_workers or max_workers <= 1:
+            results = (convert(job) for job in jobs)
+            converted_count = _collect_results(results, manifest)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                converted_count = _collect_results(executor.map(convert, jobs), manifest)
+    finally:
+        # Keep the entries of the files converted so far even if a conversion failed
+        _save_manifest(manifest_file, manifest)
+
+    LOGGER.info('Converted %s files. Skipped %s unchanged files.', converted_count, len(jobs) - converted_count)
+    return converted_count
+
+
+@instrumented
+def convert_csv_file(source_path: str, target_path: str, source_separator: str = ';', target_separator: str = ',') -> None:
+    """
+    Convert a single CSV file row by row. See convert_csv_files.
+
+    Args:
+        source_path (str): The source CSV file.
+        target_path (str): The converted CSV file. It may be the source file.
+        source_separator (str, optional): The CSV column separator of the source file. Defaults to ';'.
+        target_separator (str, optional): The CSV column separator of the converted file. Defaults to ','.
+    """
+    temp_path = f'{target_path}.{os.getpid()}.tmp'
+    try:
+        with open(source_path, 'r', newline='', encoding='utf8') as source_file, open(temp_path, 'w', newline='', encoding='utf8') as target_file:
+            reader = csv.reader(source_file, delimiter=source_separator)
+            writer = csv.writer(target_file, delimiter=target_separator, quoting=csv.QUOTE_NONNUMERIC, lineterminator='\n')
+            header = next(reader, None)
+            if header is not None:
+                writer.writerow([MTURK_LEGACY_COLUMNS.get(column, column) for column in header])
+                writer.writerows([_to_value(cell) for cell in row] for row in reader)
+        os.replace(temp_path, target_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _convert_if_changed(job: Tuple[str, str, Optional[dict]], source_separator: str, target_separator: str) -> Tuple[str, Optional[dict]]:
+    source_path, target_path, entry = job
+    source_hash = _hash_file(source_path)
+    if entry is not None and os.path.exists(target_path):
+        # A file converted in place has the hash of its converted content
+        if source_hash in (entry['source_sha256'], entry['target_sha256']) and _hash_file(target_path) == entry['target_sha256']:
+            LOGGER.debug('Skip unchanged file="%s".', source_path)
+            return target_path, None
+
+    convert_csv_file(source_path, target_path, source_separator, target_separator)
+    LOGGER.debug('Converted file="%s" to file="%s".', source_path, target_path)
+    return target_path, {'source_sha256': source_hash, 'target_sha256': _hash_file(target_path)}
+
+
+def _collect_results(results: Iterable[Tuple[str, Optional[dict]]], manifest: dict) -> int:
+    converted_count = 0
+    for target_path, entry in results:
+        if entry is not None:
+            manifest[target_path] = entry
+            converted_count += 1
+    return converted_count
+
+
+def _to_value(cell: str):
+    """
+    Convert a cell to a number if the number is written exactly like the cell, so that it is not quoted. Empty cells become None.
+    """
+    if cell == '':
+        return None
+    for number_type in (int, float):
+        try:
+            number = number_type(cell)
+        except ValueError:
+            continue
+        return number if repr(number) == cell else cell
+    return cell
+
+
+def _hash_file(file_path: str) -> str:
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as hashed_file:
+        for block in iter(partial(hashed_file.read, _HASH_BUFFER_BYTES), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def _load_manifest(manifest_file: str) -> dict:
+    if manifest_file is None or not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, 'r', encoding='utf8') as manifest_json:
+        content = json.load(manifest_json)
+    if content.get('version') != _MANIFEST_VERSION:
+        LOGGER.info('Ignore manifest="%s" of version="%s".', manifest_file, content.get('version'))
+        return {}
+    return content['files']
+
+
+def _save_manifest(manifest_file: str, manifest: dict) -> None:
+    if manifest_file is None:
+        return
+    temp_file = f'{manifest_file}.tmp'
+    with open(temp_file, 'w', encoding='utf8') as manifest_json:
+        json.dump({'version': _MANIFEST_VERSION, 'files': manifest}, manifest_json, indent=1, sort_keys=True)
+    os.replace(temp_file, manifest_file)
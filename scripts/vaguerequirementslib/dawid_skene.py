@@ -0,0 +1,123 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import logging
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .category_counts import build_label_to_category_map, encode_categories
+from .constants import MTURK_ANSWER_COLUMN, MTURK_REQUIREMENT_COLUMN, MTURK_WORKER_ID_COLUMN, MTURK_VAGUE_ANSWER_LABELS, MTURK_NOT_VAGUE_ANSWER_LABELS, CM_REQUIREMENT_COLUMN
+from .instrumentation import instrumented
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=invalid-name, too-many-arguments, too-many-locals
+
+
+class DawidSkeneResult(NamedTuple):
+    posteriors: pd.DataFrame  # One row per requirement with a "<category>_prob" column per category
+    worker_confusion: pd.DataFrame  # P(answer | true category) indexed by (worker, true category) with one column per answered category
+    class_priors: pd.Series
+    iterations: int
+    converged: bool
+
+
+@instrumented
+def calc_dawid_skene_labels(
+        data_frame: pd.DataFrame,
+        requirement_column: str = MTURK_REQUIREMENT_COLUMN,
+        answer_column: str = MTURK_ANSWER_COLUMN,
+        worker_column: str = MTURK_WORKER_ID_COLUMN,
+        categories: dict = None,
+        max_iterations: int = 100,
+        tolerance: float = 1e-6,
+        smoothing: float = 0.01) -> DawidSkeneResult:
+    """
+    Aggregate the answers of an MTurk batch result with the Dawid-Skene EM algorithm.
+    Each worker gets a confusion matrix P(answer | true category), so reliable workers weigh more than unreliable ones.
+    The assignments are kept as sparse (requirement, worker, answer) triplets and every EM step is a bincount over them.
+    The defaults are set to handle an Amazon MTurk Batch Result data frame.
+
+    Args:
+        data_frame (pd.DataFrame): The data frame
+        requirement_column (str, optional): The columns name that contains the requirements. Defaults to MTURK_REQUIREMENT_COLUMN.
+        answer_column (str, optional): The columns name that contains the answers/labels. Defaults to MTURK_ANSWER_COLUMN.
+        worker_column (str, optional): The columns name that contains the worker IDs. Defaults to MTURK_WORKER_ID_COLUMN.
+        categories (dict, optional): Maps each category name to the answers/labels of it.
+            Defaults to None which uses the categories "vague" and "not_vague" with the MTurk answer labels.
+        max_iterations (int, optional): The maximum number of EM iterations. Defaults to 100.
+        tolerance (float, optional): Stop if the relative change of the log likelihood is below this value. Defaults to 1e-6.
+        smoothing (float, optional): Pseudo count added to each worker confusion entry. Defaults to 0.01.
+
+    Returns:
+        DawidSkeneResult: The posterior category probabilities per requirement and the confusion estimate per worker.
+    """
+    if categories is None:
+        categories = {'vague': MTURK_VAGUE_ANSWER_LABELS, 'not_vague': MTURK_NOT_VAGUE_ANSWER_LABELS}
+    category_names = list(categories)
+    K = len(category_names)
+
+    requirement_codes, requirements = pd.factorize(data_frame[requirement_column], sort=True)
+    worker_codes, workers = pd.factorize(data_frame[worker_column], sort=True)
+    answer_codes = encode_categories(data_frame[answer_column], requirement_codes >= 0, build_label_to_category_map(categories))
+
+    valid = (requirement_codes >= 0) & (worker_codes >= 0) & (answer_codes >= 0)
+    items, item_workers, answers = requirement_codes[valid], worker_codes[valid], answer_codes[valid]
+    I, W = len(requirements), len(workers)
+    LOGGER.info('Run Dawid-Skene on %s assignments of %s workers for %s requirements.', items.shape[0], W, I)
+
+    # Initialize the posteriors with the (soft) majority vote
+    T = np.bincount(items * K + answers, minlength=I * K).reshape(I, K).astype(np.float64)
+    T = _normalize(T + (T.sum(axis=1, keepdims=True) == 0))
+
+    log_likelihood = -np.inf
+    converged = False
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        # M-step: class priors and worker confusion matrices from the current posteriors
+        priors = T.mean(axis=0)
+        confusion = np.stack([
+            np.bincount(item_workers * K + answers, weights=T[items, true_category], minlength=W * K).reshape(W, K)
+            for true_category in range(K)
+        ], axis=1) + smoothing
+        confusion /= confusion.sum(axis=2, keepdims=True)
+
+        # E-step: posteriors from the priors and the log likelihood of each assignment
+        log_confusion = np.log(confusion)
+        log_T = np.log(priors) + np.stack([
+            np.bincount(items, weights=log_confusion[item_workers, true_category, answers], minlength=I)
+            for true_category in range(K)
+        ], axis=1)
+        log_normalizer = np.logaddexp.reduce(log_T, axis=1, keepdims=True)
+        T = np.exp(log_T - log_normalizer)
+
+        previous_log_likelihood, log_likelihood = log_likelihood, float(log_normalizer.sum())
+        LOGGER.debug('Iteration %s: log likelihood = %s.', iteration, log_likelihood)
+        if np.isfinite(previous_log_likelihood) and abs(log_likelihood - previous_log_likelihood) <= tolerance * abs(previous_log_likelihood):
+            converged = True
+            break
+
+    if not converged:
+        LOGGER.warning('Dawid-Skene did not converge within %s iterations.', max_iterations)
+
+    posteriors = pd.DataFrame(T, columns=[f'{name}_prob' for name in category_names])
+    posteriors.insert(0, CM_REQUIREMENT_COLUMN, np.asarray(requirements))
+    worker_confusion = pd.DataFrame(
+        confusion.reshape(W * K, K),
+        index=pd.MultiIndex.from_product([np.asarray(workers), category_names], names=[worker_column, 'true_category']),
+        columns=category_names)
+
+    return DawidSkeneResult(
+        posteriors=posteriors,
+        worker_confusion=worker_confusion,
+        class_priors=pd.Series(priors, index=category_names),
+        iterations=iteration,
+        converged=converged)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / matrix.sum(axis=1, keepdims=True)
@@ -0,0 +1,111 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import json
+import logging
+import os
+from typing import Dict, Iterable, Iterator
+
+import pandas as pd
+
+from .cache import SQLiteStore
+from .constants import EVALUATION_FILE_COLUMN
+from .grid_search import find_best_runs, parse_evaluation_files
+
+LOGGER = logging.getLogger(__name__)
+
+# Increase the version whenever parse_evaluation_file changes to re-index all runs
+_SUMMARY_VERSION = 1
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    summary TEXT NOT NULL
+) WITHOUT ROWID;
+'''
+
+
+class EvaluationIndex(SQLiteStore):
+    """
+    A persistent index of grid search run summaries (see parse_evaluation_file) backed by an SQLite database.
+    Runs are keyed by the evaluation file path and its modification time, so re-indexing only parses new or changed files
+    and queries never touch the JSON files.
+
+    Args:
+        database_path (str): The SQLite database file. It is created if it does not exist.
+    """
+
+    def __init__(self, database_path: str):
+        super().__init__(database_path, _SCHEMA)
+        with self._connection:
+            self._check_version('summary_version', _SUMMARY_VERSION, ('runs',))
+
+    def update(self, file_paths: Iterable[str], max_workers: int = None, prune: bool = True) -> int:
+        """
+        Index new and changed evaluation files.
+
+        Args:
+            file_paths (Iterable[str]): All evaluation JSON files (e.g. of a glob).
+            max_workers (int, optional): The number of worker processes parsing files. Defaults to None which parses one file after another.
+            prune (bool, optional): Remove indexed runs whose file is not in file_paths. Defaults to True.
+
+        Returns:
+            int: The number of parsed files.
+        """
+        indexed = {path: (mtime_ns, size) for path, mtime_ns, size in self._connection.execute('SELECT path, mtime_ns, size FROM runs')}
+
+        changed = []
+        current_paths = set()
+        for file_path in file_paths:
+            abs_path = os.path.abspath(file_path)
+            file_stat = os.stat(abs_path)
+            current_paths.add(abs_path)
+            if indexed.get(abs_path) != (file_stat.st_mtime_ns, file_stat.st_size):
+                changed.append((abs_path, file_stat.st_mtime_ns, file_stat.st_size))
+
+        removed_paths = [path for path in indexed if path not in current_paths] if prune else []
+        LOGGER.info('Index %s new or changed runs. Remove %s runs. %s runs are up to date.', len(changed), len(removed_paths), len(current_paths) - len(changed))
+
+        summaries = parse_evaluation_files((path for path, _, _ in changed), max_workers=max_workers)
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO runs (path, mtime_ns, size, summary) VALUES (?, ?, ?, ?)',
+                ((path, mtime_ns, size, json.dumps(summary)) for (path, mtime_ns, size), summary in zip(changed, summaries)))
+            self._connection.executemany('DELETE FROM runs WHERE path = ?', ((path,) for path in removed_paths))
+
+        return len(changed)
+
+    def summaries(self, filters: dict = None) -> Iterator[dict]:
+        """
+        Get the indexed run summaries including their file path.
+
+        Args:
+            filters (dict, optional): Only return runs whose summary values equal these values. Defaults to None.
+
+        Yields:
+            Iterator[dict]: The summaries
+        """
+        filters = filters or {}
+        for path, summary_json in self._connection.execute('SELECT path, summary FROM runs ORDER BY path'):
+            summary = json.loads(summary_json)
+            if all(summary.get(key) == value for key, value in filters.items()):
+                summary[EVALUATION_FILE_COLUMN] = path
+                yield summary
+
+    def query(self, metrics: Iterable[str] = ('recall',), best_n: int = None, filters: dict = None) -> Dict[str, pd.DataFrame]:
+        """
+        Get the best indexed runs per metric. See find_best_runs.
+
+        Args:
+            metrics (Iterable[str], optional): The summary keys to rank by. Defaults to ('recall',).
+            best_n (int, optional): The number of runs to keep per metric. Defaults to None which keeps all runs.
+            filters (dict, optional): Only consider runs whose summary values equal these values. Defaults to None.
+
+        Returns:
+            Dict[str, pd.DataFrame]: The best runs per metric sorted from best to worst.
+        """
+        return find_best_runs(self.summaries(filters), metrics, best_n)
@@ -0,0 +1,119 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import heapq
+import json
+import logging
+import math
+import numbers
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from typing import Dict, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import instrumented
+
+LOGGER = logging.getLogger(__name__)
+
+# Hyperparameters that are not part of the summary
+_IGNORED_HYPERPARAMETERS = ('ngram_range', 'max_features')
+
+
+def parse_evaluation_file(file_path: str) -> dict:
+    """
+    Parse an evaluation file of a grid search run into a flat summary.
+    The summary contains the "vague" test metrics after the last trained fold, the hyperparameters, the resampling strategy,
+    the number of k-fold splits and the mean average precision.
+
+    Args:
+        file_path (str): The evaluation JSON file.
+
+    Returns:
+        dict: The summary
+    """
+    with open(file_path, 'r', encoding='utf-8') as eval_file:
+        current_result = json.load(eval_file)
+
+    # The metric value with respect to the test set after the last trained fold.
+    metrics_dict = current_result['fold_results'][-1]['metrics']['test']
+
+    # The used hyperparameter
+    hyperparameter_dict = {key: value for key, value in current_result['hyperparameter'].items() if key not in _IGNORED_HYPERPARAMETERS}
+
+    summary = {
+        **metrics_dict['vague'],
+        **hyperparameter_dict,
+        'resampling_strategy': current_result['data_set']['resampling_strategy']
+    }
+    if 'kfold_splits' not in summary:
+        summary['kfold_splits'] = len(current_result['fold_results'])
+    summary['mean_average_precision'] = metrics_dict.get('mean_average_precision', np.nan)
+
+    return summary
+
+
+def parse_evaluation_files(file_paths: Iterable[str], max_workers: int = None) -> Iterator[dict]:
+    """
+    Parse evaluation files into flat summaries. See parse_evaluation_file.
+    With max_workers > 1 the files are parsed in worker processes. The summaries are still yielded in the order of file_paths.
+
+    Args:
+        file_paths (Iterable[str]): The evaluation JSON files.
+        max_workers (int, optional): The number of worker processes. Defaults to None which parses one file after another.
+
+    Yields:
+        Iterator[dict]: The summaries
+    """
+    if not max_workers or max_workers <= 1:
+        yield from map(parse_evaluation_file, file_paths)
+        return
+
+    LOGGER.debug('Parse evaluation files using %s workers.', max_workers)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(parse_evaluation_file, file_paths, chunksize=64)
+
+
+@instrumented
+def find_best_runs(summaries: Iterable[dict], metrics: Iterable[str] = ('recall',), best_n: int = None) -> Dict[str, pd.DataFrame]:
+    """
+    Rank grid search runs by several metrics in a single pass over the summaries.
+    Each metric keeps its best_n runs in a bounded min-heap. Runs without a metric value are ranked last.
+
+    Args:
+        summaries (Iterable[dict]): The run summaries (e.g. of parse_evaluation_files). The keys may differ between runs.
+        metrics (Iterable[str], optional): The summary keys to rank by. Defaults to ('recall',).
+        best_n (int, optional): The number of runs to keep per metric. Defaults to None which keeps all runs.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The best runs per metric sorted from best to worst. Keys missing in a run are NaN.
+    """
+    heaps = {metric: [] for metric in metrics}
+    sequence = count()  # Breaks ties by arrival order and avoids comparing the summaries
+
+    runs_count = 0
+    for summary in summaries:
+        runs_count += 1
+        for metric, heap in heaps.items():
+            entry = (_get_rank_value(summary, metric), -next(sequence), summary)
+            if best_n is None or len(heap) < best_n:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+
+    LOGGER.info('Ranked %s runs by metrics=%s.', runs_count, list(heaps))
+    return {
+        metric: pd.DataFrame.from_records([summary for _, _, summary in sorted(heap, reverse=True)])
+        for metric, heap in heaps.items()
+    }
+
+
+def _get_rank_value(summary: dict, metric: str) -> float:
+    value = summary.get(metric)
+    # Rank missing, NaN and non numeric values (e.g. a string hyperparameter) last
+    if not isinstance(value, numbers.Real) or math.isnan(value):
+        return -math.inf
+    return value
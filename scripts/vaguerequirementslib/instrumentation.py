@@ -0,0 +1,188 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from functools import wraps
+from typing import Callable, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+_SINKS = []
+_CONFIG = {'trace_memory': False}
+_STATE = threading.local()  # The records of the active instrumented calls of each thread
+
+
+class InMemorySink:
+    """
+    Collects the instrumentation records in a list.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record: dict) -> None:
+        self.records.append(record)
+
+
+class JsonLinesSink:
+    """
+    Writes each instrumentation record as one JSON line.
+
+    Args:
+        file_name (str): The file the records are appended to.
+    """
+
+    def __init__(self, file_name: str):
+        self._lock = threading.Lock()
+        self._file = open(file_name, 'a', encoding='utf8')  # pylint: disable=consider-using-with
+
+    def __call__(self, record: dict) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def enable(*sinks: Callable[[dict], None], trace_memory: bool = True) -> None:
+    """
+    Enable the instrumentation of the public library functions. Each call creates one record that is passed to all sinks:
+    {'function', 'start', 'seconds', 'rows_in', 'rows_out', 'peak_bytes', 'diagnostics'}.
+
+    Args:
+        *sinks (Callable[[dict], None]): The sinks receiving the records (e.g. InMemorySink or JsonLinesSink).
+        trace_memory (bool, optional): Measure the peak memory of each call with tracemalloc. This slows down the calls. Defaults to True.
+    """
+    _SINKS.extend(sinks)
+    _CONFIG['trace_memory'] = trace_memory
+
+
+def disable() -> None:
+    """
+    Disable the instrumentation and remove all sinks.
+    """
+    _SINKS.clear()
+
+
+def is_enabled() -> bool:
+    """
+    Returns:
+        bool: Whether the instrumentation is enabled.
+    """
+    return bool(_SINKS)
+
+
+def diagnostics_enabled(logger: logging.Logger, level: int = logging.INFO) -> bool:
+    """
+    Indicate whether diagnostic values are consumed, i.e. the logger logs them or the instrumentation records them.
+    Use it to skip diagnostic-only computations.
+
+    Args:
+        logger (logging.Logger): The logger that would log the diagnostic values.
+        level (int, optional): The log level of the diagnostic values. Defaults to logging.INFO.
+
+    Returns:
+        bool: Whether diagnostic values should be computed.
+    """
+    return bool(_SINKS) or logger.isEnabledFor(level)
+
+
+def add_diagnostics(**values) -> None:
+    """
+    Add diagnostic values to the record of the innermost active instrumented call. Does nothing if the instrumentation is disabled.
+    """
+    records = getattr(_STATE, 'records', None)
+    if records:
+        records[-1]['diagnostics'].update(values)
+
+
+def instrumented(function: Callable) -> Callable:
+    """
+    Decorate a function to create an instrumentation record per call while the instrumentation is enabled.
+    If it is disabled the only overhead is one check.
+    The input rows are taken from the first argument and the output rows from the result if they have a length.
+
+    Args:
+        function (Callable): The function.
+
+    Returns:
+        Callable: The instrumented function.
+    """
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _SINKS:
+            return function(*args, **kwargs)
+        return _call_instrumented(function, args, kwargs)
+    return wrapper
+
+
+def _call_instrumented(function: Callable, args: tuple, kwargs: dict):
+    if not hasattr(_STATE, 'records'):
+        _STATE.records = []
+    records = _STATE.records
+
+    record = {
+        'function': f'{function.__module__}.{function.__qualname__}',
+        'start': time.time(),
+        'seconds': None,
+        'rows_in': _count_rows(args[0] if args else next(iter(kwargs.values()), None)),
+        'rows_out': None,
+        'peak_bytes': None,
+        'diagnostics': {},
+        '_child_peak': 0
+    }
+
+    trace_memory = _CONFIG['trace_memory']
+    started_tracing = False
+    if trace_memory:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        if hasattr(tracemalloc, 'reset_peak'):  # Python >= 3.9. Earlier versions report the peak since tracing started.
+            tracemalloc.reset_peak()
+
+    records.append(record)
+    start = time.perf_counter()
+    try:
+        result = function(*args, **kwargs)
+        record['rows_out'] = _count_rows(result)
+        return result
+    finally:
+        record['seconds'] = time.perf_counter() - start
+        records.pop()
+        if trace_memory:
+            # A nested call resets the peak, so take the peaks of the nested calls into account
+            peak = max(tracemalloc.get_traced_memory()[1], record['_child_peak'])
+            record['peak_bytes'] = max(peak - start_bytes, 0)
+            if records:
+                records[-1]['_child_peak'] = max(records[-1]['_child_peak'], peak)
+            if started_tracing:
+                tracemalloc.stop()
+        del record['_child_peak']
+        _emit(record)
+
+
+def _emit(record: dict) -> None:
+    for sink in list(_SINKS):
+        try:
+            sink(record)
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception('Instrumentation sink="%s" failed.', sink)
+
+
+def _count_rows(value) -> Optional[int]:
+    shape = getattr(value, 'shape', None)
+    if shape:
+        return int(shape[0])
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    return None
@@ -4,79 +4,243 @@
 # ------------------------------------------------------------------------------------------------------
 
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, NamedTuple, Union
 
 import pandas as pd
 import numpy as np
+
+from .instrumentation import instrumented
+
 LOGGER = logging.getLogger(__name__)
 
+# Use a process pool for bootstrapping by default if there are at least this many requirements
+PARALLEL_BOOTSTRAP_MIN_REQUIREMENTS = 10000
+# Upper bound of bootstrap weights (resamples x requirements) held in memory per chunk
+_BOOTSTRAP_CHUNK_ELEMENTS = 10**7
+# The count matrix and the kappa kind of a bootstrap worker process. Set by the pool initializer.
+_BOOTSTRAP_WORKER_STATE = {}
+
 # pylint:disable=invalid-name
 
-def calculate_fleiss_kappa(confusion_matrix: pd.DataFrame) -> float:
+@instrumented
+def calculate_fleiss_kappa(confusion_matrix: Union[pd.DataFrame, np.ndarray]) -> float:
     """
-    Calculate Fleiss' Kappa
+    Calculate Fleiss' Kappa.
+    The number of raters may vary between requirements. Requirements with less than two ratings are ignored.
 
     Args:
-        confusion_matrix (pd.DataFrame): The confusion matrix
+        confusion_matrix (Union[pd.DataFrame, np.ndarray]): The confusion matrix or an integer count matrix (requirements x categories)
 
     Returns:
         float: The Fleiss' Kappa
     """
-    raters_count = None  # Labeler
+    return float(_calc_kappa(_to_count_matrix(confusion_matrix), free_marginal=False))
 
-    raters_counts = confusion_matrix.sum(axis=1, numeric_only=True)
-    assert len(set(raters_counts)) == 1, 'The raters count is inconsistent'
-    raters_count = int(raters_counts[0])
-    LOGGER.debug('Each requirement was labeled by %s workers.', raters_count)
 
-    # Calc P mean
-    # Omit requirement column
-    numeric_df = confusion_matrix.select_dtypes(include=[np.number])
-    # LOGGER.debug(f'Numeric df {numeric_df}')
+@instrumented
+def calculate_free_marginal_kappa(confusion_matrix: Union[pd.DataFrame, np.ndarray]) -> float:
+    """
+    Calculate the free marginal kappa
+    Ref: https://eric.ed.gov/?id=ED490661
+    The number of raters may vary between requirements. Requirements with less than two ratings are ignored.
 
-    P_is = []
-    for _, row in numeric_df.iterrows():
-        P_i = 1 / (raters_count*(raters_count-1)) * (row.map(lambda category_count: category_count**2).sum() - raters_count)
-        P_is.append(P_i)
+    Args:
+        confusion_matrix (Union[pd.DataFrame, np.ndarray]): The confusion matrix or an integer count matrix (requirements x categories)
 
-    P = 1/confusion_matrix.shape[0] * np.sum(P_is)
-    P_E = confusion_matrix.sum(axis=0, numeric_only=True).map(lambda overall_category_count: (overall_category_count/(raters_count*confusion_matrix.shape[0]))**2).sum()
-    kappa = (P-P_E) / (1-P_E)
+    Returns:
+        float: The kappa
+    """
+    return float(_calc_kappa(_to_count_matrix(confusion_matrix), free_marginal=True))
 
-    return kappa
 
+@instrumented
+def calculate_kappas(confusion_matrices: Union[np.ndarray, Iterable], free_marginal: bool = False) -> np.ndarray:
+    """
+    Calculate the kappa of many confusion matrices at once.
+    Matrices with different requirement counts are padded with empty requirements, which do not affect the kappa.
+
+    Args:
+        confusion_matrices (Union[np.ndarray, Iterable]): A count array of shape (matrices x requirements x categories)
+            or an iterable of confusion matrices/count matrices sharing the same categories.
+        free_marginal (bool, optional): Calculate the free marginal kappa instead of Fleiss' kappa. Defaults to False.
 
-def calculate_free_marginal_kappa(confusion_matrix: pd.DataFrame) -> float:
+    Returns:
+        np.ndarray: The kappa of each confusion matrix.
     """
-    Calculate the free marginal kappa
-    Ref: https://eric.ed.gov/?id=ED490661
+    if isinstance(confusion_matrices, np.ndarray):
+        counts = confusion_matrices
+    else:
+        matrices = [_to_count_matrix(matrix) for matrix in confusion_matrices]
+        if len({matrix.shape[1] for matrix in matrices}) > 1:
+            raise ValueError('All confusion matrices must have the same number of categories.')
+
+        counts = np.zeros((len(matrices), max(matrix.shape[0] for matrix in matrices), matrices[0].shape[1]), dtype=np.int64)
+        for index, matrix in enumerate(matrices):
+            counts[index, :matrix.shape[0]] = matrix
+
+    if counts.ndim != 3:
+        raise ValueError(f'Expected a count array with 3 dimensions but got {counts.ndim}.')
+
+    return _calc_kappa(counts, free_marginal)
+
+
+class KappaConfidenceInterval(NamedTuple):
+    kappa: float
+    lower: float
+    upper: float
+    confidence_level: float
+    bootstrap_kappas: np.ndarray
+
+
+@instrumented
+def calculate_kappa_confidence_interval(  # pylint:disable=too-many-arguments
+        confusion_matrix: Union[pd.DataFrame, np.ndarray],
+        free_marginal: bool = False,
+        resamples: int = 10000,
+        confidence_level: float = 0.95,
+        seed: int = None,
+        chunk_size: int = None,
+        max_workers: int = None) -> KappaConfidenceInterval:
+    """
+    Calculate a percentile bootstrap confidence interval for Fleiss' or the free marginal kappa.
+    The requirements are resampled with replacement. Each chunk of resamples is drawn as an index matrix and folded into a weight matrix (resamples x requirements)
+    and all its kappas are evaluated with matrix products. The result only depends on the seed, not on the chunk distribution across workers.
 
     Args:
-        confusion_matrix (pd.DataFrame): The confusion matrix
+        confusion_matrix (Union[pd.DataFrame, np.ndarray]): The confusion matrix or an integer count matrix (requirements x categories)
+        free_marginal (bool, optional): Calculate the free marginal kappa instead of Fleiss' kappa. Defaults to False.
+        resamples (int, optional): The number of bootstrap resamples. Defaults to 10000.
+        confidence_level (float, optional): The confidence level of the interval. Defaults to 0.95.
+        seed (int, optional): The seed of the random generator. Defaults to None.
+        chunk_size (int, optional): The number of resamples evaluated at once. Defaults to None which bounds each chunk to about 10^7 weights.
+        max_workers (int, optional): The number of worker processes. Defaults to None which uses all CPUs
+            if there are at least PARALLEL_BOOTSTRAP_MIN_REQUIREMENTS requirements and a single process otherwise.
 
     Returns:
-        float: The kappa
+        KappaConfidenceInterval: The kappa, the interval bounds and all bootstrap kappas.
+    """
+    counts = _to_count_matrix(confusion_matrix)
+    bootstrap_kappas = _bootstrap_kappas(counts, free_marginal, resamples, seed, chunk_size, max_workers)
+
+    alpha = (1 - confidence_level) / 2
+    lower, upper = np.nanquantile(bootstrap_kappas, [alpha, 1 - alpha]) if bootstrap_kappas.size else (np.nan, np.nan)
+
+    return KappaConfidenceInterval(
+        kappa=float(_calc_kappa(counts, free_marginal)),
+        lower=float(lower),
+        upper=float(upper),
+        confidence_level=confidence_level,
+        bootstrap_kappas=bootstrap_kappas)
+
+
+def _bootstrap_kappas(counts: np.ndarray, free_marginal: bool, resamples: int, seed: int, chunk_size: int, max_workers: int) -> np.ndarray:  # pylint:disable=too-many-arguments
+    requirements_count = counts.shape[0]
+
+    if chunk_size is None:
+        chunk_size = max(1, _BOOTSTRAP_CHUNK_ELEMENTS // max(requirements_count, 1))
+    # Only the chunk sizes and seeds are sent per task. The count matrix is sent once to each worker process.
+    tasks = list(zip(
+        [min(chunk_size, resamples - start) for start in range(0, resamples, chunk_size)],
+        np.random.SeedSequence(seed).spawn(-(-resamples // chunk_size))))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() if requirements_count >= PARALLEL_BOOTSTRAP_MIN_REQUIREMENTS else 1
+
+    LOGGER.debug('Bootstrap %s kappas in %s chunks using %s workers.', resamples, len(tasks), max_workers)
+    if max_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_bootstrap_worker, initargs=(counts, free_marginal)) as executor:
+            chunks = list(executor.map(_bootstrap_kappa_chunk_in_worker, tasks))
+    else:
+        chunks = [_bootstrap_kappa_chunk(counts, free_marginal, size, chunk_seed) for size, chunk_seed in tasks]
+
+    return np.concatenate(chunks) if chunks else np.empty(0)
+
+
+def _init_bootstrap_worker(counts: np.ndarray, free_marginal: bool) -> None:
+    _BOOTSTRAP_WORKER_STATE['counts'] = counts
+    _BOOTSTRAP_WORKER_STATE['free_marginal'] = free_marginal
+
+
+def _bootstrap_kappa_chunk_in_worker(task: tuple) -> np.ndarray:
+    resamples, seed = task
+    return _bootstrap_kappa_chunk(_BOOTSTRAP_WORKER_STATE['counts'], _BOOTSTRAP_WORKER_STATE['free_marginal'], resamples, seed)
+
+
+def _bootstrap_kappa_chunk(counts: np.ndarray, free_marginal: bool, resamples: int, seed) -> np.ndarray:
+    requirements_count = counts.shape[0]
+    rng = np.random.default_rng(seed)
+    # Draw the resampled requirement indices and count them per resample. This equals multinomial weights but is much faster for many requirements.
+    indices = rng.integers(0, requirements_count, size=(resamples, requirements_count))
+    indices += np.arange(resamples)[:, np.newaxis] * requirements_count
+    weights = np.bincount(indices.ravel(), minlength=resamples * requirements_count).reshape(resamples, requirements_count).astype(np.float64)
+    return _calc_weighted_kappa(counts, weights, free_marginal)
+
+
+def _calc_weighted_kappa(counts: np.ndarray, weights: np.ndarray, free_marginal: bool) -> np.ndarray:
     """
+    Calculate the kappa of a count matrix (requirements x categories) for each row of weights (resamples x requirements).
+    A weight states how often a requirement occurs in the resample.
+    """
+    counts, P_is, rated = _calc_requirement_agreements(counts)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        P = (weights @ P_is) / (weights @ rated.astype(np.float64))
+
+        if free_marginal:
+            P_E = 1 / counts.shape[-1]
+        else:
+            category_counts = weights @ np.where(rated[:, np.newaxis], counts, 0)
+            P_E = np.square(category_counts / category_counts.sum(axis=-1, keepdims=True)).sum(axis=-1)
 
-    raters_count = None  # Labeler
+        kappa = (P - P_E) / (1 - P_E)
 
-    raters_counts = confusion_matrix.sum(axis=1, numeric_only=True)
-    assert len(set(raters_counts)) == 1, 'The raters count is inconsistent'
-    raters_count = int(raters_counts[0])
-    LOGGER.debug('Each requirement was labeled by %s workers.', raters_count)
+    return kappa
+
+
+def _to_count_matrix(confusion_matrix: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+    if isinstance(confusion_matrix, pd.DataFrame):
+        # Omit requirement column
+        return confusion_matrix.select_dtypes(include=[np.number]).to_numpy()
+    return np.asarray(confusion_matrix)
+
+
+def _calc_kappa(counts: np.ndarray, free_marginal: bool) -> np.ndarray:
+    """
+    Calculate the kappa for count arrays of shape (..., requirements, categories).
+    """
+    counts, P_is, rated = _calc_requirement_agreements(counts)
+    if LOGGER.isEnabledFor(logging.DEBUG) and counts.ndim == 2 and rated.any():
+        raters_counts = counts.sum(axis=-1)[rated]
+        LOGGER.debug('Each requirement was labeled by %s to %s workers.', int(raters_counts.min()), int(raters_counts.max()))
 
-    # Calc P mean
-    # Omit requirement column
-    numeric_df = confusion_matrix.select_dtypes(include=[np.number])
-    # LOGGER.debug(f'Numeric df {numeric_df}')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        P = P_is.sum(axis=-1) / rated.sum(axis=-1)
 
-    P_is = []
-    for _, row in numeric_df.iterrows():
-        P_i = 1 / (raters_count*(raters_count-1)) * (row.map(lambda category_count: category_count**2).sum() - raters_count)
-        P_is.append(P_i)
+        if free_marginal:
+            # This is the only difference to Fleiss' Kappa
+            P_E = 1 / counts.shape[-1]
+        else:
+            category_counts = np.where(rated[..., np.newaxis], counts, 0).sum(axis=-2)
+            P_E = np.square(category_counts / category_counts.sum(axis=-1, keepdims=True)).sum(axis=-1)
 
-    P = 1/confusion_matrix.shape[0] * np.sum(P_is)
+        kappa = (P - P_E) / (1 - P_E)
 
-    # This is the only difference to Fleiss' Kappa
-    P_E = 1 / numeric_df.shape[1]
-    kappa = (P-P_E) / (1-P_E)
     return kappa
+
+
+def _calc_requirement_agreements(counts: np.ndarray) -> tuple:
+    """
+    Calculate the agreement P_i of each requirement normalized by its own raters count n_i: P_i = (sum_j n_ij^2 - n_i) / (n_i * (n_i - 1)).
+    Requirements with less than two ratings get P_i = 0 and are marked as not rated.
+
+    Returns:
+        tuple: The float counts, the agreements and the rated mask.
+    """
+    counts = counts.astype(np.float64, copy=False)
+    raters_counts = counts.sum(axis=-1)
+    rated = raters_counts >= 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        P_is = np.where(rated, (np.square(counts).sum(axis=-1) - raters_counts) / (raters_counts * (raters_counts - 1)), 0)
+    return counts, P_is, rated
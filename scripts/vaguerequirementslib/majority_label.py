@@ -5,41 +5,98 @@
 
 import logging
 
+import numpy as np
 import pandas as pd
 
 from .constants import CM_NOT_VAGUE_COUNT_COLUMN, CM_VAGUE_COUNT_COLUMN, VAGUE_LABEL, NOT_VAGUE_LABEL, MAJORITY_LABEL_COLUMN
+from .instrumentation import add_diagnostics, diagnostics_enabled, instrumented
 
 LOGGER = logging.getLogger(__name__)
 
-# pylint: disable=invalid-name
+# Tie-breaking policies
+TIE_POLICY_PREFER = 'prefer'  # Prefer "vague" or "not vague" according to prefer_vague, otherwise like TIE_POLICY_FIRST
+TIE_POLICY_FIRST = 'first'  # Take the first tied label in order of the label columns
+TIE_POLICY_RANDOM = 'random'  # Take a random tied label
+TIE_POLICY_DROP = 'drop'  # Drop tied requirements
 
-def calc_majority_label(confusion_matrix: pd.DataFrame, prefer_vague: bool = True) -> pd.DataFrame:
+# pylint: disable=invalid-name, too-many-arguments
+
+@instrumented
+def calc_majority_label(
+        confusion_matrix: pd.DataFrame,
+        prefer_vague: bool = True,
+        label_columns: dict = None,
+        tie_policy: str = TIE_POLICY_PREFER,
+        weights: dict = None,
+        seed: int = None,
+        inplace: bool = False) -> pd.DataFrame:
     """
-    Calculate the majority label based on the vote for "vague" and "not vague".
+    Calculate the majority label based on the vote for "vague" and "not vague" or any other set of categories.
 
     Args:
         confusion_matrix (pd.DataFrame): The data frame containing information how often one voted for "vague" and "not vague".
         prefer_vague (bool, optional): Indicates whether for a tie in votes the majority label is "vague" or "not vague".
+        label_columns (dict, optional): Maps each count column to the label it votes for.
+            Defaults to None which maps CM_VAGUE_COUNT_COLUMN to VAGUE_LABEL and CM_NOT_VAGUE_COUNT_COLUMN to NOT_VAGUE_LABEL.
+        tie_policy (str, optional): How to break ties. One of TIE_POLICY_PREFER, TIE_POLICY_FIRST, TIE_POLICY_RANDOM and TIE_POLICY_DROP. Defaults to TIE_POLICY_PREFER.
+        weights (dict, optional): Maps count columns to the weight of a single vote. Defaults to None which weights all votes with 1.
+        seed (int, optional): The seed for TIE_POLICY_RANDOM. Defaults to None.
+        inplace (bool, optional): Add the majority label column to the given data frame instead of a copy. Defaults to False.
 
     Returns:
         pd.DataFrame: The data frame for indicating whether a requirement is vague (1) or not (0)
     """
-    df = confusion_matrix.copy()
-    df[MAJORITY_LABEL_COLUMN] = df.apply(_get_majority_label, axis=1, args=([prefer_vague]))
-    label_counts = df[MAJORITY_LABEL_COLUMN].value_counts()
-    LOGGER.info('"vague" majority label count = %s. "not vague" majority label count = %s.', label_counts[VAGUE_LABEL], label_counts[NOT_VAGUE_LABEL])
-    return df
+    if label_columns is None:
+        label_columns = {CM_VAGUE_COUNT_COLUMN: VAGUE_LABEL, CM_NOT_VAGUE_COUNT_COLUMN: NOT_VAGUE_LABEL}
+    if tie_policy not in (TIE_POLICY_PREFER, TIE_POLICY_FIRST, TIE_POLICY_RANDOM, TIE_POLICY_DROP):
+        raise ValueError(f'Tie policy="{tie_policy}" is not supported.')
+    if inplace and tie_policy == TIE_POLICY_DROP:
+        raise ValueError(f'Tie policy="{tie_policy}" cannot be applied in place.')
+
+    columns = _order_label_columns(label_columns, tie_policy, prefer_vague)
+    labels = np.array([label_columns[column] for column in columns])
+
+    scores = confusion_matrix[columns].to_numpy()
+    if weights is not None:
+        scores = scores * np.array([weights.get(column, 1) for column in columns], dtype=np.float64)
+
+    is_max = scores == scores.max(axis=1, keepdims=True)
+    winners = _find_winners(is_max, tie_policy, seed)
+
+    if tie_policy == TIE_POLICY_DROP:
+        not_tied = is_max.sum(axis=1) == 1
+        LOGGER.info('Dropped %s requirements due to ties.', int((~not_tied).sum()))
+        df = confusion_matrix[not_tied].copy()
+        winners = winners[not_tied]
+    else:
+        df = confusion_matrix if inplace else confusion_matrix.copy()
 
+    df[MAJORITY_LABEL_COLUMN] = labels[winners]
+
+    if diagnostics_enabled(LOGGER):
+        label_counts = df[MAJORITY_LABEL_COLUMN].value_counts()
+        LOGGER.info('"vague" majority label count = %s. "not vague" majority label count = %s.', label_counts.get(VAGUE_LABEL, 0), label_counts.get(NOT_VAGUE_LABEL, 0))
+        add_diagnostics(majority_label_counts={str(label): int(count) for label, count in label_counts.items()})
+    return df
 
-def _get_majority_label(row: pd.Series, prefer_vague: bool) -> int:
-    # If it is a tie consider it according to prefer_vague
-    if row[CM_VAGUE_COUNT_COLUMN] == row[CM_NOT_VAGUE_COUNT_COLUMN]:
-        if prefer_vague:
-            return VAGUE_LABEL
 
-        return NOT_VAGUE_LABEL
+def _order_label_columns(label_columns: dict, tie_policy: str, prefer_vague: bool) -> list:
+    """
+    Order the label columns so that the first tied column wins unless the tie policy states otherwise.
+    """
+    columns = list(label_columns)
+    if tie_policy == TIE_POLICY_PREFER:
+        # Move the preferred label's column to the front so that it wins ties
+        preferred_label = VAGUE_LABEL if prefer_vague else NOT_VAGUE_LABEL
+        columns.sort(key=lambda column: label_columns[column] != preferred_label)
+    return columns
 
-    if row[CM_VAGUE_COUNT_COLUMN] > row[CM_NOT_VAGUE_COUNT_COLUMN]:
-        return VAGUE_LABEL
 
-    return NOT_VAGUE_LABEL
+def _find_winners(is_max: np.ndarray, tie_policy: str, seed: int) -> np.ndarray:
+    """
+    Get the position of the winning label column of each requirement from the mask of its highest scores.
+    """
+    if tie_policy == TIE_POLICY_RANDOM:
+        # The tied label with the highest random key wins
+        return np.argmax(np.where(is_max, np.random.default_rng(seed).random(is_max.shape), -1), axis=1)
+    return np.argmax(is_max, axis=1)
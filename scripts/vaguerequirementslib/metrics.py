@@ -4,75 +4,111 @@
 # ------------------------------------------------------------------------------------------------------
 
 import logging
-from typing import Tuple
+from typing import Dict, Tuple, Union
 
 import pandas as pd
 import numpy as np
 
 from .constants import TP, TN, FP, FN, VAGUE_LABEL, NOT_VAGUE_LABEL
+from .instrumentation import instrumented
 
 LOGGER = logging.getLogger(__name__)
 
+# The ground truth label of each average precision query
+_QUERY_LABELS = {
+    'not_vague': NOT_VAGUE_LABEL,
+    'vague': VAGUE_LABEL
+}
+
+# Each metric as (dividend, denominator) of the confusion counts
+_METRIC_TERMS = {
+    'accuracy': lambda counts: (counts[TP] + counts[TN], counts[TP] + counts[TN] + counts[FP] + counts[FN]),
+    'precision': lambda counts: (counts[TP], counts[TP] + counts[FP]),
+    'recall': lambda counts: (counts[TP], counts[TP] + counts[FN]),
+    'specificity': lambda counts: (counts[TN], counts[FP] + counts[TN]),
+    'false_negative_rate': lambda counts: (counts[FN], counts[TP] + counts[FN]),
+    'false_positive_rate': lambda counts: (counts[FP], counts[FP] + counts[TN]),
+    # Equals 2 * precision * recall / (precision + recall) without calculating both first
+    'f1_score': lambda counts: (2 * counts[TP], 2 * counts[TP] + counts[FP] + counts[FN])
+}
+
 #pylint: disable=invalid-name
 
+@instrumented
 def calc_all_metrics(**kwargs) -> dict:
-    return {
-        'accuracy': calc_accuracy(**kwargs),
-        'precision': calc_precision(**kwargs),
-        'recall': calc_recall(**kwargs),
-        'specificity': calc_specificity(**kwargs),
-        'false_negative_rate': calc_false_negative_rate(**kwargs),
-        'false_positive_rate': calc_false_positive_rate(**kwargs),
-        'f1_score': calc_f1_score(**kwargs)
-    }
+    """
+    Calculate all metrics of the given confusion counts.
+    The counts are scalars or arrays of equal shape, e.g. one entry per (fold, threshold, run) combination.
+    Zero denominators are reported in a single aggregated warning.
 
+    Args:
+        kwargs: The confusion counts keyed by TP, TN, FP and FN.
 
+    Returns:
+        dict: The metrics keyed by their names. Each value is a float for scalar counts and an array for array counts.
+    """
+    counts = _as_counts(kwargs)
+    result = {}
+    zero_denominators_count = 0
+    values_count = 0
+    for name, metric_terms in _METRIC_TERMS.items():
+        result[name], zero_count = _divide(*metric_terms(counts))
+        zero_denominators_count += zero_count
+        values_count += np.size(result[name])
+
+    if zero_denominators_count:
+        LOGGER.warning('Denominator = 0 for %s of %s metric values. Skip metric calculation and set them to value="%s".', zero_denominators_count, values_count, 0)
+    return result
+
+
+@instrumented
 def calc_accuracy(**kwargs) -> float:
-    dividend = kwargs[TP] + kwargs[TN]
-    denominator = kwargs[TP] + kwargs[TN] + kwargs[FP] + kwargs[FN]
-    return _build_quotient(dividend, denominator)
+    return _calc_metric('accuracy', kwargs)
 
 
+@instrumented
 def calc_precision(**kwargs) -> float:
-    dividend = kwargs[TP]
-    denominator = kwargs[TP] + kwargs[FP]
-    return _build_quotient(dividend, denominator)
+    return _calc_metric('precision', kwargs)
 
 
+@instrumented
 def calc_recall(**kwargs) -> float:
-    dividend = kwargs[TP]
-    denominator = kwargs[TP] + kwargs[FN]
-    return _build_quotient(dividend, denominator)
+    return _calc_metric('recall', kwargs)
 
 
+@instrumented
 def calc_specificity(**kwargs) -> float:
-    dividend = kwargs[TN]
-    denominator = kwargs[FP] + kwargs[TN]
-    return _build_quotient(dividend, denominator)
+    return _calc_metric('specificity', kwargs)
 
 
+@instrumented
 def calc_false_negative_rate(**kwargs) -> float:
-    dividend = kwargs[FN]
-    denominator = kwargs[TP] + kwargs[FN]
-    return _build_quotient(dividend, denominator)
+    return _calc_metric('false_negative_rate', kwargs)
 
 
+@instrumented
 def calc_false_positive_rate(**kwargs) -> float:
-    dividend = kwargs[FP]
-    denominator = kwargs[FP] + kwargs[TN]
-    return _build_quotient(dividend, denominator)
+    return _calc_metric('false_positive_rate', kwargs)
 
 
+@instrumented
 def calc_f1_score(**kwargs):
-    precision = calc_precision(**kwargs)
-    recall = calc_recall(**kwargs)
+    return _calc_metric('f1_score', kwargs)
+
+
+def _calc_metric(name: str, kwargs: dict):
+    return _build_quotient(*_METRIC_TERMS[name](_as_counts(kwargs)))
+
 
-    dividend = 2 * precision * recall
-    denominator = precision + recall
-    return _build_quotient(dividend, denominator)
+def _as_counts(kwargs: dict) -> dict:
+    """
+    Convert array like confusion counts (lists, series, ...) to arrays. Scalars are kept.
+    """
+    return {key: kwargs[key] if np.isscalar(kwargs[key]) else np.asarray(kwargs[key]) for key in (TP, TN, FP, FN)}
 
 
-def calc_mean_average_precision(df: pd.DataFrame, vague_prob_column='vague_prob', not_vague_prob_column='not_vague_prob', ground_truth_column='majority_label') -> Tuple[float, float, float]:
+@instrumented
+def calc_mean_average_precision(df: Union[pd.DataFrame, np.ndarray], vague_prob_column='vague_prob', not_vague_prob_column='not_vague_prob', ground_truth_column='majority_label', ground_truth=None) -> Tuple[float, float, float]:  # pylint:disable=too-many-arguments
     """
     Calculate the mean average precision for a given data frame.
     Example data frame:
@@ -81,17 +117,20 @@ def calc_mean_average_precision(df: pd.DataFrame, vague_prob_column='vague_prob'
     1        0.60            0.40               0
 
     Args:
-        df (pd.DataFrame): The sorted data frame
+        df (Union[pd.DataFrame, np.ndarray]): The data frame or the classification probabilities ([not vague, vague] per row)
         vague_prob_column (str): The column name for vague probabilities
         not_vague_prob_column (str): The column name for not vague probabilites
         ground_truth_column (int): The column name for the ground truth
+        ground_truth (np.ndarray, optional): The ground truth labels. Required if df is an array.
 
     Returns:
         Tuple[float, float, float]: mean average precision, average precision not vague, average precision vague
     """
 
+    scores, labels = _extract_ranking_data(df, vague_prob_column, not_vague_prob_column, ground_truth_column, ground_truth)
+    # Only the average precision over all entries (k = number of entries) is needed
     precisions = [
-        calc_average_precision_k(df, query=query, vague_prob_column=vague_prob_column, not_vague_prob_column=not_vague_prob_column, ground_truth_column=ground_truth_column)
+        float(_calc_average_precision_curve(scores[query], labels, _QUERY_LABELS[query], [labels.shape[0]])[0]) if labels.shape[0] else 0
         for query in ['not_vague', 'vague']
     ]
 
@@ -99,50 +138,124 @@ def calc_mean_average_precision(df: pd.DataFrame, vague_prob_column='vague_prob'
     return (_build_quotient(np.sum(precisions), len(precisions)), *precisions)
 
 
-def calc_average_precision_k(df: pd.DataFrame, query: str, k=None, vague_prob_column='vague_prob', not_vague_prob_column='not_vague_prob', ground_truth_column='majority_label') -> float: # pylint:disable=too-many-arguments
+@instrumented
+def calc_average_precision_k(df: Union[pd.DataFrame, np.ndarray], query: str, k=None, vague_prob_column='vague_prob', not_vague_prob_column='not_vague_prob', ground_truth_column='majority_label', ground_truth=None) -> float: # pylint:disable=too-many-arguments
     """
     Calculate the average precision @ k.
 
     Args:
-        df (pd.DataFrame): The sorted data frame
+        df (Union[pd.DataFrame, np.ndarray]): The data frame or the classification probabilities ([not vague, vague] per row)
+        query (str): The label to query for. 'vague' or 'not_vague'
+        k (int, optional): Consider the k highest ranked entries. Defaults to None which considers all entries.
         vague_prob_column (str): The column name for vague probabilities
         not_vague_prob_column (str): The column name for not vague probabilites
         ground_truth_column (int): The column name for the ground truth
-        query (str): The label to query for. 'vague' or 'not_vague'
+        ground_truth (np.ndarray, optional): The ground truth labels. Required if df is an array.
 
     Returns:
         float: average precision @ k
     """
 
-    if k is None or k > df.shape[0]:
-        k = df.shape[0]
+    scores, labels = _extract_ranking_data(df, vague_prob_column, not_vague_prob_column, ground_truth_column, ground_truth)
+    if query not in scores:
+        raise ValueError(f'Query="{query}" is not supported.')
+
+    if k is None or k > labels.shape[0]:
+        k = labels.shape[0]
     LOGGER.info('Calculate average precision @ k for query="%s" and k="%s"', query, k)
+    if k == 0:
+        return _build_quotient(0, 0)
+
+    return float(_calc_average_precision_curve(scores[query], labels, _QUERY_LABELS[query], [k])[0])
+
+
+@instrumented
+def calc_average_precision_at_ks(df: Union[pd.DataFrame, np.ndarray], ks=None, vague_prob_column='vague_prob', not_vague_prob_column='not_vague_prob', ground_truth_column='majority_label', ground_truth=None) -> Dict[str, np.ndarray]:  # pylint:disable=too-many-arguments
+    """
+    Calculate the average precision @ k of both queries for every k (or the given ks) at once.
+    Each query ranks the entries with a single argsort. The precisions at all ranks are derived from cumulative sums.
+
+    Args:
+        df (Union[pd.DataFrame, np.ndarray]): The data frame or the classification probabilities ([not vague, vague] per row)
+        ks (list, optional): The ks to calculate the average precision for. Defaults to None which uses k = 1, ..., number of entries.
+        vague_prob_column (str): The column name for vague probabilities
+        not_vague_prob_column (str): The column name for not vague probabilites
+        ground_truth_column (int): The column name for the ground truth
+        ground_truth (np.ndarray, optional): The ground truth labels. Required if df is an array.
+
+    Returns:
+        Dict[str, np.ndarray]: The average precisions @ k for the queries 'not_vague' and 'vague'.
+    """
+
+    scores, labels = _extract_ranking_data(df, vague_prob_column, not_vague_prob_column, ground_truth_column, ground_truth)
+    if ks is None:
+        ks = np.arange(1, labels.shape[0] + 1)
+
+    return {
+        query: _calc_average_precision_curve(query_scores, labels, _QUERY_LABELS[query], ks)
+        for query, query_scores in scores.items()
+    }
+
+
+def _extract_ranking_data(df: Union[pd.DataFrame, np.ndarray], vague_prob_column: str, not_vague_prob_column: str, ground_truth_column: str, ground_truth) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    if isinstance(df, pd.DataFrame):
+        scores = {
+            'not_vague': df[not_vague_prob_column].to_numpy(),
+            'vague': df[vague_prob_column].to_numpy()
+        }
+        return scores, df[ground_truth_column].to_numpy()
+
+    if ground_truth is None:
+        raise ValueError('The ground truth is required for probability arrays.')
+
+    probabilities = np.asarray(df)
+    scores = {
+        'not_vague': probabilities[:, 0],
+        'vague': probabilities[:, 1]
+    }
+    return scores, np.asarray(ground_truth)
 
-    if query == 'vague':
-        sorted_df = df.sort_values(by=vague_prob_column, ascending=False).reset_index(drop=True)
-        queried_label = VAGUE_LABEL
-    elif query == 'not_vague':
-        sorted_df = df.sort_values(by=not_vague_prob_column, ascending=False).reset_index(drop=True)
-        queried_label = NOT_VAGUE_LABEL
-    else:
-        raise ValueError(f'Query="{query}" is not supported.')
 
-    score = 0
-    num_hits = 0
-    for index, row in sorted_df[:k].iterrows():
+def _calc_average_precision_curve(scores: np.ndarray, labels: np.ndarray, queried_label: int, ks) -> np.ndarray:
+    """
+    Calculate the average precision @ k for each of the given ks.
+    """
+    ks = np.asarray(ks, dtype=np.int64)
+    if ks.size and ks.min() < 1:
+        raise ValueError('k must be at least 1.')
+    if labels.shape[0] == 0:
+        return np.zeros(ks.shape)
 
-        # Hit
-        if queried_label == row[ground_truth_column]:
-            num_hits += 1
-            score += num_hits / (index+1)
+    # A stable sort keeps the original order for equal scores
+    order = np.argsort(-scores, kind='stable')
+    hits = labels[order] == queried_label
+    hit_counts = np.cumsum(hits)
+    precision_sums = np.cumsum(np.where(hits, hit_counts / np.arange(1, hits.shape[0] + 1), 0))
 
-    return _build_quotient(score, num_hits)
+    positions = np.minimum(ks, hits.shape[0]) - 1
+    return _build_quotient(precision_sums[positions], hit_counts[positions])
 
 
 def _build_quotient(dividend, denominator):
+    result, zero_count = _divide(dividend, denominator)
+    if zero_count:
+        LOGGER.warning('Denominator = 0 for %s of %s values. Skip metric calculation and set them to value="%s".', zero_count, np.size(result), 0)
+    return result
+
+
+def _divide(dividend, denominator) -> tuple:
+    """
+    Divide and set the quotient to 0 where the denominator is 0.
+
+    Returns:
+        tuple: The quotient and the number of zero denominators.
+    """
+    if isinstance(denominator, np.ndarray):
+        zero_denominators = denominator == 0
+        result = np.divide(dividend, denominator, out=np.zeros(np.broadcast(dividend, denominator).shape), where=~zero_denominators)
+        return result, int(zero_denominators.sum())
+
     if denominator != 0:
-        return dividend / denominator
+        return dividend / denominator, 0
 
-    result = 0
-    LOGGER.warning('Denominator = 0. Skip metric calculation and set it to value="%s".', result)
-    return result
+    return 0, 1
@@ -3,14 +3,26 @@
 #  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
 # ------------------------------------------------------------------------------------------------------
 
+from __future__ import annotations
+
 import logging
-from typing import List
+from typing import List, Union, TYPE_CHECKING
+
+from .constants import TP, TN, FP, FN, VAGUE_LABEL, THRESHOLD_COLUMN
+from .instrumentation import instrumented
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
 LOGGER = logging.getLogger(__name__)
 
+# numpy and pandas are imported on first use so that predicting lists does not import them
+# pylint: disable=import-outside-toplevel
+
 
-def predict_with_threshold(probabilities, vague_threshold=0.5) -> List[int]:
+@instrumented
+def predict_with_threshold(probabilities, vague_threshold=0.5) -> Union[List[int], np.ndarray]:
     """
     Classify the requirements as vague or not with a custom threshold.
     The first entry of a probability is considered the _not vague_ and the second entry the _vague_ probability
@@ -24,8 +36,75 @@ def predict_with_threshold(probabilities, vague_threshold=0.5) -> List[int]:
         vague_threshold (int): The threshold to count as vague requirement (default 0.5)
 
     Returns:
-        List[int]: The classification 0 if not vague 1 if vague
+        Union[List[int], np.ndarray]: The classification 0 if not vague 1 if vague. An int8 array if probabilities is an array.
     """
 
+    if not isinstance(probabilities, (list, tuple)):
+        import numpy as np
+        if isinstance(probabilities, np.ndarray):
+            return (probabilities[:, 1] >= vague_threshold).astype(np.int8)
+
     result = [1 if probability[1] >= vague_threshold else 0 for probability in probabilities]
     return result
+
+
+@instrumented
+def sweep_thresholds(probabilities, ground_truth, thresholds=None) -> pd.DataFrame:
+    """
+    Calculate the confusion counts and all metrics of predict_with_threshold for many thresholds at once.
+    The vague probabilities are sorted once. The counts of each threshold are derived from cumulative counts of the vague ground truth.
+
+    Args:
+        probabilities: The classification probabilities ([not vague, vague] per row) or only the vague probabilities
+        ground_truth: The ground truth labels
+        thresholds (optional): The thresholds to evaluate. Defaults to None which uses every distinct vague probability.
+
+    Returns:
+        pd.DataFrame: One row per threshold containing the threshold, the confusion counts and the metrics of calc_all_metrics.
+    """
+    import numpy as np
+    import pandas as pd
+
+    from .metrics import calc_all_metrics
+
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    vague_probabilities = probabilities[:, 1] if probabilities.ndim == 2 else probabilities
+
+    if thresholds is None:
+        thresholds = np.unique(vague_probabilities)
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    LOGGER.debug('Sweep %s thresholds over %s predictions.', thresholds.size, vague_probabilities.size)
+
+    counts = _count_confusions(vague_probabilities, np.asarray(ground_truth) == VAGUE_LABEL, thresholds)
+    return pd.DataFrame({
+        THRESHOLD_COLUMN: thresholds,
+        **counts,
+        **calc_all_metrics(**counts)
+    })
+
+
+def _count_confusions(vague_probabilities: np.ndarray, is_vague: np.ndarray, thresholds: np.ndarray) -> dict:
+    """
+    Count the confusions of each threshold. The vague probabilities are sorted once and the counts of each threshold
+    are derived from cumulative counts of the vague ground truth.
+    """
+    import numpy as np
+
+    order = np.argsort(vague_probabilities, kind='stable')
+    sorted_probabilities = vague_probabilities[order]
+    # vague_below[i] is the number of vague requirements among the i lowest probabilities
+    vague_below = np.concatenate(([0], np.cumsum(is_vague[order])))
+
+    # Everything at or above the threshold is predicted as vague
+    not_vague_predictions = np.searchsorted(sorted_probabilities, thresholds, side='left')
+    vague_count = vague_below[-1]
+    not_vague_count = vague_probabilities.size - vague_count
+
+    true_positives = vague_count - vague_below[not_vague_predictions]
+    false_positives = (vague_probabilities.size - not_vague_predictions) - true_positives
+    return {
+        TP: true_positives,
+        TN: not_vague_count - false_positives,
+        FP: false_positives,
+        FN: vague_count - true_positives
+    }
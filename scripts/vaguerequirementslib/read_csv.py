@@ -3,67 +3,168 @@
 #  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
 # ------------------------------------------------------------------------------------------------------
 
+import os
 from os import path
 import logging
+import pickle
 import sys
-from typing import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Iterable, Iterator
 import pandas as pd
 
-from .constants import MTURK_LEGACY_ANSWER_COLUMN, MTURK_ANSWER_COLUMN
+from .cache import DEFAULT_CACHE_MAX_BYTES, FileCache, build_cache_key
+from .constants import MTURK_LEGACY_COLUMNS, MTURK_ANSWER_COLUMN, MTURK_REQUIREMENT_COLUMN
+from .instrumentation import instrumented
 
 LOGGER = logging.getLogger(__name__)
 
+# Increase the version whenever the preprocessing changes to invalidate cached data frames
+_PARSE_CACHE_VERSION = 1
+_PARSE_CACHE_SUFFIX = '.pkl'
+
 #pylint: disable=invalid-name
 
 
-def read_csv_file(file_name: str, separator: str = ',') -> pd.DataFrame:
+@instrumented
+def read_csv_file(file_name: str, separator: str = ',', cache_dir: str = None, cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> pd.DataFrame:
     """
     Read a single CSV file in a data frame.
+    If a cache directory is given the preprocessed data frame is stored there in a binary format and re-used
+    as long as the file's path, size and modification time, the separator and the preprocessing stay the same.
 
     Args:
         file_name (str): The CSV file path.
         separator (str, optional): The CSV column separator. Defaults to ','.
+        cache_dir (str, optional): The parse cache directory. Defaults to None which disables the cache.
+        cache_max_bytes (int, optional): The maximum size of the parse cache. Defaults to DEFAULT_CACHE_MAX_BYTES.
 
     Returns:
         pd.DataFrame: The read data frame.
     """
-    if path.isabs(file_name):
-        abs_file_path = file_name
-    else:
-        abs_file_path = path.join(path.abspath(path.dirname(sys.modules['__main__'].__file__)), file_name)
+    abs_file_path = _get_abs_file_path(file_name)
+
+    if cache_dir is not None:
+        cache = FileCache(cache_dir, cache_max_bytes)
+        file_stat = os.stat(abs_file_path)
+        cache_key = build_cache_key(_PARSE_CACHE_VERSION, path.realpath(abs_file_path), file_stat.st_size, file_stat.st_mtime_ns, separator, MTURK_LEGACY_COLUMNS)
+        cached_path = cache.get(cache_key, _PARSE_CACHE_SUFFIX)
+        if cached_path is not None:
+            try:
+                df = pd.read_pickle(cached_path)
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError) as error:
+                # Evicted by another process after the lookup or corrupt. Parse the file again.
+                LOGGER.debug('Ignore the parse cache entry of file="%s": %s', file_name, error)
+            else:
+                LOGGER.debug('Read file="%s" with %s rows from the parse cache.', file_name, df.shape[0])
+                return df
+
     df = pd.read_csv(abs_file_path, sep=separator)
     LOGGER.debug('Read file="%s" with %s rows.', file_name, df.shape[0])
 
     # Preprocessing
-    df = df.rename(columns={MTURK_LEGACY_ANSWER_COLUMN: MTURK_ANSWER_COLUMN})  # Rename legacy column names
+    df = df.rename(columns=MTURK_LEGACY_COLUMNS)  # Rename legacy column names
+
+    if cache_dir is not None:
+        cache.put(cache_key, _PARSE_CACHE_SUFFIX, df.to_pickle)
     return df
 
 
-def read_csv_files_iterator(file_names: list, separator: str = ',') -> Iterator[pd.DataFrame]:
+def read_csv_file_chunks(  # pylint:disable=too-many-arguments
+        file_name: str,
+        separator: str = ',',
+        columns: Iterable[str] = (MTURK_REQUIREMENT_COLUMN, MTURK_ANSWER_COLUMN),
+        categorical_columns: Iterable[str] = (MTURK_ANSWER_COLUMN,),
+        chunk_size: int = 100000,
+        string_columns: Iterable[str] = ()) -> Iterator[pd.DataFrame]:
+    """
+    Read a single CSV file in chunks of data frames containing only the given columns.
+    Legacy column names are renamed like in read_csv_file. Only one chunk is held in memory at a time,
+    so the chunks can be folded into e.g. a ConfusionMatrixAggregator to process files larger than the memory.
+
+    Args:
+        file_name (str): The CSV file path.
+        separator (str, optional): The CSV column separator. Defaults to ','.
+        columns (Iterable[str], optional): The columns to read. Defaults to the requirement and the answer column.
+        categorical_columns (Iterable[str], optional): The columns with few distinct values that are read as categoricals. Defaults to the answer column.
+        chunk_size (int, optional): The number of rows per chunk. Defaults to 100000.
+        string_columns (Iterable[str], optional): The columns that are read as strings even if all their values look numeric. Defaults to ().
+
+    Yields:
+        Iterator[pd.DataFrame]: The iterator of the data frame chunks.
+    """
+    columns = set(columns)
+    legacy_columns = {legacy: current for legacy, current in MTURK_LEGACY_COLUMNS.items() if current in columns}
+    dtypes = {column: str for column in string_columns}
+    dtypes.update({column: 'category' for column in categorical_columns})
+    dtypes.update({legacy: dtypes[current] for legacy, current in legacy_columns.items() if current in dtypes})
+
+    reader = pd.read_csv(
+        _get_abs_file_path(file_name),
+        sep=separator,
+        usecols=lambda column: column in columns or column in legacy_columns,
+        dtype=dtypes,
+        chunksize=chunk_size)
+
+    try:
+        for index, chunk in enumerate(reader):
+            LOGGER.debug('Read chunk %s of file="%s" with %s rows.', index, file_name, chunk.shape[0])
+            yield chunk.rename(columns=legacy_columns)
+    finally:
+        reader.close()
+
+
+def read_csv_files_iterator(file_names: list, separator: str = ',', max_workers: int = None, use_processes: bool = False, cache_dir: str = None) -> Iterator[pd.DataFrame]:
     """
     Read all csv files and return an iterator over the corresponding data frames.
+    With max_workers > 1 the files are read concurrently. The data frames are still yielded in the order of file_names.
 
     Args:
         file_names (list): A list of all file names.
         separator (str, optional): The CSV file column separator. Defaults to ','.
+        max_workers (int, optional): The number of workers reading files concurrently. Defaults to None which reads one file after another.
+        use_processes (bool, optional): Use worker processes instead of threads. Defaults to False.
+        cache_dir (str, optional): The parse cache directory. See read_csv_file. Defaults to None which disables the cache.
 
     Yields:
         Iterator[pd.DataFrame]: The iterator of the data frame.
     """
-    for name in file_names:
-        yield read_csv_file(name, separator=separator)
+    if not max_workers or max_workers <= 1:
+        for name in file_names:
+            yield read_csv_file(name, separator=separator, cache_dir=cache_dir)
+        return
 
+    # Resolve relative paths here because worker processes do not share the __main__ module
+    abs_file_paths = [_get_abs_file_path(name) for name in file_names]
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    LOGGER.debug('Read %s files using %s workers.', len(abs_file_paths), max_workers)
+    with executor_class(max_workers=max_workers) as executor:
+        yield from executor.map(partial(read_csv_file, separator=separator, cache_dir=cache_dir), abs_file_paths)
 
-def read_csv_files(file_names: list, separator: str = ',') -> pd.DataFrame:
+
+@instrumented
+def read_csv_files(file_names: list, separator: str = ',', max_workers: int = None, use_processes: bool = False, cache_dir: str = None) -> pd.DataFrame:
     """
     Read csv files into one single data frame.
 
     Args:
         file_names (list): A list of all file names.
         separator (str, optional): The CSV file column separator. Defaults to ','.
+        max_workers (int, optional): The number of workers reading files concurrently. Defaults to None which reads one file after another.
+        use_processes (bool, optional): Use worker processes instead of threads. Defaults to False.
+        cache_dir (str, optional): The parse cache directory. See read_csv_file. Defaults to None which disables the cache.
 
     Returns:
         pd.DataFrame: The data frame containing all CSV files.
     """
-    result = pd.concat(read_csv_files_iterator(file_names, separator=separator), ignore_index=True)
+    result = pd.concat(read_csv_files_iterator(file_names, separator=separator, max_workers=max_workers, use_processes=use_processes, cache_dir=cache_dir), ignore_index=True)
     return result
+
+
+def _get_abs_file_path(file_name: str) -> str:
+    """
+    Resolve relative file paths against the directory of the executed script.
+    """
+    if path.isabs(file_name):
+        return file_name
+    return path.join(path.abspath(path.dirname(sys.modules['__main__'].__file__)), file_name)
@@ -0,0 +1,108 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import json
+import logging
+import os
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+LOGGER = logging.getLogger(__name__)
+
+_FILE_FORMAT_VERSION = 1
+
+
+class RequirementIndex:
+    """
+    Interns requirement texts to stable integer IDs.
+    IDs are assigned in order of first occurrence and never change, so aggregations can run on the IDs
+    and the texts are only re-attached for the output.
+
+    Args:
+        requirements (Iterable[str], optional): Requirements to intern initially.
+    """
+
+    def __init__(self, requirements: Iterable[str] = ()):
+        self._requirement_to_id = {}
+        self._requirements = []
+        self.encode(list(requirements))
+
+    def __len__(self) -> int:
+        return len(self._requirements)
+
+    def encode(self, requirements) -> np.ndarray:
+        """
+        Get the IDs of the given requirements. Unknown requirements are added to the index.
+        Each distinct text is hashed only once per call.
+
+        Args:
+            requirements: The requirement texts.
+
+        Returns:
+            np.ndarray: The requirement IDs. Missing requirements (NaN/None) get the ID -1.
+        """
+        codes, uniques = pd.factorize(np.asarray(requirements, dtype=object))
+        unique_ids = np.empty(len(uniques) + 1, dtype=np.int64)
+        for position, requirement in enumerate(uniques):
+            requirement_id = self._requirement_to_id.get(requirement)
+            if requirement_id is None:
+                requirement_id = len(self._requirements)
+                self._requirement_to_id[requirement] = requirement_id
+                self._requirements.append(requirement)
+            unique_ids[position] = requirement_id
+
+        # The last entry maps missing requirements (code -1)
+        unique_ids[-1] = -1
+        return unique_ids[codes]
+
+    def decode(self, requirement_ids) -> np.ndarray:
+        """
+        Get the texts of the given requirement IDs.
+
+        Args:
+            requirement_ids: The requirement IDs.
+
+        Returns:
+            np.ndarray: The requirement texts.
+        """
+        return np.asarray(self._requirements, dtype=object)[np.asarray(requirement_ids, dtype=np.int64)]
+
+    def save(self, file_name: str) -> None:
+        """
+        Save the index so that the IDs stay stable across runs.
+
+        Args:
+            file_name (str): The file path.
+        """
+        temp_file_name = f'{file_name}.tmp'
+        with open(temp_file_name, 'w', encoding='utf8') as index_file:
+            json.dump({'version': _FILE_FORMAT_VERSION, 'requirements': self._requirements}, index_file, ensure_ascii=False)
+        os.replace(temp_file_name, file_name)
+        LOGGER.debug('Saved %s requirements to file="%s".', len(self), file_name)
+
+    @classmethod
+    def load(cls, file_name: str, missing_ok: bool = False) -> 'RequirementIndex':
+        """
+        Load a saved index.
+
+        Args:
+            file_name (str): The file path.
+            missing_ok (bool, optional): Return an empty index if the file does not exist. Defaults to False.
+
+        Returns:
+            RequirementIndex: The loaded index.
+        """
+        if missing_ok and not os.path.exists(file_name):
+            return cls()
+
+        with open(file_name, 'r', encoding='utf8') as index_file:
+            content = json.load(index_file)
+        if content.get('version') != _FILE_FORMAT_VERSION:
+            raise ValueError(f'Unsupported requirement index version="{content.get("version")}" in file="{file_name}".')
+
+        LOGGER.debug('Loaded %s requirements from file="%s".', len(content['requirements']), file_name)
+        return cls(content['requirements'])
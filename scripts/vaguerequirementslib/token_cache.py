@@ -0,0 +1,257 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import hashlib
+import logging
+import os
+import time
+import unicodedata
+from itertools import chain
+from typing import Callable, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import DEFAULT_CACHE_MAX_BYTES, SQLiteStore
+from .instrumentation import instrumented
+
+LOGGER = logging.getLogger(__name__)
+
+# Increase the version whenever the entry format or the text normalization changes to clear all caches
+_TOKEN_CACHE_VERSION = 2
+_TOKEN_CACHE_FILE_NAME = 'token-cache.sqlite'
+_TOKEN_ID_DTYPE = np.dtype('<i4')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS vocabulary (token_id INTEGER PRIMARY KEY, token TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS texts (
+    key BLOB PRIMARY KEY,
+    token_ids BLOB NOT NULL,
+    last_used INTEGER NOT NULL
+) WITHOUT ROWID;
+'''
+
+
+class TokenizedTexts(NamedTuple):
+    vocabulary: np.ndarray  # The distinct tokens
+    offsets: np.ndarray  # The tokens of text i are token_ids[offsets[i]:offsets[i + 1]]
+    token_ids: np.ndarray  # The vocabulary positions of all tokens
+
+    def tokens(self, position: int) -> List[str]:
+        """
+        Get the tokens of a single text.
+
+        Args:
+            position (int): The position of the text.
+
+        Returns:
+            List[str]: The tokens.
+        """
+        return self.vocabulary[self.token_ids[self.offsets[position]:self.offsets[position + 1]]].tolist()
+
+
+class TokenCache(SQLiteStore):
+    """
+    A persistent, size bounded cache of tokenized texts backed by an SQLite database.
+    Each normalized text is an entry addressed by the hash of the tokenizer identity and the text, so unchanged texts are never tokenized twice,
+    no matter which file, batch or run they come from. All entries share one vocabulary and store the token IDs of their text.
+    The least recently used entries are evicted on close (or evict) until the entries are not larger than max_bytes.
+
+    Args:
+        directory (str): The cache directory. It is created if it does not exist.
+        max_bytes (int, optional): The maximum size of the entries. Defaults to DEFAULT_CACHE_MAX_BYTES.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        super().__init__(os.path.join(directory, _TOKEN_CACHE_FILE_NAME), _SCHEMA)
+        with self._connection:
+            self._check_version('token_cache_version', _TOKEN_CACHE_VERSION, ('texts', 'vocabulary'))
+
+        # The token ID of a token is its position in the vocabulary
+        self._vocabulary = [token for token, in self._connection.execute('SELECT token FROM vocabulary ORDER BY token_id')]
+        self._token_to_id = {token: token_id for token_id, token in enumerate(self._vocabulary)}
+
+    def close(self) -> None:
+        """
+        Evict the least recently used entries and close the database.
+        """
+        self.evict()
+        super().close()
+
+    def tokenize(self, texts: List[str], tokenizer: Callable[[str], List[str]], tokenizer_id: str = None) -> TokenizedTexts:
+        """
+        Tokenize the texts or load their tokens from the cache.
+        The texts are normalized (see normalize_text) before tokenizing and hashing. Only texts missing in the cache are tokenized.
+
+        Args:
+            texts (List[str]): The texts.
+            tokenizer (Callable[[str], List[str]]): Splits a text into tokens.
+            tokenizer_id (str, optional): Identifies the tokenizer and its version. Defaults to None which uses the tokenizer's qualified name.
+
+        Returns:
+            TokenizedTexts: The tokens of the texts.
+        """
+        normalized_texts = [normalize_text(text) for text in texts]
+        tokenizer_id = tokenizer_id or get_tokenizer_id(tokenizer)
+        token_ids = self.load(normalized_texts, tokenizer_id)
+        missing_texts = [text for text, text_token_ids in zip(normalized_texts, token_ids) if text_token_ids is None]
+        return self.complete(normalized_texts, tokenizer_id, token_ids, tokenize_texts(missing_texts, tokenizer))
+
+    def load(self, texts: List[str], tokenizer_id: str) -> List[Optional[np.ndarray]]:
+        """
+        Load the cached token IDs of the texts and mark them as recently used.
+
+        Args:
+            texts (List[str]): The normalized texts. See normalize_text.
+            tokenizer_id (str): Identifies the tokenizer and its version.
+
+        Returns:
+            List[Optional[np.ndarray]]: The token IDs of each text or None if the text is not cached.
+        """
+        keys = [build_token_cache_key(text, tokenizer_id) for text in texts]
+        cached = dict(self._select_in('SELECT key, token_ids FROM texts WHERE key', keys))
+
+        with self._connection:
+            self._connection.executemany('UPDATE texts SET last_used = ? WHERE key = ?', ((time.time_ns(), key) for key in cached))
+
+        LOGGER.debug('Found %s of %s texts in the token cache.', len(cached), len(keys))
+        return [np.frombuffer(cached[key], dtype=_TOKEN_ID_DTYPE) if key in cached else None for key in keys]
+
+    def complete(self, texts: List[str], tokenizer_id: str, token_ids: List[Optional[np.ndarray]], missing_tokenized_texts: TokenizedTexts) -> TokenizedTexts:
+        """
+        Save the tokens of the texts missing in the cache and combine them with the cached ones.
+
+        Args:
+            texts (List[str]): The normalized texts. See normalize_text.
+            tokenizer_id (str): Identifies the tokenizer and its version.
+            token_ids (List[Optional[np.ndarray]]): The cached token IDs of each text or None if it is missing (see load).
+            missing_tokenized_texts (TokenizedTexts): The tokens of the missing texts in order of their occurrence.
+
+        Returns:
+            TokenizedTexts: The tokens of all texts.
+        """
+        missing_positions = [position for position, text_token_ids in enumerate(token_ids) if text_token_ids is None]
+        if missing_positions:
+            token_ids = list(token_ids)
+            for position, text_token_ids in zip(missing_positions, self._save([texts[position] for position in missing_positions], tokenizer_id, missing_tokenized_texts)):
+                token_ids[position] = text_token_ids
+
+        # Re-number the token IDs so that the vocabulary only contains the tokens of these texts
+        offsets = np.zeros(len(token_ids) + 1, dtype=np.int64)
+        np.cumsum([text_token_ids.shape[0] for text_token_ids in token_ids], out=offsets[1:])
+        unique_ids, local_ids = np.unique(np.concatenate([np.empty(0, dtype=_TOKEN_ID_DTYPE), *token_ids]), return_inverse=True)
+        return TokenizedTexts(
+            vocabulary=np.array([self._vocabulary[token_id] for token_id in unique_ids], dtype=object),
+            offsets=offsets,
+            token_ids=local_ids.astype(np.int32))
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the entries are not larger than max_bytes. The vocabulary is kept.
+        """
+        total_bytes = self._connection.execute('SELECT COALESCE(SUM(LENGTH(key) + LENGTH(token_ids)), 0) FROM texts').fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+
+        evicted_keys = []
+        for key, size in self._connection.execute('SELECT key, LENGTH(key) + LENGTH(token_ids) FROM texts ORDER BY last_used'):
+            if total_bytes <= self.max_bytes:
+                break
+            evicted_keys.append((key,))
+            total_bytes -= size
+
+        with self._connection:
+            self._connection.executemany('DELETE FROM texts WHERE key = ?', evicted_keys)
+        # Shrink the database file
+        self._connection.execute('VACUUM')
+        LOGGER.debug('Evicted %s texts from the token cache.', len(evicted_keys))
+
+    def _save(self, texts: List[str], tokenizer_id: str, tokenized_texts: TokenizedTexts) -> List[np.ndarray]:
+        """
+        Add the tokenized texts to the cache.
+
+        Returns:
+            List[np.ndarray]: The token IDs of each text.
+        """
+        new_token_count = len(self._vocabulary)
+        for token in tokenized_texts.vocabulary.tolist():
+            if token not in self._token_to_id:
+                self._token_to_id[token] = len(self._vocabulary)
+                self._vocabulary.append(token)
+
+        # Map the positions in the vocabulary of the tokenized texts to the token IDs of the cache
+        token_ids = np.array([self._token_to_id[token] for token in tokenized_texts.vocabulary.tolist()], dtype=_TOKEN_ID_DTYPE)[tokenized_texts.token_ids]
+        text_token_ids = np.split(token_ids, tokenized_texts.offsets[1:-1])
+
+        last_used = time.time_ns()
+        with self._connection:
+            self._connection.executemany(
+                'INSERT INTO vocabulary (token_id, token) VALUES (?, ?)',
+                enumerate(self._vocabulary[new_token_count:], start=new_token_count))
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO texts (key, token_ids, last_used) VALUES (?, ?, ?)',
+                ((build_token_cache_key(text, tokenizer_id), ids.tobytes(), last_used) for text, ids in zip(texts, text_token_ids)))
+        return text_token_ids
+
+
+@instrumented
+def tokenize_texts(texts: List[str], tokenizer: Callable[[str], List[str]]) -> TokenizedTexts:
+    """
+    Tokenize the texts into a vocabulary and token IDs.
+
+    Args:
+        texts (List[str]): The texts.
+        tokenizer (Callable[[str], List[str]]): Splits a text into tokens.
+
+    Returns:
+        TokenizedTexts: The tokens of the texts.
+    """
+    tokens = [tokenizer(text) for text in texts]
+    token_ids, vocabulary = pd.factorize(np.fromiter(chain.from_iterable(tokens), dtype=object, count=sum(map(len, tokens))))
+    offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+    np.cumsum([len(text_tokens) for text_tokens in tokens], out=offsets[1:])
+    return TokenizedTexts(vocabulary=np.asarray(vocabulary, dtype=object), offsets=offsets, token_ids=token_ids.astype(np.int32))
+
+
+def build_token_cache_key(text: str, tokenizer_id: str) -> bytes:
+    """
+    Build the cache key of a (normalized) text.
+
+    Args:
+        text (str): The text.
+        tokenizer_id (str): Identifies the tokenizer and its version.
+
+    Returns:
+        bytes: The cache key.
+    """
+    return hashlib.sha256(f'{tokenizer_id}\0{text}'.encode('utf8')).digest()
+
+
+def get_tokenizer_id(tokenizer: Callable[[str], List[str]]) -> str:
+    """
+    Get the qualified name of the tokenizer.
+
+    Args:
+        tokenizer (Callable[[str], List[str]]): The tokenizer.
+
+    Returns:
+        str: The tokenizer ID.
+    """
+    return f'{getattr(tokenizer, "__module__", None)}.{getattr(tokenizer, "__qualname__", type(tokenizer).__qualname__)}'
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize the text to Unicode NFC and collapse all whitespace to single spaces.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: The normalized text.
+    """
+    return ' '.join(unicodedata.normalize('NFC', text).split())
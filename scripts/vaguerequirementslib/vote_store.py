@@ -0,0 +1,183 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .cache import SQLiteStore
+from .confusion_matrix import build_category_counts, VoteCounts
+from .constants import MTURK_ANSWER_COLUMN, MTURK_REQUIREMENT_COLUMN, MTURK_ASSIGNMENT_ID_COLUMN, MTURK_VAGUE_ANSWER_LABELS, MTURK_NOT_VAGUE_ANSWER_LABELS, CM_REQUIREMENT_COLUMN, CM_VAGUE_COUNT_COLUMN, CM_NOT_VAGUE_COUNT_COLUMN
+from .kappa import calculate_fleiss_kappa, calculate_free_marginal_kappa
+from .read_csv import read_csv_file_chunks
+
+LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS requirements (id INTEGER PRIMARY KEY, text TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS assignments (assignment_id TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS votes (
+    requirement_id INTEGER NOT NULL,
+    category INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (requirement_id, category)
+) WITHOUT ROWID;
+'''
+
+
+class VoteStore(SQLiteStore):
+    """
+    A persistent store of the vote counts per requirement backed by an SQLite database.
+    New batches are folded into the stored counts. Assignments already stored are skipped, so the cost of an update only depends on the batch size.
+    The defaults are set to handle an Amazon MTurk Batch Result data frame.
+
+    Args:
+        database_path (str): The SQLite database file. It is created if it does not exist.
+        categories (dict, optional): Maps each count column name to the answers/labels counted in it.
+            Defaults to None which counts MTURK_VAGUE_ANSWER_LABELS and MTURK_NOT_VAGUE_ANSWER_LABELS.
+            Must match the categories the store was created with.
+    """
+
+    def __init__(self, database_path: str, categories: dict = None):
+        self._categories = {column: list(labels) for column, labels in (categories or {
+            CM_VAGUE_COUNT_COLUMN: MTURK_VAGUE_ANSWER_LABELS,
+            CM_NOT_VAGUE_COUNT_COLUMN: MTURK_NOT_VAGUE_ANSWER_LABELS
+        }).items()}
+        super().__init__(database_path, _SCHEMA)
+        with self._connection:
+            self._check_categories()
+
+    def add_batch(
+            self,
+            data_frame: pd.DataFrame,
+            requirement_column: str = MTURK_REQUIREMENT_COLUMN,
+            answer_column: str = MTURK_ANSWER_COLUMN,
+            assignment_column: str = MTURK_ASSIGNMENT_ID_COLUMN) -> int:
+        """
+        Add the votes of a batch. Assignments that are already stored are skipped.
+
+        Args:
+            data_frame (pd.DataFrame): The batch data frame
+            requirement_column (str, optional): The columns name that contains the requirements. Defaults to MTURK_REQUIREMENT_COLUMN.
+            answer_column (str, optional): The columns name that contains the answers/labels. Defaults to MTURK_ANSWER_COLUMN.
+            assignment_column (str, optional): The columns name that contains the assignment IDs. Defaults to MTURK_ASSIGNMENT_ID_COLUMN.
+
+        Returns:
+            int: The number of added assignments.
+        """
+        batch = data_frame[[requirement_column, answer_column, assignment_column]].dropna(subset=[requirement_column, assignment_column])
+        batch = batch.drop_duplicates(subset=[assignment_column])
+        assignment_ids = batch[assignment_column].astype(str)
+
+        with self._connection:
+            known_rows = self._select_in('SELECT assignment_id FROM assignments WHERE assignment_id', assignment_ids.tolist())
+            known_assignment_ids = [assignment_id for assignment_id, in known_rows]
+            new_assignments = ~assignment_ids.isin(known_assignment_ids).to_numpy()
+            batch = batch[new_assignments]
+            LOGGER.info('Add %s new assignments. Skipped %s stored assignments.', batch.shape[0], int((~new_assignments).sum()))
+            if batch.empty:
+                return 0
+
+            self._connection.executemany('INSERT INTO assignments (assignment_id) VALUES (?)', ((assignment_id,) for assignment_id in assignment_ids[new_assignments]))
+
+            counts = build_category_counts(batch, requirement_column, answer_column, self._categories)
+            requirement_ids = self._get_requirement_ids(counts.index.tolist())
+
+            # Ensure every requirement has a row per category, then add the batch counts
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO votes (requirement_id, category, count) VALUES (?, ?, 0)',
+                ((requirement_id, category) for requirement_id in requirement_ids for category in range(len(self._categories))))
+            rows, categories = np.nonzero(counts.to_numpy())
+            self._connection.executemany(
+                'UPDATE votes SET count = count + ? WHERE requirement_id = ? AND category = ?',
+                ((int(counts.iat[row, category]), requirement_ids[row], int(category)) for row, category in zip(rows, categories)))
+
+        return batch.shape[0]
+
+    def add_batch_file(self, file_name: str, separator: str = ',', chunk_size: int = 100000) -> int:
+        """
+        Add the votes of an MTurk batch result file. The file is streamed in chunks.
+
+        Args:
+            file_name (str): The CSV file path.
+            separator (str, optional): The CSV column separator. Defaults to ','.
+            chunk_size (int, optional): The number of rows per chunk. Defaults to 100000.
+
+        Returns:
+            int: The number of added assignments.
+        """
+        columns = (MTURK_REQUIREMENT_COLUMN, MTURK_ANSWER_COLUMN, MTURK_ASSIGNMENT_ID_COLUMN)
+        return sum(self.add_batch(chunk) for chunk in read_csv_file_chunks(file_name, separator, columns=columns, chunk_size=chunk_size))
+
+    def confusion_matrix(self, drop_ties: bool = False) -> pd.DataFrame:
+        """
+        Build the confusion matrix of all stored votes.
+
+        Args:
+            drop_ties (bool, optional): If there is a tie in votes (e.g.: One votes for vague one for not vague) then drop this entry from the confusion matrix.
+
+        Returns:
+            pd.DataFrame: The confusion matrix
+        """
+        return self.vote_counts().confusion_matrix(drop_ties)
+
+    def vote_counts(self) -> VoteCounts:
+        """
+        Get the counts of all stored votes.
+
+        Returns:
+            VoteCounts: The vote counts
+        """
+        votes = pd.read_sql_query('SELECT r.text, v.category, v.count FROM votes v JOIN requirements r ON r.id = v.requirement_id', self._connection)
+
+        requirement_codes, requirements = pd.factorize(votes['text'], sort=True)
+        counts = np.zeros((len(requirements), len(self._categories)), dtype=np.int64)
+        counts[requirement_codes, votes['category'].to_numpy()] = votes['count'].to_numpy()
+
+        return VoteCounts(pd.DataFrame(counts, index=pd.Index(requirements, name=CM_REQUIREMENT_COLUMN), columns=list(self._categories)))
+
+    def majority_labels(self, prefer_vague: bool = True) -> pd.DataFrame:
+        """
+        Calculate the majority label of each stored requirement.
+
+        Args:
+            prefer_vague (bool, optional): Indicates whether for a tie in votes the majority label is "vague" or "not vague".
+
+        Returns:
+            pd.DataFrame: The confusion matrix including the majority label.
+        """
+        return self.vote_counts().majority_labels(prefer_vague=prefer_vague)
+
+    def kappa(self, free_marginal: bool = False) -> float:
+        """
+        Calculate the kappa of all stored votes.
+
+        Args:
+            free_marginal (bool, optional): Calculate the free marginal kappa instead of Fleiss' kappa. Defaults to False.
+
+        Returns:
+            float: The kappa
+        """
+        confusion_matrix = self.confusion_matrix()
+        return calculate_free_marginal_kappa(confusion_matrix) if free_marginal else calculate_fleiss_kappa(confusion_matrix)
+
+    def _check_categories(self) -> None:
+        stored_categories = self._get_meta('categories')
+        if stored_categories is None:
+            self._set_meta('categories', json.dumps(self._categories))
+        # The votes store the position of each category, so the order matters too. Dict equality ignores it.
+        elif _to_ordered_categories(json.loads(stored_categories)) != _to_ordered_categories(self._categories):
+            raise ValueError(f'The store was created with different categories="{stored_categories}".')
+
+    def _get_requirement_ids(self, requirements: list) -> list:
+        self._connection.executemany('INSERT OR IGNORE INTO requirements (text) VALUES (?)', ((requirement,) for requirement in requirements))
+        text_to_id = dict(self._select_in('SELECT text, id FROM requirements WHERE text', requirements))
+        return [text_to_id[requirement] for requirement in requirements]
+
+
+def _to_ordered_categories(categories: dict) -> list:
+    return [[column, list(labels)] for column, labels in categories.items()]
@@ -0,0 +1,191 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import logging
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cache import DEFAULT_CACHE_MAX_BYTES
+from .constants import \
+    CM_REQUIREMENT_COLUMN, \
+    MAJORITY_LABEL_COLUMN, \
+    VAGUE_LABEL, \
+    NOT_VAGUE_LABEL, \
+    WC_WORD_COLUMN, \
+    WC_OVERALL_COUNT_COLUMN, \
+    WC_VAGUE_COUNT_COLUMN, \
+    WC_NOT_VAGUE_COUNT_COLUMN, \
+    WC_DIFFERENCE_COLUMN
+from .instrumentation import instrumented
+from .token_cache import TokenCache, TokenizedTexts, get_tokenizer_id, normalize_text, tokenize_texts
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=too-many-arguments
+
+
+def word_tokenize(text: str) -> List[str]:
+    """
+    Tokenize the text with nltk's word_tokenize. nltk is only imported on first use.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        List[str]: The tokens.
+    """
+    # nltk is optional (pip install vaguerequirementslib[nltk]) and only required by this default tokenizer
+    from nltk import word_tokenize as nltk_word_tokenize  # pylint: disable=import-outside-toplevel, import-error
+    return nltk_word_tokenize(text)
+
+
+@instrumented
+def count_words(
+        data_frames: Iterable[pd.DataFrame],
+        requirement_column: str = CM_REQUIREMENT_COLUMN,
+        label_column: str = MAJORITY_LABEL_COLUMN,
+        tokenizer: Callable[[str], List[str]] = word_tokenize,
+        batch_size: int = 10000,
+        max_workers: int = None,
+        cache_dir: str = None,
+        cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        tokenizer_id: str = None) -> pd.DataFrame:
+    """
+    Count the words of all requirements overall and per majority label.
+    The requirements are normalized (see normalize_text) and tokenized in batches. With max_workers > 1 the batches are tokenized in worker processes
+    and the Counters of the batches are merged. With a token cache only requirements missing in it are tokenized.
+
+    Args:
+        data_frames (Iterable[pd.DataFrame]): The data frames containing the requirements and their majority label (e.g. of read_csv_files_iterator).
+        requirement_column (str, optional): The columns name that contains the requirements. Defaults to CM_REQUIREMENT_COLUMN.
+        label_column (str, optional): The columns name that contains the majority label. Defaults to MAJORITY_LABEL_COLUMN.
+        tokenizer (Callable[[str], List[str]], optional): Splits a requirement into words. Must be picklable for max_workers > 1. Defaults to word_tokenize.
+        batch_size (int, optional): The number of requirements per batch. Defaults to 10000.
+        max_workers (int, optional): The number of worker processes. Defaults to None which tokenizes in this process.
+        cache_dir (str, optional): The token cache directory. See TokenCache. Defaults to None which disables the cache.
+        cache_max_bytes (int, optional): The maximum size of the token cache. Defaults to DEFAULT_CACHE_MAX_BYTES.
+        tokenizer_id (str, optional): Identifies the tokenizer and its version in the token cache. Defaults to None which uses the tokenizer's qualified name.
+
+    Returns:
+        pd.DataFrame: The overall, vague and not vague count and the absolute difference of the latter two per word.
+    """
+    batches = _iter_batches(data_frames, requirement_column, label_column, batch_size)
+
+    # One cache for the whole run. Closing it evicts the least recently used entries once.
+    token_cache = TokenCache(cache_dir, cache_max_bytes) if cache_dir is not None else None
+    try:
+        counters = _count_tokens(_tokenize_batches(batches, tokenizer, max_workers, token_cache, tokenizer_id or get_tokenizer_id(tokenizer)))
+    finally:
+        if token_cache is not None:
+            token_cache.close()
+
+    return _build_word_count_frame(*counters)
+
+
+def _iter_batches(data_frames: Iterable[pd.DataFrame], requirement_column: str, label_column: str, batch_size: int) -> Iterator[Tuple[list, list]]:
+    for df in data_frames:
+        labels = df[label_column]
+        unknown_labels = ~labels.isin((VAGUE_LABEL, NOT_VAGUE_LABEL))
+        if unknown_labels.any():
+            raise ValueError(f'Cannot handle unknown majority_label="{labels[unknown_labels].iloc[0]}".')
+
+        # Normalize with or without the token cache so that the counts do not depend on it
+        texts = [normalize_text(text) for text in df[requirement_column].tolist()]
+        is_vague = (labels == VAGUE_LABEL).tolist()
+        for start in range(0, len(texts), batch_size):
+            yield texts[start:start + batch_size], is_vague[start:start + batch_size]
+
+
+def _tokenize_batches(
+        batches: Iterator[Tuple[list, list]],
+        tokenizer: Callable[[str], List[str]],
+        max_workers: int,
+        token_cache: Optional[TokenCache],
+        tokenizer_id: str) -> Iterator[Tuple[TokenizedTexts, list]]:
+    """
+    Tokenize the batches in order. With a token cache only the texts missing in it are tokenized.
+    The cache is only accessed by this process, the worker processes only tokenize.
+    """
+    tokenize = partial(tokenize_texts, tokenizer=tokenizer)
+    if token_cache is None:
+        for is_vague, tokenized_texts in _map_bounded(tokenize, ((is_vague, texts) for texts, is_vague in batches), max_workers):
+            yield tokenized_texts, is_vague
+        return
+
+    def lookup_batches():
+        for texts, is_vague in batches:
+            token_ids = token_cache.load(texts, tokenizer_id)
+            yield (texts, is_vague, token_ids), [text for text, text_token_ids in zip(texts, token_ids) if text_token_ids is None]
+
+    for (texts, is_vague, token_ids), missing_tokenized_texts in _map_bounded(tokenize, lookup_batches(), max_workers):
+        yield token_cache.complete(texts, tokenizer_id, token_ids, missing_tokenized_texts), is_vague
+
+
+def _map_bounded(function: Callable, items: Iterator[Tuple[object, object]], max_workers: int) -> Iterator[Tuple[object, object]]:
+    """
+    Apply the function to the second entry of each item in order and yield the first entry with the result.
+    With max_workers > 1 the function runs in worker processes.
+    """
+    if not max_workers or max_workers <= 1:
+        for state, argument in items:
+            yield state, function(argument)
+        return
+
+    LOGGER.debug('Tokenize using %s worker processes.', max_workers)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Bound the number of pending batches so that the corpus is not held in memory at once
+        pending = deque()
+        for state, argument in items:
+            pending.append((state, executor.submit(function, argument)))
+            if len(pending) >= 2 * max_workers:
+                state, future = pending.popleft()
+                yield state, future.result()
+        while pending:
+            state, future = pending.popleft()
+            yield state, future.result()
+
+
+def _count_tokens(tokenized_batches: Iterator[Tuple[TokenizedTexts, list]]) -> Tuple[Counter, Counter, Counter]:
+    vague_counter = Counter()
+    not_vague_counter = Counter()
+    overall_counter = Counter()
+    for tokenized_texts, is_vague in tokenized_batches:
+        # Count the token IDs of the vague and the not vague texts
+        is_vague_token = np.repeat(np.asarray(is_vague, dtype=bool), np.diff(tokenized_texts.offsets))
+        vocabulary_size = tokenized_texts.vocabulary.shape[0]
+        batch_vague_counter = _to_counter(tokenized_texts, np.bincount(tokenized_texts.token_ids[is_vague_token], minlength=vocabulary_size))
+        batch_not_vague_counter = _to_counter(tokenized_texts, np.bincount(tokenized_texts.token_ids[~is_vague_token], minlength=vocabulary_size))
+
+        vague_counter.update(batch_vague_counter)
+        not_vague_counter.update(batch_not_vague_counter)
+        overall_counter.update(batch_vague_counter)
+        overall_counter.update(batch_not_vague_counter)
+
+    LOGGER.info('Counted %s distinct words.', len(overall_counter))
+    return vague_counter, not_vague_counter, overall_counter
+
+
+def _build_word_count_frame(vague_counter: Counter, not_vague_counter: Counter, overall_counter: Counter) -> pd.DataFrame:
+    # Join the three count maps on the words at once
+    words = pd.Index(list(overall_counter), name=WC_WORD_COLUMN, dtype=object)
+    vague_counts = pd.Series(vague_counter, dtype=np.int64).reindex(words, fill_value=0).to_numpy()
+    not_vague_counts = pd.Series(not_vague_counter, dtype=np.int64).reindex(words, fill_value=0).to_numpy()
+    return pd.DataFrame({
+        WC_WORD_COLUMN: words,
+        WC_OVERALL_COUNT_COLUMN: np.fromiter(overall_counter.values(), dtype=np.int64, count=len(overall_counter)),
+        WC_VAGUE_COUNT_COLUMN: vague_counts,
+        WC_NOT_VAGUE_COUNT_COLUMN: not_vague_counts,
+        WC_DIFFERENCE_COLUMN: np.abs(not_vague_counts - vague_counts)
+    })
+
+
+def _to_counter(tokenized_texts: TokenizedTexts, counts: np.ndarray) -> Counter:
+    present = np.flatnonzero(counts)
+    return Counter(dict(zip(tokenized_texts.vocabulary[present].tolist(), counts[present].tolist())))
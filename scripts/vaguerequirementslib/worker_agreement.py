@@ -0,0 +1,118 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .category_counts import build_label_to_category_map, encode_categories
+from .constants import \
+    MTURK_ANSWER_COLUMN, \
+    MTURK_REQUIREMENT_COLUMN, \
+    MTURK_WORKER_ID_COLUMN, \
+    MTURK_VAGUE_ANSWER_LABELS, \
+    MTURK_NOT_VAGUE_ANSWER_LABELS, \
+    WA_FIRST_WORKER_COLUMN, \
+    WA_SECOND_WORKER_COLUMN, \
+    WA_SHARED_ITEMS_COLUMN, \
+    WA_AGREEMENT_COLUMN, \
+    WA_KAPPA_COLUMN
+from .instrumentation import instrumented
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=invalid-name, too-many-arguments, too-many-locals
+
+
+@instrumented
+def calc_worker_agreement(
+        data_frame: pd.DataFrame,
+        requirement_column: str = MTURK_REQUIREMENT_COLUMN,
+        answer_column: str = MTURK_ANSWER_COLUMN,
+        worker_column: str = MTURK_WORKER_ID_COLUMN,
+        categories: dict = None,
+        min_shared_items: int = 1) -> pd.DataFrame:
+    """
+    Calculate the raw agreement and Cohen's kappa of every pair of workers that rated the same requirements.
+    Only pairs sharing at least one requirement are returned, so the result stays small for thousands of workers.
+    The answer pairs of all co-rated requirements are expanded at once and counted with a single bincount per (worker pair, answer, answer).
+    The defaults are set to handle an Amazon MTurk Batch Result data frame.
+
+    Args:
+        data_frame (pd.DataFrame): The data frame
+        requirement_column (str, optional): The columns name that contains the requirements. Defaults to MTURK_REQUIREMENT_COLUMN.
+        answer_column (str, optional): The columns name that contains the answers/labels. Defaults to MTURK_ANSWER_COLUMN.
+        worker_column (str, optional): The columns name that contains the worker IDs. Defaults to MTURK_WORKER_ID_COLUMN.
+        categories (dict, optional): Maps each category name to the answers/labels of it.
+            Defaults to None which uses the categories "vague" and "not_vague" with the MTurk answer labels.
+        min_shared_items (int, optional): The minimum number of shared requirements of a returned pair. Defaults to 1.
+
+    Returns:
+        pd.DataFrame: One row per worker pair with the number of shared requirements, the raw agreement and Cohen's kappa.
+            Kappa is NaN if the expected agreement of a pair is 1.
+    """
+    if categories is None:
+        categories = {'vague': MTURK_VAGUE_ANSWER_LABELS, 'not_vague': MTURK_NOT_VAGUE_ANSWER_LABELS}
+    K = len(categories)
+
+    requirement_codes, _ = pd.factorize(data_frame[requirement_column])
+    worker_codes, workers = pd.factorize(data_frame[worker_column], sort=True)
+    answer_codes = encode_categories(data_frame[answer_column], requirement_codes >= 0, build_label_to_category_map(categories))
+
+    valid = (requirement_codes >= 0) & (worker_codes >= 0) & (answer_codes >= 0)
+    order = np.argsort(requirement_codes[valid], kind='stable')
+    items, item_workers, answers = requirement_codes[valid][order], worker_codes[valid][order], answer_codes[valid][order]
+
+    first, second = _expand_pairs(items)
+    first_workers, second_workers = item_workers[first], item_workers[second]
+    first_answers, second_answers = answers[first], answers[second]
+
+    # Order each pair by worker code and drop pairs of a worker with itself
+    swap = first_workers > second_workers
+    first_workers, second_workers = np.where(swap, second_workers, first_workers), np.where(swap, first_workers, second_workers)
+    first_answers, second_answers = np.where(swap, second_answers, first_answers), np.where(swap, first_answers, second_answers)
+    distinct = first_workers != second_workers
+
+    pair_keys = first_workers[distinct].astype(np.int64) * len(workers) + second_workers[distinct]
+    unique_pair_keys, pair_codes = np.unique(pair_keys, return_inverse=True)
+    P = unique_pair_keys.shape[0]
+    LOGGER.info('Found %s worker pairs with shared requirements among %s workers.', P, len(workers))
+
+    # One K x K contingency table per worker pair
+    tables = np.bincount(
+        (pair_codes * K + first_answers[distinct]) * K + second_answers[distinct],
+        minlength=P * K * K).reshape(P, K, K).astype(np.float64)
+    shared_items = tables.sum(axis=(1, 2))
+    observed = np.trace(tables, axis1=1, axis2=2) / shared_items
+    expected = np.einsum('pk,pk->p', tables.sum(axis=2), tables.sum(axis=1)) / shared_items**2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kappas = np.where(expected < 1, (observed - expected) / (1 - expected), np.nan)
+
+    df = pd.DataFrame({
+        WA_FIRST_WORKER_COLUMN: np.asarray(workers)[unique_pair_keys // len(workers)],
+        WA_SECOND_WORKER_COLUMN: np.asarray(workers)[unique_pair_keys % len(workers)],
+        WA_SHARED_ITEMS_COLUMN: shared_items.astype(np.int64),
+        WA_AGREEMENT_COLUMN: observed,
+        WA_KAPPA_COLUMN: kappas
+    })
+    return df[df[WA_SHARED_ITEMS_COLUMN] >= min_shared_items].reset_index(drop=True)
+
+
+def _expand_pairs(items: np.ndarray):
+    """
+    Build all pairs of positions that share the same item. The items must be sorted.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The first and second position of each pair.
+    """
+    positions = np.arange(items.shape[0])
+    group_ends = np.searchsorted(items, items, side='right')
+    partner_counts = group_ends - positions - 1
+
+    first = np.repeat(positions, partner_counts)
+    pair_starts = np.cumsum(partner_counts) - partner_counts
+    second = first + 1 + np.arange(first.shape[0]) - np.repeat(pair_starts, partner_counts)
+    return first, second
@@ -0,0 +1,54 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+_SCRIPTS_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_STATEMENT_MARKER = 'vaguerequirementslib_benchmark: statement started'
+
+
+class ImportTime(NamedTuple):
+    seconds: float  # The cumulative import time of all top level imports
+    modules: List[str]  # The imported modules in import order
+
+
+def measure_import_time(statement: str = 'import vaguerequirementslib') -> ImportTime:
+    """
+    Measure the import time of the statement in a fresh interpreter with "python -X importtime".
+    Modules imported by the interpreter's startup are excluded.
+
+    Args:
+        statement (str, optional): The python statement to run. Defaults to 'import vaguerequirementslib'.
+
+    Returns:
+        ImportTime: The import time and the modules imported by the statement.
+    """
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join(filter(None, [_SCRIPTS_DIRECTORY, environment.get('PYTHONPATH')]))
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import sys; sys.stderr.write({_STATEMENT_MARKER!r} + "\\n"); sys.stderr.flush(); {statement}'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=environment,
+        universal_newlines=True,
+        check=True)
+
+    microseconds = 0
+    modules = []
+    statement_started = False
+    for line in completed.stderr.splitlines():
+        if line == _STATEMENT_MARKER:
+            statement_started = True
+        if not statement_started or not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append(name.strip())
+        if not name.startswith('  '):
+            microseconds += int(cumulative)
+
+    return ImportTime(seconds=microseconds / 10**6, modules=modules)
@@ -0,0 +1,150 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+from functools import partial
+from time import perf_counter
+from typing import Callable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from vaguerequirementslib.confusion_matrix import build_confusion_matrix
+from vaguerequirementslib.constants import VAGUE_LABEL, MAJORITY_LABEL_COLUMN
+from vaguerequirementslib.kappa import calculate_fleiss_kappa, calculate_free_marginal_kappa
+from vaguerequirementslib.majority_label import calc_majority_label
+from vaguerequirementslib.metrics import calc_mean_average_precision
+from vaguerequirementslib.prediction import predict_with_threshold
+from vaguerequirementslib.read_csv import read_csv_files
+from vaguerequirementslib_benchmark.import_time import measure_import_time
+from vaguerequirementslib_benchmark.synthetic_batch import build_synthetic_batch
+
+logging.basicConfig(
+    format='%(asctime)s [%(name)-20.20s] [%(levelname)-5.5s]  %(message)s',
+    stream=sys.stdout,
+    level=logging.INFO)
+
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.DEBUG)
+
+_RESULT_FORMAT_VERSION = 2
+
+# pylint: disable=invalid-name
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the vaguerequirementslib hot paths on synthetic MTurk batches.')
+    parser.add_argument('--row-counts', type=int, nargs='+', default=[10**3, 10**4, 10**5, 10**6, 10**7], help='The batch sizes.')
+    parser.add_argument('--repeat', type=int, default=3, help='Take the fastest of this many runs.')
+    parser.add_argument('--seed', type=int, default=0, help='The seed of the synthetic batches.')
+    parser.add_argument('--legacy', action='store_true', help='Generate batches with the legacy answer column.')
+    parser.add_argument('--output', default='benchmark-results.json', help='The JSON result file.')
+    args = parser.parse_args()
+
+    # Silence the library while timing
+    logging.getLogger('vaguerequirementslib').setLevel(logging.WARNING)
+
+    results = run_benchmarks(args.row_counts, args.repeat, args.seed, args.legacy)
+    with open(args.output, 'w', encoding='utf8') as result_file:
+        json.dump(results, result_file, indent=2)
+    LOGGER.info('Wrote %s results to file="%s".', len(results['results']), args.output)
+
+
+def run_benchmarks(row_counts: list, repeat: int = 3, seed: int = 0, legacy: bool = False) -> dict:
+    """
+    Time and memory-profile the library functions on synthetic batches of each size.
+
+    Args:
+        row_counts (list): The batch sizes.
+        repeat (int, optional): Take the fastest of this many runs. Defaults to 3.
+        seed (int, optional): The seed of the synthetic batches. Defaults to 0.
+        legacy (bool, optional): Generate batches with the legacy answer column. Defaults to False.
+
+    Returns:
+        dict: The environment, the package import time and one result per function and size.
+    """
+    import_time = measure_import_time()
+    LOGGER.info('Importing the package took %.4fs and imported %s modules.', import_time.seconds, len(import_time.modules))
+
+    results = []
+    for row_count in row_counts:
+        _benchmark_batch(results, row_count, repeat, seed, legacy)
+
+    return {
+        'version': _RESULT_FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__
+        },
+        'parameters': {'repeat': repeat, 'seed': seed, 'legacy': legacy},
+        'import': {'seconds': import_time.seconds, 'module_count': len(import_time.modules)},
+        'results': results
+    }
+
+
+def _benchmark_batch(results: list, row_count: int, repeat: int, seed: int, legacy: bool) -> None:  # pylint:disable=too-many-arguments
+    """
+    Benchmark all functions on one synthetic batch of the given size and append the results.
+    The benchmarked calls are bound with partial, so each one runs on the inputs of this batch.
+    """
+    df = build_synthetic_batch(row_count, legacy=legacy, seed=seed)
+    rng = np.random.default_rng(seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        batch_file = os.path.join(directory, 'batch.csv')
+        df.to_csv(batch_file, index=False)
+        df = _benchmark(results, 'read_csv_files', row_count, repeat, partial(read_csv_files, [batch_file]))
+
+    confusion_matrix = _benchmark(results, 'build_confusion_matrix', row_count, repeat, partial(build_confusion_matrix, df))
+    _benchmark(results, 'calculate_fleiss_kappa', row_count, repeat, partial(calculate_fleiss_kappa, confusion_matrix))
+    _benchmark(results, 'calculate_free_marginal_kappa', row_count, repeat, partial(calculate_free_marginal_kappa, confusion_matrix))
+    majority_labels = _benchmark(results, 'calc_majority_label', row_count, repeat, partial(calc_majority_label, confusion_matrix))
+
+    # Noisy classifier probabilities for the majority labels
+    vague_probabilities = np.clip((majority_labels[MAJORITY_LABEL_COLUMN].to_numpy() == VAGUE_LABEL) * 0.6 + rng.random(majority_labels.shape[0]) * 0.4, 0, 1)
+    prediction_df = pd.DataFrame({'vague_prob': vague_probabilities, 'not_vague_prob': 1 - vague_probabilities, MAJORITY_LABEL_COLUMN: majority_labels[MAJORITY_LABEL_COLUMN]})
+    _benchmark(results, 'calc_mean_average_precision', row_count, repeat, partial(calc_mean_average_precision, prediction_df))
+    probabilities = np.column_stack([1 - vague_probabilities, vague_probabilities])
+    _benchmark(results, 'predict_with_threshold', row_count, repeat, partial(predict_with_threshold, probabilities, 0.4))
+
+
+def _benchmark(results: list, function_name: str, row_count: int, repeat: int, function: Callable):
+    """
+    Time the function (fastest of repeat runs) and measure its peak memory in a separate traced run.
+    The result is appended to results and the function's return value is returned.
+    """
+    seconds, value = min((_time(function) for _ in range(max(repeat, 1))), key=lambda timing: timing[0])
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    LOGGER.info('rows=%s: %s took %.4fs with a peak memory of %.1f MiB.', row_count, function_name, seconds, peak_bytes / 1024**2)
+    results.append({'function': function_name, 'rows': row_count, 'seconds': seconds, 'peak_bytes': peak_bytes})
+    return value
+
+
+def _time(function: Callable) -> Tuple[float, object]:
+    start = perf_counter()
+    value = function()
+    return perf_counter() - start, value
+
+
+if __name__ == '__main__':
+    main()
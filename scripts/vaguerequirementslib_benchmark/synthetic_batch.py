@@ -0,0 +1,81 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+from vaguerequirementslib.constants import \
+    MTURK_ANSWER_COLUMN, \
+    MTURK_LEGACY_ANSWER_COLUMN, \
+    MTURK_REQUIREMENT_COLUMN, \
+    MTURK_ASSIGNMENT_ID_COLUMN, \
+    MTURK_WORKER_ID_COLUMN
+
+VAGUE_ANSWER = '1 - Yes, it is vague'
+NOT_VAGUE_ANSWER = '2 - No, it is not vague'
+CANNOT_DECIDE_ANSWER = '3 - Cannot decide'
+LEGACY_VAGUE_ANSWER = '1 - Yes, contains vague words'
+LEGACY_NOT_VAGUE_ANSWER = '2 - No, contains no vague words'
+
+# pylint: disable=too-many-arguments, too-many-locals
+
+
+def build_synthetic_batch(
+        row_count: int,
+        assignments_per_hit: int = 3,
+        worker_count: int = None,
+        vague_share: float = 0.3,
+        noise: float = 0.15,
+        cannot_decide_share: float = 0.05,
+        legacy: bool = False,
+        seed: int = 0) -> pd.DataFrame:
+    """
+    Build a synthetic Amazon MTurk Batch Result with one row per assignment.
+    Each requirement (HIT) gets assignments_per_hit assignments of distinct workers if possible.
+    Worker activity follows a power law, so a few workers do most of the assignments,
+    and each worker flips the true label with an individual error rate around noise.
+
+    Args:
+        row_count (int): The number of assignments.
+        assignments_per_hit (int, optional): The number of assignments per requirement. Defaults to 3.
+        worker_count (int, optional): The number of workers. Defaults to None which uses about one worker per 100 assignments.
+        vague_share (float, optional): The share of truly vague requirements. Defaults to 0.3.
+        noise (float, optional): The mean error rate of the workers. Defaults to 0.15.
+        cannot_decide_share (float, optional): The share of "cannot decide" answers. Ignored for legacy batches. Defaults to 0.05.
+        legacy (bool, optional): Use the legacy answer column and labels of the vague words batches. Defaults to False.
+        seed (int, optional): The seed. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: The batch data frame
+    """
+    rng = np.random.default_rng(seed)
+    if worker_count is None:
+        worker_count = max(assignments_per_hit, row_count // 100)
+
+    hit_count = -(-row_count // assignments_per_hit)
+    requirement_ids = np.repeat(np.arange(hit_count), assignments_per_hit)[:row_count]
+    is_vague = rng.random(hit_count) < vague_share
+
+    # Power law worker activity. Consecutive assignments of a HIT get distinct workers unless there are too few workers.
+    activity = 1 / np.arange(1, worker_count + 1)**1.1
+    workers = rng.choice(worker_count, size=hit_count, p=activity / activity.sum())
+    worker_ids = (workers[requirement_ids] + np.arange(row_count) % assignments_per_hit) % worker_count
+
+    error_rates = np.clip(rng.beta(2, 2 / noise - 2, size=worker_count), 0, 0.5) if noise > 0 else np.zeros(worker_count)
+    answers_vague = is_vague[requirement_ids] ^ (rng.random(row_count) < error_rates[worker_ids])
+
+    if legacy:
+        answers = np.where(answers_vague, LEGACY_VAGUE_ANSWER, LEGACY_NOT_VAGUE_ANSWER).astype(object)
+    else:
+        answers = np.where(answers_vague, VAGUE_ANSWER, NOT_VAGUE_ANSWER).astype(object)
+        answers[rng.random(row_count) < cannot_decide_share] = CANNOT_DECIDE_ANSWER
+
+    order = rng.permutation(row_count)
+    return pd.DataFrame({
+        MTURK_ASSIGNMENT_ID_COLUMN: pd.Series(order).map('A{:09d}'.format),
+        MTURK_WORKER_ID_COLUMN: pd.Series(worker_ids[order]).map('W{:06d}'.format),
+        MTURK_REQUIREMENT_COLUMN: pd.Series(requirement_ids[order]).map('The system shall handle requirement {}.'.format),
+        MTURK_LEGACY_ANSWER_COLUMN if legacy else MTURK_ANSWER_COLUMN: answers[order]
+    })
@@ -0,0 +1,32 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+from vaguerequirementslib import compare_label_sources, calculate_fleiss_kappa, calculate_free_marginal_kappa
+
+
+def _build_source(labels: dict) -> pd.DataFrame:
+    return pd.DataFrame({'requirement': list(labels), 'majority_label': list(labels.values())})
+
+
+def test_compare_label_sources():
+    sources = [
+        _build_source({'a': 1, 'b': 0, 'c': 1, 'd': 0, 'x': 1}),
+        _build_source({'d': 0, 'c': 0, 'b': 0, 'a': 1}),
+        _build_source({'a': 1, 'b': 1, 'c': 1, 'd': 0, 'y': 0}),
+    ]
+
+    result = compare_label_sources(iter(sources))
+
+    # "x" and "y" are not labeled by every source
+    expected = pd.DataFrame({'requirement': ['a', 'b', 'c', 'd'], 'vague_count': [3, 1, 2, 0], 'not_vague_count': [0, 2, 1, 3]})
+    pd.testing.assert_frame_equal(result.confusion_matrix, expected, check_dtype=False)
+    assert result.requirements_count == 4
+    assert result.unequal_label_count == 2
+    assert result.unequal_label_percentage == 50.0
+    assert np.isclose(result.fleiss_kappa, calculate_fleiss_kappa(expected))
+    assert np.isclose(result.free_marginal_kappa, calculate_free_marginal_kappa(expected))
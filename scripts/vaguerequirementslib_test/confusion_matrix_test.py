@@ -0,0 +1,85 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vaguerequirementslib import build_confusion_matrix, aggregate_votes, calc_majority_label, ConfusionMatrixAggregator, read_csv_file_chunks
+from vaguerequirementslib.constants import MTURK_ANSWER_COLUMN, MTURK_LEGACY_ANSWER_COLUMN, MTURK_REQUIREMENT_COLUMN, MTURK_CANNOT_DECIDE_ANSWER_LABELS, CM_CANNOT_DECIDE_COUNT_COLUMN
+
+#pylint:disable=invalid-name
+
+@pytest.fixture
+def batch_df():
+    return pd.DataFrame.from_dict({
+        MTURK_REQUIREMENT_COLUMN: ['b', 'a', 'b', 'c', 'a', 'c', 'b', 'd'],
+        MTURK_ANSWER_COLUMN: [
+            '1 - Yes, it is vague',
+            '2 - No, it is not vague',
+            '3 - Cannot decide',
+            '2 - No, it is not vague',
+            '2 - No, it is not vague',
+            '1 - Yes, it is vague',
+            '2 - No, it is not vague',
+            'unknown'
+        ]
+    })
+
+
+def test_build_confusion_matrix_correctly(batch_df):
+    result = build_confusion_matrix(batch_df)
+
+    assert result['requirement'].tolist() == ['a', 'b', 'c', 'd']
+    assert result['vague_count'].tolist() == [0, 2, 1, 0]
+    assert result['not_vague_count'].tolist() == [2, 1, 1, 0]
+
+
+def test_build_confusion_matrix_drops_ties(batch_df):
+    result = build_confusion_matrix(batch_df, drop_ties=True)
+
+    assert result['requirement'].tolist() == ['a', 'b']
+
+
+def test_build_confusion_matrix_with_custom_categories(batch_df):
+    categories = {
+        'vague_count': ('1 - Yes, it is vague',),
+        'not_vague_count': ('2 - No, it is not vague',),
+        CM_CANNOT_DECIDE_COUNT_COLUMN: MTURK_CANNOT_DECIDE_ANSWER_LABELS
+    }
+
+    result = build_confusion_matrix(batch_df, categories=categories)
+
+    assert result.columns.tolist() == ['requirement', 'vague_count', 'not_vague_count', CM_CANNOT_DECIDE_COUNT_COLUMN]
+    np.testing.assert_array_equal(result[['vague_count', 'not_vague_count', CM_CANNOT_DECIDE_COUNT_COLUMN]].to_numpy(), [[0, 2, 0], [1, 1, 1], [1, 1, 0], [0, 0, 0]])
+
+
+def test_build_confusion_matrix_rejects_ambiguous_categories(batch_df):
+    with pytest.raises(ValueError):
+        build_confusion_matrix(batch_df, categories={'a': ('x',), 'b': ('x',)})
+
+
+def test_confusion_matrix_aggregator_matches_build_confusion_matrix(batch_df, tmp_path):
+    file_path = tmp_path / 'batch.csv'
+    legacy_df = batch_df.rename(columns={MTURK_ANSWER_COLUMN: MTURK_LEGACY_ANSWER_COLUMN})
+    legacy_df['WorkerId'] = 'worker'
+    legacy_df.to_csv(file_path, index=False)
+
+    aggregator = ConfusionMatrixAggregator()
+    for chunk in read_csv_file_chunks(str(file_path), chunk_size=3):
+        assert chunk.columns.tolist() == [MTURK_REQUIREMENT_COLUMN, MTURK_ANSWER_COLUMN]
+        aggregator.update(chunk)
+
+    pd.testing.assert_frame_equal(aggregator.confusion_matrix(), build_confusion_matrix(batch_df))
+
+
+def test_aggregate_votes_views_match_separate_passes(batch_df):
+    vote_counts = aggregate_votes(batch_df)
+
+    pd.testing.assert_frame_equal(vote_counts.confusion_matrix(), build_confusion_matrix(batch_df))
+    pd.testing.assert_frame_equal(vote_counts.confusion_matrix(drop_ties=True), build_confusion_matrix(batch_df, drop_ties=True))
+    pd.testing.assert_frame_equal(vote_counts.majority_labels(), calc_majority_label(build_confusion_matrix(batch_df)))
+    assert vote_counts.ties().tolist() == ['c', 'd']
+    assert vote_counts.vote_totals().to_dict() == {'vague_count': 3, 'not_vague_count': 4}
@@ -0,0 +1,62 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import pandas as pd
+import pytest
+
+from vaguerequirementslib import slice_corpus
+
+
+@pytest.fixture
+def corpus_file(tmp_path):
+    corpus = pd.DataFrame({
+        'sentence': [f'text {number % 7}' for number in range(10)] + ['info'],
+        'label': ['requirement'] * 5 + ['information'] * 5 + ['requirement']
+    })
+    file_path = tmp_path / 'corpus.csv'
+    corpus.to_csv(file_path, sep=';', index=False)
+    return str(file_path)
+
+
+def _read_batches(output_directory, file_names):
+    return [pd.read_csv(output_directory / file_name, sep=';')['requirement'].tolist() for file_name in file_names]
+
+
+def test_slice_corpus(corpus_file, tmp_path):
+    output_directory = tmp_path / 'batches'
+
+    assert slice_corpus(corpus_file, str(output_directory), batch_size=2, chunk_size=3, max_workers=2) == 3
+
+    assert _read_batches(output_directory, ['corpus-batch-0.csv', 'corpus-batch-1.csv', 'corpus-batch-2.csv']) == [
+        ['text 0', 'text 1'], ['text 2', 'text 3'], ['text 4', 'info']
+    ]
+
+
+def test_slice_corpus_stratified_and_shuffled(corpus_file, tmp_path):
+    output_directory = tmp_path / 'batches'
+
+    batches_count = slice_corpus(
+        corpus_file, str(output_directory), batch_size=4, labels=('requirement', 'information'), stratify=True, shuffle_buffer_size=3, seed=1)
+
+    # The duplicated "text 0" to "text 2" of the information rows are dropped
+    assert batches_count == 3
+    requirement_batches = _read_batches(output_directory, ['corpus-requirement-batch-0.csv', 'corpus-requirement-batch-1.csv'])
+    information_batches = _read_batches(output_directory, ['corpus-information-batch-0.csv'])
+    assert sorted(sum(requirement_batches, [])) == ['info', 'text 0', 'text 1', 'text 2', 'text 3', 'text 4']
+    assert sorted(sum(information_batches, [])) == ['text 5', 'text 6']
+
+    # Shuffling is reproducible
+    slice_corpus(corpus_file, str(tmp_path / 'other'), batch_size=4, labels=('requirement', 'information'), stratify=True, shuffle_buffer_size=3, seed=1)
+    assert _read_batches(tmp_path / 'other', ['corpus-requirement-batch-0.csv']) == requirement_batches[:1]
+
+
+def test_slice_corpus_keeps_numeric_sentences_as_text(tmp_path):
+    corpus_file = tmp_path / 'corpus.csv'
+    corpus_file.write_text('sentence;label\n123;requirement\n0456;requirement\n123;requirement\n', encoding='utf8')
+    output_directory = tmp_path / 'batches'
+
+    assert slice_corpus(str(corpus_file), str(output_directory)) == 1
+
+    assert (output_directory / 'corpus-batch-0.csv').read_text(encoding='utf8').splitlines() == ['"requirement"', '"123"', '"0456"']
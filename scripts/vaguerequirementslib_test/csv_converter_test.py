@@ -0,0 +1,60 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from vaguerequirementslib import convert_csv_files
+
+
+@pytest.fixture
+def source_files(tmp_path):
+    file_paths = []
+    for number in range(3):
+        file_path = tmp_path / f'source-{number}.csv'
+        file_path.write_text(f'Input.requirement;Answer.vague-words.label;count\n"The system; shall ""work""";2 - No;{number}\nFast;;1.50\n', encoding='utf8')
+        file_paths.append(str(file_path))
+    return file_paths
+
+
+def test_convert_csv_files_matches_pandas(source_files, tmp_path):
+    output_directory = tmp_path / 'converted'
+
+    assert convert_csv_files(source_files, str(output_directory), max_workers=2) == 3
+
+    converted_file = output_directory / 'source-1.csv'
+    assert converted_file.read_text(encoding='utf8').splitlines() == [
+        '"Input.requirement","Answer.vague-requirement.label","count"',
+        '"The system; shall ""work""","2 - No",1',
+        '"Fast","","1.50"'
+    ]
+
+    converted = pd.read_csv(converted_file, keep_default_na=False, dtype=str)
+    assert converted.columns.tolist() == ['Input.requirement', 'Answer.vague-requirement.label', 'count']
+    assert converted['Input.requirement'].tolist() == ['The system; shall "work"', 'Fast']
+    assert converted['Answer.vague-requirement.label'].tolist() == ['2 - No', '']
+    assert converted['count'].tolist() == ['1', '1.50']
+
+    # Apart from the renamed column the values equal the ones pandas parses from the source file
+    source = pd.read_csv(source_files[1], sep=';', keep_default_na=False, dtype=str)
+    pd.testing.assert_frame_equal(converted.drop(columns='Answer.vague-requirement.label'), source.drop(columns='Answer.vague-words.label'))
+
+
+def test_convert_csv_files_skips_unchanged_files(source_files, tmp_path):
+    manifest_file = str(tmp_path / 'manifest.json')
+
+    assert convert_csv_files(source_files, manifest_file=manifest_file) == 3
+    converted = [Path(file_path).read_text(encoding='utf8') for file_path in source_files]
+
+    # Converted in place, so a second run must not convert the converted files again
+    assert convert_csv_files(source_files, manifest_file=manifest_file) == 0
+    assert [Path(file_path).read_text(encoding='utf8') for file_path in source_files] == converted
+
+    with open(source_files[0], 'w', encoding='utf8') as source_file:
+        source_file.write('requirement;label\na;1\n')
+    assert convert_csv_files(source_files, manifest_file=manifest_file) == 1
+    assert not list(tmp_path.glob('*.tmp'))
@@ -0,0 +1,51 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vaguerequirementslib import calc_dawid_skene_labels, MTURK_REQUIREMENT_COLUMN, MTURK_ANSWER_COLUMN, MTURK_WORKER_ID_COLUMN
+
+VAGUE = '1 - Yes, it is vague'
+NOT_VAGUE = '2 - No, it is not vague'
+
+
+@pytest.fixture
+def batch():
+    # Two reliable workers and two spammers who always answer "vague"
+    rows = []
+    for requirement in range(20):
+        truth = VAGUE if requirement % 2 else NOT_VAGUE
+        for worker, answer in (('good1', truth), ('good2', truth), ('spam1', VAGUE), ('spam2', VAGUE)):
+            rows.append({MTURK_REQUIREMENT_COLUMN: f'req{requirement:02}', MTURK_WORKER_ID_COLUMN: worker, MTURK_ANSWER_COLUMN: answer})
+    return pd.DataFrame(rows)
+
+
+def test_calc_dawid_skene_labels(batch):
+    result = calc_dawid_skene_labels(batch)
+
+    assert result.converged
+    assert list(result.posteriors.columns) == ['requirement', 'vague_prob', 'not_vague_prob']
+    assert result.posteriors['requirement'].tolist() == [f'req{requirement:02}' for requirement in range(20)]
+
+    # The spammers cause ties in majority voting, the worker confusion resolves them
+    expected_vague = np.arange(20) % 2 == 1
+    np.testing.assert_array_equal(result.posteriors['vague_prob'].to_numpy() > 0.5, expected_vague)
+    np.testing.assert_allclose(result.posteriors[['vague_prob', 'not_vague_prob']].sum(axis=1), 1)
+
+    assert result.worker_confusion.loc[('good1', 'not_vague'), 'not_vague'] > 0.95
+    assert result.worker_confusion.loc[('spam1', 'not_vague'), 'vague'] > 0.95
+    np.testing.assert_allclose(result.class_priors.to_numpy(), [0.5, 0.5], atol=1e-3)
+
+
+def test_calc_dawid_skene_labels_skips_invalid_rows(batch):
+    batch.loc[0, MTURK_WORKER_ID_COLUMN] = None
+    batch.loc[1, MTURK_ANSWER_COLUMN] = 'unknown'
+
+    result = calc_dawid_skene_labels(batch)
+
+    assert result.posteriors.shape[0] == 20
+    assert result.worker_confusion.shape == (8, 2)
@@ -0,0 +1,82 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from vaguerequirementslib import find_best_runs, parse_evaluation_files, EvaluationIndex
+
+
+def _write_evaluation(file_path, recall: float, precision: float, hyperparameter: dict, mean_average_precision: float = None):
+    test_metrics = {'vague': {'recall': recall, 'precision': precision}}
+    if mean_average_precision is not None:
+        test_metrics['mean_average_precision'] = mean_average_precision
+    content = {
+        'fold_results': [{'metrics': {'test': {'vague': {'recall': 0, 'precision': 0}}}}, {'metrics': {'test': test_metrics}}],
+        'hyperparameter': {**hyperparameter, 'ngram_range': [1, 2]},
+        'data_set': {'resampling_strategy': 'none'}
+    }
+    file_path.write_text(json.dumps(content))
+    return str(file_path)
+
+
+@pytest.fixture
+def evaluation_files(tmp_path):
+    return [
+        _write_evaluation(tmp_path / 'a-evaluation.json', 0.5, 0.9, {'learning_rate': 0.1}, 0.7),
+        _write_evaluation(tmp_path / 'b-evaluation.json', 0.9, 0.4, {'epochs': 3}),
+        _write_evaluation(tmp_path / 'c-evaluation.json', 0.7, 0.6, {'learning_rate': 0.2, 'kfold_splits': 5}, 0.8),
+    ]
+
+
+def test_parse_evaluation_files(evaluation_files):
+    summaries = list(parse_evaluation_files(evaluation_files, max_workers=2))
+
+    assert summaries[0] == {'recall': 0.5, 'precision': 0.9, 'learning_rate': 0.1, 'resampling_strategy': 'none', 'kfold_splits': 2, 'mean_average_precision': 0.7}
+    assert np.isnan(summaries[1]['mean_average_precision'])
+    assert summaries[2]['kfold_splits'] == 5
+
+
+def test_find_best_runs(evaluation_files):
+    result = find_best_runs(parse_evaluation_files(evaluation_files), metrics=['recall', 'precision', 'mean_average_precision'], best_n=2)
+
+    assert result['recall']['recall'].tolist() == [0.9, 0.7]
+    assert result['precision']['precision'].tolist() == [0.9, 0.6]
+    assert result['mean_average_precision']['mean_average_precision'].tolist() == [0.8, 0.7]
+    # Hyperparameters missing in a run are NaN
+    assert np.isnan(result['recall']['learning_rate'].iat[0])
+    assert np.isnan(result['recall']['epochs'].iat[1])
+
+
+def test_find_best_runs_ranks_non_numeric_values_last():
+    summaries = [{'recall': 'n/a'}, {'recall': 0.4}, {'recall': None}, {'recall': [0.9]}, {'recall': 0.6}]
+
+    result = find_best_runs(summaries, metrics=['recall', 'resampling_strategy'], best_n=2)
+
+    assert result['recall']['recall'].tolist() == [0.6, 0.4]
+    assert result['resampling_strategy'].shape[0] == 2
+
+
+def test_evaluation_index(evaluation_files, tmp_path):
+    with EvaluationIndex(str(tmp_path / 'index.sqlite')) as index:
+        assert index.update(evaluation_files) == 3
+        assert index.update(evaluation_files) == 0
+
+        # Only the changed file is parsed again
+        _write_evaluation(tmp_path / 'b-evaluation.json', 0.1, 0.4, {'epochs': 3})
+        os.utime(evaluation_files[1], ns=(0, 0))
+        assert index.update(evaluation_files[:2]) == 1
+
+        result = index.query(['recall'], best_n=1)['recall']
+        assert result['recall'].tolist() == [0.5]
+        assert result['file_path'].tolist() == [os.path.abspath(evaluation_files[0])]
+
+        # The third file was pruned and queries do not read the files
+        os.remove(evaluation_files[1])
+        assert index.query(['recall'], filters={'epochs': 3})['recall']['recall'].tolist() == [0.1]
+        assert len(list(index.summaries())) == 2
@@ -0,0 +1,60 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import json
+import logging
+
+import pandas as pd
+import pytest
+
+from vaguerequirementslib import build_confusion_matrix, calc_majority_label, instrumentation
+
+VAGUE = '1 - Yes, it is vague'
+NOT_VAGUE = '2 - No, it is not vague'
+
+
+@pytest.fixture
+def batch_df():
+    return pd.DataFrame({
+        'Input.requirement': ['a', 'a', 'b', 'b', 'c'],
+        'Answer.vague-requirement.label': [VAGUE, VAGUE, NOT_VAGUE, VAGUE, NOT_VAGUE]
+    })
+
+
+@pytest.fixture(autouse=True)
+def disable_instrumentation():
+    yield
+    instrumentation.disable()
+
+
+def test_instrumentation_records_calls(batch_df, tmp_path):
+    sink = instrumentation.InMemorySink()
+    json_sink = instrumentation.JsonLinesSink(str(tmp_path / 'records.jsonl'))
+    instrumentation.enable(sink, json_sink)
+
+    calc_majority_label(build_confusion_matrix(batch_df))
+    json_sink.close()
+
+    records = {record['function'].rsplit('.', 1)[-1]: record for record in sink.records}
+    assert set(records) == {'build_confusion_matrix', 'aggregate_votes', 'build_category_counts', 'build_confusion_matrix_from_counts', 'calc_majority_label'}
+    assert (records['build_confusion_matrix']['rows_in'], records['build_confusion_matrix']['rows_out']) == (5, 3)
+    assert records['build_confusion_matrix']['seconds'] >= records['build_category_counts']['seconds'] > 0
+    assert records['build_confusion_matrix']['peak_bytes'] >= records['build_category_counts']['peak_bytes'] > 0
+    assert records['build_confusion_matrix_from_counts']['diagnostics'] == {'votes_per_category': {'vague_count': 3, 'not_vague_count': 2}}
+    assert records['calc_majority_label']['diagnostics'] == {'majority_label_counts': {'1': 2, '0': 1}}
+
+    lines = (tmp_path / 'records.jsonl').read_text().splitlines()
+    assert [json.loads(line)['function'] for line in lines] == [record['function'] for record in sink.records]
+
+
+def test_diagnostics_are_skipped_without_consumers(batch_df, monkeypatch, caplog):
+    caplog.set_level(logging.WARNING, logger='vaguerequirementslib')
+    confusion_matrix = build_confusion_matrix(batch_df)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('value_counts must not be called')
+    monkeypatch.setattr(pd.Series, 'value_counts', fail)
+
+    assert calc_majority_label(confusion_matrix)['majority_label'].tolist() == [1, 1, 0]
@@ -0,0 +1,66 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vaguerequirementslib import calculate_fleiss_kappa, calculate_free_marginal_kappa, calculate_kappas, calculate_kappa_confidence_interval
+
+#pylint:disable=invalid-name
+
+@pytest.fixture
+def counts():
+    # https://en.wikipedia.org/wiki/Fleiss%27_kappa#Worked_example
+    return np.array([
+        [0, 0, 0, 0, 14],
+        [0, 2, 6, 4, 2],
+        [0, 0, 3, 5, 6],
+        [0, 3, 9, 2, 0],
+        [2, 2, 8, 1, 1],
+        [7, 7, 0, 0, 0],
+        [3, 2, 6, 3, 0],
+        [2, 5, 3, 2, 2],
+        [6, 5, 2, 1, 0],
+        [0, 2, 2, 3, 7]
+    ])
+
+
+def test_calculate_fleiss_kappa_correctly(counts):
+    df = pd.DataFrame(counts)
+    df.insert(0, 'requirement', [f'req {i}' for i in range(counts.shape[0])])
+
+    assert pytest.approx(calculate_fleiss_kappa(df), abs=1e-3) == 0.210
+
+
+def test_calculate_free_marginal_kappa_correctly(counts):
+    P = np.mean((np.square(counts).sum(axis=1) - 14) / (14 * 13))
+
+    assert pytest.approx(calculate_free_marginal_kappa(counts)) == (P - 0.2) / 0.8
+
+
+def test_calculate_kappa_with_variable_raters_count():
+    counts = np.array([[2, 0], [1, 1], [3, 0], [0, 1], [0, 3]])
+
+    # Single rated requirements are ignored
+    assert pytest.approx(calculate_fleiss_kappa(counts)) == calculate_fleiss_kappa(counts[[0, 1, 2, 4]])
+    assert pytest.approx(calculate_free_marginal_kappa(counts)) == (3/4 - 1/2) / (1/2)
+
+
+def test_calculate_kappas_matches_single_calculation(counts):
+    matrices = [counts, counts[:4], pd.DataFrame(counts[5:])]
+
+    result = calculate_kappas(matrices)
+
+    np.testing.assert_allclose(result, [calculate_fleiss_kappa(matrix) for matrix in matrices])
+
+
+def test_calculate_kappa_confidence_interval_is_reproducible(counts):
+    serial = calculate_kappa_confidence_interval(counts, resamples=500, seed=42, chunk_size=100, max_workers=1)
+    parallel = calculate_kappa_confidence_interval(counts, resamples=500, seed=42, chunk_size=100, max_workers=2)
+
+    np.testing.assert_array_equal(serial.bootstrap_kappas, parallel.bootstrap_kappas)
+    assert serial.bootstrap_kappas.shape == (500,)
+    assert serial.lower <= serial.kappa <= serial.upper
@@ -0,0 +1,62 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import pandas as pd
+import pytest
+
+from vaguerequirementslib import calc_majority_label
+from vaguerequirementslib.majority_label import TIE_POLICY_DROP, TIE_POLICY_FIRST, TIE_POLICY_RANDOM
+
+
+@pytest.fixture
+def confusion_matrix():
+    return pd.DataFrame.from_dict({
+        'requirement': ['a', 'b', 'c', 'd'],
+        'vague_count': [2, 1, 0, 1],
+        'not_vague_count': [1, 1, 3, 0],
+        'cannot_decide_count': [0, 1, 0, 4]
+    })
+
+
+@pytest.mark.parametrize('prefer_vague,expected_result', [
+    (True, [1, 1, 0, 1]),
+    (False, [1, 0, 0, 1])
+])
+def test_calc_majority_label_correctly(confusion_matrix, prefer_vague, expected_result):
+    result = calc_majority_label(confusion_matrix, prefer_vague=prefer_vague)
+
+    assert result['majority_label'].tolist() == expected_result
+    assert 'majority_label' not in confusion_matrix
+
+
+def test_calc_majority_label_with_multiple_classes_and_weights(confusion_matrix):
+    label_columns = {'vague_count': 1, 'not_vague_count': 0, 'cannot_decide_count': -1}
+
+    result = calc_majority_label(confusion_matrix, label_columns=label_columns, tie_policy=TIE_POLICY_FIRST)
+    weighted_result = calc_majority_label(confusion_matrix, label_columns=label_columns, weights={'cannot_decide_count': 0.2})
+
+    assert result['majority_label'].tolist() == [1, 1, 0, -1]
+    assert weighted_result['majority_label'].tolist() == [1, 1, 0, 1]
+
+
+def test_calc_majority_label_tie_policies(confusion_matrix):
+    dropped = calc_majority_label(confusion_matrix, tie_policy=TIE_POLICY_DROP)
+    randomized = [calc_majority_label(confusion_matrix, tie_policy=TIE_POLICY_RANDOM, seed=seed)['majority_label'].tolist() for seed in range(20)]
+
+    assert dropped['requirement'].tolist() == ['a', 'c', 'd']
+    assert {tuple(labels) for labels in randomized} == {(1, 1, 0, 1), (1, 0, 0, 1)}
+
+
+def test_calc_majority_label_in_place(confusion_matrix):
+    result = calc_majority_label(confusion_matrix, inplace=True)
+
+    assert result is confusion_matrix
+    assert confusion_matrix['majority_label'].tolist() == [1, 1, 0, 1]
+
+
+def test_calc_majority_label_without_vague_majority():
+    confusion_matrix = pd.DataFrame.from_dict({'requirement': ['a'], 'vague_count': [0], 'not_vague_count': [2]})
+
+    assert calc_majority_label(confusion_matrix)['majority_label'].tolist() == [0]
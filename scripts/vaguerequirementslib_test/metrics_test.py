@@ -3,10 +3,13 @@
 #  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
 # ------------------------------------------------------------------------------------------------------
 
+import logging
+
+import numpy as np
 import pandas as pd
 import pytest
 
-from vaguerequirementslib.metrics import calc_mean_average_precision, calc_average_precision_k
+from vaguerequirementslib.metrics import calc_mean_average_precision, calc_average_precision_k, calc_average_precision_at_ks, calc_all_metrics, calc_specificity
 
 #pylint:disable=invalid-name
 
@@ -23,6 +26,20 @@ def test_calc_mean_average_precision_correctly():
     assert pytest.approx(result[1]) == 5/12 # not vague
     assert pytest.approx(result[2]) == 0.7 # vage
 
+
+def test_calc_mean_average_precision_does_not_warn_for_ranks_without_hits(caplog):
+    df = pd.DataFrame.from_dict({
+        'vague_prob': [0.9, 0.8, 0.3, 0.2],
+        'not_vague_prob': [0.1, 0.2, 0.7, 0.8],
+        'majority_label': [0, 1, 0, 1]
+    })
+
+    result = calc_mean_average_precision(df)
+
+    assert pytest.approx(result[2]) == 0.5
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+
+
 def test_calc_average_precision_k_correctly():
     df = pd.DataFrame.from_dict({
         'vague_prob': [0.75, 0.7, 0.6, 0.8, 0.9],
@@ -33,3 +50,31 @@ def test_calc_average_precision_k_correctly():
     result = calc_average_precision_k(df, 'vague')
 
     assert pytest.approx(result) == 0.7
+
+
+def test_calc_average_precision_at_ks_correctly():
+    probabilities = np.array([[0.25, 0.75], [0.3, 0.7], [0.4, 0.6], [0.2, 0.8], [0.1, 0.9]])
+    ground_truth = np.array([0, 1, 1, 0, 1])
+
+    result = calc_average_precision_at_ks(probabilities, ground_truth=ground_truth)
+
+    np.testing.assert_allclose(result['vague'], [1, 1, 1, 0.75, 0.7])
+    np.testing.assert_allclose(result['not_vague'], [0, 0, 1/3, 5/12, 5/12])
+    assert pytest.approx(calc_average_precision_k(probabilities, 'vague', k=4, ground_truth=ground_truth)) == 0.75
+
+
+def test_calc_all_metrics_with_arrays_correctly():
+    counts = {
+        'true_positive': np.array([2, 0, 5]),
+        'true_negative': np.array([3, 4, 0]),
+        'false_positive': np.array([1, 0, 0]),
+        'false_negative': np.array([4, 0, 0])
+    }
+
+    result = calc_all_metrics(**counts)
+
+    np.testing.assert_allclose(result['accuracy'], [0.5, 1, 1])
+    np.testing.assert_allclose(result['precision'], [2/3, 0, 1])
+    np.testing.assert_allclose(result['recall'], [1/3, 0, 1])
+    np.testing.assert_allclose(result['f1_score'], [4/9, 0, 1])
+    assert pytest.approx(result['specificity'][0]) == calc_specificity(**{key: value[0] for key, value in counts.items()})
@@ -0,0 +1,52 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import ast
+
+import pytest
+
+import vaguerequirementslib
+from vaguerequirementslib_benchmark.import_time import measure_import_time
+
+HEAVY_MODULES = ['numpy', 'pandas']
+
+
+@pytest.mark.parametrize('statement', [
+    'import vaguerequirementslib',
+    'from vaguerequirementslib import VAGUE_LABEL, MTURK_ANSWER_COLUMN',
+    'from vaguerequirementslib import predict_with_threshold; predict_with_threshold([[0.4, 0.6]])'
+])
+def test_import_does_not_load_heavy_modules(statement):
+    import_time = measure_import_time(statement)
+
+    assert 'vaguerequirementslib.constants' in import_time.modules
+    assert not set(HEAVY_MODULES) & set(import_time.modules)
+
+
+def test_heavy_modules_are_loaded_on_use():
+    import_time = measure_import_time('from vaguerequirementslib import build_confusion_matrix')
+
+    assert 'vaguerequirementslib.confusion_matrix' in import_time.modules
+    assert set(HEAVY_MODULES) <= set(import_time.modules)
+
+
+def test_public_names_are_resolved_lazily():
+    for name in vaguerequirementslib.__all__:
+        assert getattr(vaguerequirementslib, name) is not None
+        assert name in dir(vaguerequirementslib)
+
+    assert vaguerequirementslib.instrumentation.__name__ == 'vaguerequirementslib.instrumentation'
+    with pytest.raises(AttributeError):
+        vaguerequirementslib.does_not_exist  # pylint: disable=pointless-statement
+
+
+def test_static_imports_match_lazy_attributes():
+    with open(vaguerequirementslib.__file__, encoding='utf8') as init_file:
+        module = ast.parse(init_file.read())
+    type_checking_block = next(node for node in module.body if isinstance(node, ast.If) and getattr(node.test, 'id', None) == 'TYPE_CHECKING')
+
+    statically_imported = {alias.name for node in type_checking_block.body for alias in node.names}
+
+    assert statically_imported == set(vaguerequirementslib._LAZY_ATTRIBUTES) | {'instrumentation'}  # pylint: disable=protected-access
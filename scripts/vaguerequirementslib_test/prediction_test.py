@@ -6,7 +6,7 @@
 import numpy as np
 import pytest
 
-from vaguerequirementslib import predict_with_threshold
+from vaguerequirementslib import predict_with_threshold, sweep_thresholds
 
 
 @pytest.fixture
@@ -21,4 +21,29 @@ def probabilities():
 def test_predict_correctly(probabilities, threshold, expected_result):
     result = predict_with_threshold(probabilities, threshold)
 
-    assert result == expected_result
+    assert result.dtype == np.int8
+    assert result.tolist() == expected_result
+    assert predict_with_threshold(probabilities.tolist(), threshold) == expected_result
+
+
+def test_sweep_thresholds_matches_predict_with_threshold():
+    rng = np.random.default_rng(0)
+    vague_probabilities = rng.integers(0, 20, size=200) / 20
+    probabilities = np.stack([1 - vague_probabilities, vague_probabilities], axis=1)
+    ground_truth = rng.integers(0, 2, size=200)
+
+    result = sweep_thresholds(probabilities, ground_truth, thresholds=[0, 0.3, 0.5, 0.52, 1])
+
+    for _, row in result.iterrows():
+        prediction = predict_with_threshold(probabilities, row['threshold'])
+        assert row['true_positive'] == np.sum((prediction == 1) & (ground_truth == 1))
+        assert row['true_negative'] == np.sum((prediction == 0) & (ground_truth == 0))
+        assert row['false_positive'] == np.sum((prediction == 1) & (ground_truth == 0))
+        assert row['false_negative'] == np.sum((prediction == 0) & (ground_truth == 1))
+
+
+def test_sweep_thresholds_uses_distinct_probabilities():
+    result = sweep_thresholds([0.2, 0.9, 0.2, 0.4], [0, 1, 1, 0])
+
+    assert result['threshold'].tolist() == [0.2, 0.4, 0.9]
+    assert result['recall'].tolist() == [1, 0.5, 0.5]
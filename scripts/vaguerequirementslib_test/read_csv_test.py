@@ -0,0 +1,80 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import os
+
+import pandas as pd
+import pytest
+
+from vaguerequirementslib import read_csv_file, read_csv_files
+from vaguerequirementslib.cache import FileCache
+from vaguerequirementslib.constants import MTURK_ANSWER_COLUMN, MTURK_LEGACY_ANSWER_COLUMN, MTURK_REQUIREMENT_COLUMN
+
+
+@pytest.fixture
+def batch_files(tmp_path):
+    file_names = []
+    for index in range(5):
+        file_name = str(tmp_path / f'batch-{index}.csv')
+        answer_column = MTURK_LEGACY_ANSWER_COLUMN if index % 2 else MTURK_ANSWER_COLUMN
+        pd.DataFrame({
+            MTURK_REQUIREMENT_COLUMN: [f'requirement {index}-{row}' for row in range(3)],
+            answer_column: ['1 - Yes, it is vague', '2 - No, it is not vague', '1 - Yes, it is vague']
+        }).to_csv(file_name, index=False)
+        file_names.append(file_name)
+    return file_names
+
+
+@pytest.mark.parametrize('use_processes', [False, True])
+def test_read_csv_files_in_parallel_keeps_order(batch_files, use_processes):
+    result = read_csv_files(batch_files, max_workers=3, use_processes=use_processes)
+
+    pd.testing.assert_frame_equal(result, read_csv_files(batch_files))
+    assert result[MTURK_REQUIREMENT_COLUMN].tolist()[::3] == [f'requirement {index}-0' for index in range(5)]
+    assert result.columns.tolist() == [MTURK_REQUIREMENT_COLUMN, MTURK_ANSWER_COLUMN]
+
+
+def test_read_csv_file_uses_parse_cache(batch_files, tmp_path):
+    cache_dir = tmp_path / 'cache'
+
+    first = read_csv_file(batch_files[1], cache_dir=str(cache_dir))
+    assert len(list(cache_dir.iterdir())) == 1
+
+    # Change the file content while keeping its size and modification time
+    stat = os.stat(batch_files[1])
+    with open(batch_files[1], 'r+', encoding='utf8') as csv_file:
+        content = csv_file.read()
+        csv_file.seek(0)
+        csv_file.write(content.replace('requirement 1-0', 'requirement 1-X'))
+    os.utime(batch_files[1], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    pd.testing.assert_frame_equal(read_csv_file(batch_files[1], cache_dir=str(cache_dir)), first)
+    assert read_csv_file(batch_files[1], separator=';', cache_dir=str(cache_dir)).shape[1] == 1
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+@pytest.mark.parametrize('entry_content', [None, b'', b'not a pickle'])
+def test_read_csv_file_ignores_missing_or_corrupt_parse_cache_entries(batch_files, tmp_path, monkeypatch, entry_content):
+    cache_dir = tmp_path / 'cache'
+    expected = read_csv_file(batch_files[1], cache_dir=str(cache_dir))
+    entry_path, = cache_dir.iterdir()
+
+    if entry_content is None:
+        # Evicted by another process between the lookup and the read
+        monkeypatch.setattr(FileCache, 'get', lambda self, key, suffix: str(entry_path))
+        entry_path.unlink()
+    else:
+        entry_path.write_bytes(entry_content)
+
+    pd.testing.assert_frame_equal(read_csv_file(batch_files[1], cache_dir=str(cache_dir)), expected)
+
+
+def test_read_csv_file_evicts_parse_cache(batch_files, tmp_path):
+    cache_dir = tmp_path / 'cache'
+
+    for file_name in batch_files:
+        read_csv_file(file_name, cache_dir=str(cache_dir), cache_max_bytes=1)
+
+    assert not list(cache_dir.iterdir())
@@ -0,0 +1,42 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+from vaguerequirementslib import RequirementIndex, build_confusion_matrix
+
+
+def test_encode_assigns_stable_ids():
+    index = RequirementIndex(['b'])
+
+    result = index.encode(pd.Series(['a', 'b', None, 'a', 'c']))
+
+    np.testing.assert_array_equal(result, [1, 0, -1, 1, 2])
+    np.testing.assert_array_equal(index.encode(['c', 'b']), [2, 0])
+    assert index.decode([2, 1]).tolist() == ['c', 'a']
+    assert len(index) == 3
+
+
+def test_save_and_load_keep_ids(tmp_path):
+    file_name = str(tmp_path / 'requirements.json')
+    index = RequirementIndex(['b', 'a', 'äöü'])
+
+    index.save(file_name)
+    loaded = RequirementIndex.load(file_name)
+
+    np.testing.assert_array_equal(loaded.encode(['äöü', 'a', 'new']), [2, 1, 3])
+    assert len(RequirementIndex.load(str(tmp_path / 'missing.json'), missing_ok=True)) == 0
+
+
+def test_build_confusion_matrix_on_requirement_ids():
+    df = pd.DataFrame({
+        'requirement': ['b', 'a', 'b', 'c'],
+        'label': [1, 0, 1, 0]
+    })
+
+    result = build_confusion_matrix(df, 'requirement', 'label', [1], [0], requirement_index=RequirementIndex(['c', 'x']))
+
+    pd.testing.assert_frame_equal(result, build_confusion_matrix(df, 'requirement', 'label', [1], [0]))
@@ -0,0 +1,34 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import pandas as pd
+
+from vaguerequirementslib import build_confusion_matrix, read_csv_file, MTURK_ANSWER_COLUMN, MTURK_LEGACY_ANSWER_COLUMN
+from vaguerequirementslib_benchmark.synthetic_batch import build_synthetic_batch
+
+
+def test_build_synthetic_batch_is_reproducible():
+    df = build_synthetic_batch(1000, assignments_per_hit=3, worker_count=20, seed=1)
+
+    pd.testing.assert_frame_equal(df, build_synthetic_batch(1000, assignments_per_hit=3, worker_count=20, seed=1))
+    assert df.shape == (1000, 4)
+    assert df['AssignmentId'].is_unique
+    assert df['WorkerId'].nunique() <= 20
+    # Each HIT has distinct workers
+    assert not df.duplicated(['Input.requirement', 'WorkerId']).any()
+
+    confusion_matrix = build_confusion_matrix(df)
+    assert confusion_matrix.shape[0] == 334
+    assert (confusion_matrix[['vague_count', 'not_vague_count']].sum(axis=1) <= 3).all()
+
+
+def test_build_synthetic_legacy_batch(tmp_path):
+    df = build_synthetic_batch(100, legacy=True)
+    assert MTURK_LEGACY_ANSWER_COLUMN in df.columns
+
+    file_path = tmp_path / 'batch.csv'
+    df.to_csv(file_path, index=False)
+    assert build_confusion_matrix(read_csv_file(str(file_path)))[['vague_count', 'not_vague_count']].to_numpy().sum() == 100
+    assert MTURK_ANSWER_COLUMN in read_csv_file(str(file_path)).columns
@@ -0,0 +1,59 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import pytest
+
+from vaguerequirementslib import TokenCache
+
+
+@pytest.fixture
+def tokenizer_calls():
+    return []
+
+
+@pytest.fixture
+def tokenizer(tokenizer_calls):
+    def tokenize(text):
+        tokenizer_calls.append(text)
+        return text.split()
+    return tokenize
+
+
+def test_token_cache_is_content_addressed(tmp_path, tokenizer, tokenizer_calls):
+    with TokenCache(str(tmp_path)) as cache:
+        first = cache.tokenize(['the  system', 'shall be fast', ''], tokenizer)
+        # Whitespace differences do not change the normalized text
+        second = cache.tokenize(['the system ', 'shall be fast', ''], tokenizer)
+
+        assert len(tokenizer_calls) == 3
+        assert [second.tokens(position) for position in range(3)] == [['the', 'system'], ['shall', 'be', 'fast'], []]
+        assert first.vocabulary.tolist() == second.vocabulary.tolist()
+
+        cache.tokenize(['the system'], tokenizer, tokenizer_id='other')
+        assert len(tokenizer_calls) == 4
+
+
+def test_token_cache_only_tokenizes_new_texts(tmp_path, tokenizer, tokenizer_calls):
+    corpus = [f'requirement {number} shall be fast' for number in range(100)]
+    with TokenCache(str(tmp_path)) as cache:
+        cache.tokenize(corpus, tokenizer)
+
+    with TokenCache(str(tmp_path)) as cache:
+        result = cache.tokenize(['a new requirement'] + corpus, tokenizer)
+
+    assert len(tokenizer_calls) == 101
+    assert tokenizer_calls[-1] == 'a new requirement'
+    assert result.tokens(0) == ['a', 'new', 'requirement']
+    assert result.tokens(100) == ['requirement', '99', 'shall', 'be', 'fast']
+
+
+def test_token_cache_is_size_bounded(tmp_path, tokenizer, tokenizer_calls):
+    with TokenCache(str(tmp_path), max_bytes=1) as cache:
+        cache.tokenize(['a b'], tokenizer)
+
+    with TokenCache(str(tmp_path)) as cache:
+        cache.tokenize(['a b'], tokenizer)
+
+    assert len(tokenizer_calls) == 2
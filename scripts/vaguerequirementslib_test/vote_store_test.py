@@ -0,0 +1,59 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import pandas as pd
+import pytest
+
+from vaguerequirementslib import VoteStore, build_confusion_matrix, calculate_fleiss_kappa
+from vaguerequirementslib.constants import MTURK_ANSWER_COLUMN, MTURK_REQUIREMENT_COLUMN, MTURK_ASSIGNMENT_ID_COLUMN
+
+VAGUE = '1 - Yes, it is vague'
+NOT_VAGUE = '2 - No, it is not vague'
+
+
+def _batch(assignments: list) -> pd.DataFrame:
+    return pd.DataFrame(assignments, columns=[MTURK_ASSIGNMENT_ID_COLUMN, MTURK_REQUIREMENT_COLUMN, MTURK_ANSWER_COLUMN])
+
+
+@pytest.fixture
+def batches():
+    return [
+        _batch([('A1', 'a', VAGUE), ('A2', 'a', NOT_VAGUE), ('A3', 'b', VAGUE), ('A4', 'c', 'unknown')]),
+        _batch([('A3', 'b', VAGUE), ('A5', 'b', VAGUE), ('A6', 'a', VAGUE), ('A7', 'd', NOT_VAGUE), ('A7', 'd', NOT_VAGUE)])
+    ]
+
+
+def test_vote_store_adds_batches_incrementally(batches, tmp_path):
+    database_path = str(tmp_path / 'votes.sqlite')
+    expected = build_confusion_matrix(pd.concat(batches).drop_duplicates(subset=[MTURK_ASSIGNMENT_ID_COLUMN]), drop_ties=False)
+
+    with VoteStore(database_path) as store:
+        assert store.add_batch(batches[0]) == 4
+    with VoteStore(database_path) as store:
+        assert store.add_batch(batches[1]) == 3
+        assert store.add_batch(batches[1]) == 0
+
+        pd.testing.assert_frame_equal(store.confusion_matrix(), expected)
+        assert store.confusion_matrix(drop_ties=True)['requirement'].tolist() == ['a', 'b', 'd']
+        assert store.majority_labels()['majority_label'].tolist() == [1, 1, 1, 0]
+        assert store.kappa() == calculate_fleiss_kappa(expected)
+
+
+def test_vote_store_rejects_other_categories(tmp_path):
+    database_path = str(tmp_path / 'votes.sqlite')
+    VoteStore(database_path).close()
+
+    with pytest.raises(ValueError):
+        VoteStore(database_path, categories={'vague_count': [VAGUE]})
+
+
+def test_vote_store_rejects_reordered_categories(tmp_path):
+    database_path = str(tmp_path / 'votes.sqlite')
+    with VoteStore(database_path, categories={'vague_count': [VAGUE], 'not_vague_count': [NOT_VAGUE]}) as store:
+        store.add_batch(_batch([('A1', 'a', VAGUE), ('A2', 'a', VAGUE)]))
+
+    # The stored votes refer to the category positions, so a different order would swap the counts
+    with pytest.raises(ValueError):
+        VoteStore(database_path, categories={'not_vague_count': [NOT_VAGUE], 'vague_count': [VAGUE]})
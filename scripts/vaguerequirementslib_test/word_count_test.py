@@ -0,0 +1,61 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import pandas as pd
+import pytest
+
+from vaguerequirementslib import count_words
+
+
+@pytest.fixture
+def data_frames():
+    return [
+        pd.DataFrame({'requirement': ['the system shall be fast', 'the system shall log'], 'majority_label': [1, 0]}),
+        pd.DataFrame({'requirement': ['be fast and easy'], 'majority_label': [1]})
+    ]
+
+
+@pytest.mark.parametrize('max_workers', [None, 2])
+def test_count_words(data_frames, max_workers):
+    result = count_words(data_frames, tokenizer=str.split, batch_size=1, max_workers=max_workers).set_index('word')
+
+    assert result.loc['fast'].tolist() == [2, 2, 0, 2]
+    assert result.loc['system'].tolist() == [2, 1, 1, 0]
+    assert result.loc['log'].tolist() == [1, 0, 1, 1]
+    assert result['overall_count'].sum() == 13
+
+
+def test_count_words_rejects_unknown_labels():
+    with pytest.raises(ValueError):
+        count_words([pd.DataFrame({'requirement': ['a'], 'majority_label': [2]})], tokenizer=str.split)
+
+
+def test_count_words_uses_token_cache(data_frames, tmp_path):
+    calls = []
+
+    def tokenizer(text):
+        calls.append(text)
+        return text.split()
+
+    expected = count_words(data_frames, tokenizer=str.split)
+    first = count_words(data_frames, tokenizer=tokenizer, cache_dir=str(tmp_path))
+    tokenized_count = len(calls)
+    second = count_words(data_frames, tokenizer=tokenizer, cache_dir=str(tmp_path))
+
+    assert tokenized_count == 3
+    assert len(calls) == tokenized_count
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(second, expected)
+
+
+@pytest.mark.parametrize('max_workers', [None, 2])
+def test_count_words_normalizes_with_and_without_token_cache(tmp_path, max_workers):
+    data_frames = [pd.DataFrame({'requirement': ['cafe\u0301  is nice', 'caf\u00e9 is  fine'], 'majority_label': [1, 0]})]
+
+    without_cache = count_words(data_frames, tokenizer=str.split, max_workers=max_workers)
+    with_cache = count_words(data_frames, tokenizer=str.split, max_workers=max_workers, cache_dir=str(tmp_path))
+
+    pd.testing.assert_frame_equal(with_cache, without_cache)
+    assert without_cache.set_index('word').loc['caf\u00e9'].tolist() == [2, 1, 1, 0]
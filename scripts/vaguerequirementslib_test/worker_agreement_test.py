@@ -0,0 +1,52 @@
+# ------------------------------------------------------------------------------------------------------
+#  Copyright (c) Leo Hanisch. All rights reserved.
+#  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
+# ------------------------------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+from vaguerequirementslib import calc_worker_agreement, MTURK_REQUIREMENT_COLUMN, MTURK_ANSWER_COLUMN, MTURK_WORKER_ID_COLUMN
+
+VAGUE = '1 - Yes, it is vague'
+NOT_VAGUE = '2 - No, it is not vague'
+
+
+def _build_batch(ratings: dict) -> pd.DataFrame:
+    return pd.DataFrame([
+        {MTURK_REQUIREMENT_COLUMN: requirement, MTURK_WORKER_ID_COLUMN: worker, MTURK_ANSWER_COLUMN: answer}
+        for worker, answers in ratings.items()
+        for requirement, answer in answers.items()
+    ])
+
+
+def test_calc_worker_agreement():
+    df = _build_batch({
+        'w2': {'a': VAGUE, 'b': NOT_VAGUE, 'c': VAGUE, 'd': NOT_VAGUE},
+        'w1': {'a': VAGUE, 'b': NOT_VAGUE, 'c': NOT_VAGUE, 'd': NOT_VAGUE},
+        'w3': {'e': VAGUE}
+    })
+
+    result = calc_worker_agreement(df)
+
+    # w3 shares no requirement with the others
+    assert result.shape[0] == 1
+    row = result.iloc[0]
+    assert (row['first_worker'], row['second_worker'], row['shared_items']) == ('w1', 'w2', 4)
+    assert row['agreement'] == 0.75
+    # p_o = 0.75, p_e = 0.25 * 0.5 + 0.75 * 0.5 = 0.5
+    assert np.isclose(row['kappa'], 0.5)
+
+
+def test_calc_worker_agreement_without_expected_disagreement():
+    df = _build_batch({
+        'w1': {'a': VAGUE, 'b': VAGUE},
+        'w2': {'a': VAGUE, 'b': VAGUE},
+        'w3': {'a': VAGUE}
+    })
+
+    result = calc_worker_agreement(df, min_shared_items=2)
+
+    assert result[['first_worker', 'second_worker']].values.tolist() == [['w1', 'w2']]
+    assert result['agreement'].tolist() == [1.0]
+    assert np.isnan(result['kappa'].iat[0])
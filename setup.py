@@ -31,18 +31,21 @@ setup(
         'pandas',
         'numpy'
     ],
+    extras_require={
+        # The default tokenizer of count_words
+        'nltk': ['nltk']
+    },
     project_urls={
         'Issue Tracker': 'https://github.com/HaaLeo/vague-requirements-scripts/issues',
         # 'Changelog': 'https://github.com/HaaLeo/vague-requirements-scripts/blob/master/CHANGELOG.md#changelog'
     },
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     keywords=[
         'vague',
         'requirements'
     ],
     classifiers=[
         'Development Status :: 5 - Production/Stable',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'License :: OSI Approved :: BSD License',